@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+=======
+asyncio
+=======
+
+Asynchronous counterparts of every resource class, for use from asyncio
+code. They share their url and payload logic with the blocking classes,
+take the same arguments, and return awaitables instead of results.
+
+Requests are sent with `aiohttp <https://docs.aiohttp.org/>`_, which has to
+be installed separately::
+
+    pip install aiohttp
+
+-----------
+Basic usage
+-----------
+
+    >>> import asyncio
+    >>> from basecamp.aio import AsyncProject, AsyncTodo
+    >>>
+    >>> async def main():
+    ...     projects = AsyncProject(account_url, access_token)
+    ...     todos = AsyncTodo(account_url, access_token)
+    ...     project_list = await projects.fetch()
+    ...     return await asyncio.gather(*[
+    ...         todos.fetch(project['id']) for project in project_list])
+    >>>
+    >>> asyncio.run(main())
+
+Lazy fetches return an :class:`basecamp.pagination.AsyncPageIterator`:
+
+    >>> async for todo in await todos.fetch(1, lazy=True, prefetch=True):
+    ...     print(todo['content'])
+
+Every resource that isn't handed a transport shares one
+:class:`AsyncTransport`, which caps the number of requests in flight with a
+semaphore. Thousands of concurrent fetches can be started; the ones past
+the cap wait their turn instead of opening more connections. The rate
+limiter, retry policy and cache work as they do for the blocking classes.
+
+:class:`AsyncBasecampClient` groups the resources of one account around a
+single transport, cache and rate limiter:
+
+    >>> client = AsyncBasecampClient(account_url, access_token)
+    >>> await client.todos.fetch(1)
+    >>> await client.close()
+"""
+import asyncio
+import threading
+
+import requests
+
+from .auth import Auth
+from .base import Base, Basecamp
+from .client import BasecampClient
+from .comments import Comment
+from .documents import Document
+from .events import Event
+from .exceptions import ImproperlyConfigured
+from .instrumentation import current_operation
+from .pagination import AsyncPageIterator
+from .people import Person
+from .projects import Project
+from .ratelimit import retry_after
+from .todo_lists import TodoList
+from .todos import Todo
+from .tokens import token_in
+from .transport import AsyncBaseTransport
+
+
+class AsyncResponse(object):
+    """
+    A fully read response.
+
+    ``timings`` holds the seconds spent on ``dns``, ``connect`` and until
+    the headers arrived (``ttfb``), as far as they were measured.
+    """
+
+    def __init__(self, status_code, content, headers, timings=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.timings = timings or {}
+
+    def __repr__(self):
+        return '<BasecampAsyncResponse [{0}]>'.format(self.status_code)
+
+
+def _trace_config(aiohttp):
+    """
+    Get an aiohttp trace config recording the timings of each request in
+    the dictionary passed as its ``trace_request_ctx``.
+    """
+    def mark(name):
+        async def handler(session, context, params):
+            context.trace_request_ctx[name] = \
+                asyncio.get_running_loop().time()
+        return handler
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(mark('start'))
+    trace_config.on_dns_resolvehost_start.append(mark('dns_start'))
+    trace_config.on_dns_resolvehost_end.append(mark('dns_end'))
+    trace_config.on_connection_create_start.append(mark('connect_start'))
+    trace_config.on_connection_create_end.append(mark('connect_end'))
+    trace_config.on_request_end.append(mark('headers'))
+
+    return trace_config
+
+
+def _timings(marks):
+    """
+    Get the dns, connect and ttfb durations from trace marks.
+    """
+    timings = {}
+
+    dns = None
+    if 'dns_end' in marks and 'dns_start' in marks:
+        dns = timings['dns'] = marks['dns_end'] - marks['dns_start']
+    if 'connect_end' in marks and 'connect_start' in marks:
+        # connecting includes resolving.
+        timings['connect'] = marks['connect_end'] - \
+            marks['connect_start'] - (dns or 0.0)
+    elif 'start' in marks:
+        timings['connect'] = 0.0
+    if 'headers' in marks and 'start' in marks:
+        timings['ttfb'] = marks['headers'] - marks['start']
+
+    return timings
+
+
+class AsyncTransport(AsyncBaseTransport):
+    """
+    A non-blocking, pooled HTTP transport.
+
+    :param max_in_flight: maximum number of requests sent at once. Further
+        requests wait on a semaphore.
+    :param limit: maximum number of open connections.
+    :param limit_per_host: maximum number of open connections per host,
+        0 for no per host limit.
+    :param timeout: total timeout in seconds for each request.
+    """
+
+    def __init__(self, max_in_flight=1000, limit=100, limit_per_host=0,
+            timeout=None):
+        self.max_in_flight = max_in_flight
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session = None
+        self._loop = None
+
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+
+    def __repr__(self):
+        return '<BasecampAsyncTransport at 0x%x>' % (id(self))
+
+    def _get_session(self):
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImproperlyConfigured(
+                'aiohttp is needed for the asyncio client.')
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or \
+                self._loop is not loop:
+            # sessions belong to the loop they were created in.
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[_trace_config(aiohttp)])
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+
+        return self._session
+
+    async def request(self, method, url, headers=None, data=None):
+        """
+        Send a request and read the whole response.
+
+        Connection errors and timeouts are raised as the same
+        :class:`requests.ConnectionError` and :class:`requests.Timeout` the
+        blocking transport raises.
+        """
+        import aiohttp
+
+        session = self._get_session()
+        self._requests += 1
+
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                marks = {}
+                async with session.request(method, url,
+                        headers=headers, data=data,
+                        trace_request_ctx=marks) as response:
+                    content = await response.read()
+                    return AsyncResponse(response.status, content,
+                        response.headers, timings=_timings(marks))
+            except aiohttp.ClientConnectionError as error:
+                self._errors += 1
+                raise requests.ConnectionError(error)
+            except asyncio.TimeoutError as error:
+                self._errors += 1
+                raise requests.Timeout(error)
+            finally:
+                self._in_flight -= 1
+
+    def stats(self):
+        """
+        Get transport statistics.
+
+        :rtype dictionary: ``requests`` and ``errors`` sent through this
+            transport, and the number of requests ``in_flight`` right now.
+        """
+        return {
+            'requests': self._requests,
+            'errors': self._errors,
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+        }
+
+    async def close(self):
+        """
+        Close every pooled connection.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_default_async_transport():
+    """
+    Get the transport shared by every asynchronous resource that isn't
+    given one.
+    """
+    global _default_transport  # pylint: disable=W0603
+
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = AsyncTransport()
+
+    return _default_transport
+
+
+class AsyncBase(Base):
+    """
+    Base class that handles performing asynchronous API calls.
+    """
+
+    def _default_transport(self):
+        return get_default_async_transport()
+
+    async def _send(self, method, url, headers=None, payload=None,
+            event=None):
+        """
+        Asynchronous counterpart of :meth:`Base._send`.
+        """
+        replays = 0
+        retries = 0
+        reauthorized = False
+        started = self.retry_policy.clock()
+
+        request = None
+        try:
+            while True:
+                request = None
+
+                if self.token_manager is not None:
+                    url = await self.token_manager.prepare_async(url)
+
+                if self.rate_limiter is not None:
+                    delay = self.rate_limiter.reserve()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                try:
+                    request = await self.transport.request(method, url,
+                        data=payload,
+                        headers=headers or self.headers)
+                except self.retry_policy.exceptions as error:
+                    delay = self.retry_policy.next_delay(method, retries + 1,
+                        started, error=error)
+                    if delay is None:
+                        raise
+                    retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                if request.status_code == 429 and \
+                        replays < self.rate_limit_replays:
+                    replays += 1
+                    delay = retry_after(request)
+
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.pause(delay)
+                    else:
+                        await asyncio.sleep(delay)
+                    continue
+
+                if request.status_code == 401 and not reauthorized and \
+                        self.token_manager is not None and \
+                        self.token_manager.can_refresh:
+                    reauthorized = True
+                    await self.token_manager.refresh_async(
+                        stale=token_in(url))
+                    continue
+
+                delay = self.retry_policy.next_delay(method, retries + 1,
+                    started, status_code=request.status_code)
+                if delay is not None:
+                    retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                return request
+        finally:
+            if event is not None:
+                event.retries = retries
+                event.replays = replays + int(reauthorized)
+                event.rate_limited = replays
+                event.response = request
+
+    async def get(self, url, headers=None, stream=False):
+        """
+        Perform a GET request.
+
+        The whole body is always read; streamed requests are only scanned
+        incrementally, and bypass the cache.
+        """
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+
+        if stream:
+            with self._instrumented('GET', url) as event:
+                request = await self._send('GET', url,
+                    headers=request_headers, event=event)
+                return self._check_response_code(request)
+
+        if self.coalescer is not None:
+            return await self.coalescer.run_async(
+                self._coalescing_key(url, request_headers),
+                lambda: self._get(url, request_headers))
+
+        return await self._get(url, request_headers)
+
+    async def _get(self, url, request_headers):
+        """
+        Asynchronous :meth:`basecamp.base.Base._get`.
+        """
+        with self._instrumented('GET', url) as event:
+            if self.cache is not None:
+                request_headers.update(self.cache.validators(url))
+
+            request = await self._send('GET', url, headers=request_headers,
+                event=event)
+
+            if self.cache is not None:
+                request = self.cache.update(url, request)
+                if event is not None:
+                    event.cache = 'hit' if getattr(request, 'from_cache',
+                        False) else 'miss'
+
+            return self._check_response_code(request)
+
+    async def post(self, url, payload=None):
+        """
+        Perform a POST request.
+        """
+        with self._instrumented('POST', url, payload) as event:
+            request = await self._send('POST', url, payload=payload,
+                event=event)
+
+            return self._check_response_code(request)
+
+    async def put(self, url, payload=None):
+        """
+        Perform a PUT request.
+        """
+        with self._instrumented('PUT', url, payload) as event:
+            request = await self._send('PUT', url, payload=payload,
+                event=event)
+
+            return self._check_response_code(request)
+
+    async def delete(self, url, payload=None):
+        """
+        Perform a DELETE request.
+        """
+        with self._instrumented('DELETE', url, payload) as event:
+            request = await self._send('DELETE', url, payload=payload,
+                event=event)
+
+            return self._check_response_code(request)
+
+    def _run(self, operation, name=None):
+        return self._run_async(operation, name=name)
+
+    async def _run_async(self, operation, name=None):
+        """
+        Run an operation to completion, awaiting each request it yields.
+        """
+        name = current_operation.set(name or operation.__qualname__)
+        try:
+            call = next(operation)
+            while True:
+                call = operation.send(await self._perform(call))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            current_operation.reset(name)
+
+
+class AsyncBasecamp(AsyncBase, Basecamp):
+    """
+    Asynchronous base class for the API resources.
+
+    Takes the same arguments as :class:`basecamp.base.Basecamp`, except that
+    ``transport`` is an :class:`AsyncTransport`.
+    """
+
+    def _paginate(self, endpoint, query=None, prefetch=False):
+        name = current_operation.get()
+
+        def fetch_page(page):
+            return self._run(self._fetch_page(endpoint, query, page),
+                name=name)
+
+        return AsyncPageIterator(fetch_page, prefetch=prefetch)
+
+
+class AsyncAuth(AsyncBase, Auth):
+    """
+    Asynchronous :class:`basecamp.auth.Auth`.
+    """
+
+
+class AsyncProject(AsyncBasecamp, Project):
+    """
+    Asynchronous :class:`basecamp.projects.Project`.
+    """
+
+
+class AsyncTodoList(AsyncBasecamp, TodoList):
+    """
+    Asynchronous :class:`basecamp.todo_lists.TodoList`.
+    """
+
+
+class AsyncTodo(AsyncBasecamp, Todo):
+    """
+    Asynchronous :class:`basecamp.todos.Todo`.
+    """
+
+
+class AsyncDocument(AsyncBasecamp, Document):
+    """
+    Asynchronous :class:`basecamp.documents.Document`.
+    """
+
+
+class AsyncComment(AsyncBasecamp, Comment):
+    """
+    Asynchronous :class:`basecamp.comments.Comment`.
+    """
+
+
+class AsyncPerson(AsyncBasecamp, Person):
+    """
+    Asynchronous :class:`basecamp.people.Person`.
+    """
+
+    async def warm(self):
+        """
+        Asynchronous :meth:`basecamp.people.Person.warm`.
+        """
+        if self.identity_cache is None:
+            raise ImproperlyConfigured('Person has no identity cache.')
+
+        count = 0
+        async for person in await self.fetch(lazy=True):
+            self.identity_cache.put(person['id'], person)
+            count += 1
+
+        return count
+
+    async def resolve(self, reference):
+        """
+        Asynchronous :meth:`basecamp.people.Person.resolve`.
+        """
+        if not reference:
+            return None
+        return await self.fetch(reference['id'])
+
+
+class AsyncEvent(AsyncBasecamp, Event):
+    """
+    Asynchronous :class:`basecamp.events.Event`.
+    """
+
+
+class AsyncBasecampClient(BasecampClient):
+    """
+    Asynchronous :class:`basecamp.client.BasecampClient`.
+
+    ``await client.close()`` when done with it.
+    """
+
+    transport_class = AsyncTransport
+
+    resource_classes = {
+        'projects': AsyncProject,
+        'todo_lists': AsyncTodoList,
+        'todos': AsyncTodo,
+        'documents': AsyncDocument,
+        'comments': AsyncComment,
+        'people': AsyncPerson,
+        'events': AsyncEvent,
+    }
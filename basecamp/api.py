@@ -16,4 +16,6 @@ from .documents import Document
 from .base import Basecamp
 from .todo_lists import TodoList
 from .todos import Todo
-from .comments import Comment
\ No newline at end of file
+from .comments import Comment
+from .events import Event
+from .client import BasecampClient
@@ -69,14 +69,36 @@ Here's a basic example of how this could work in a Flask application.
 
         # do things now that you have a token.
 
+-------------
+Authorization
+-------------
+
+:meth:`Auth.get_identity` and :meth:`Auth.get_accounts` both read
+Launchpad's ``authorization.json``. It is fetched once per access token and
+kept for a minute in a cache shared by every :class:`Auth`, so a login
+flow calling both, or a page listing accounts on every load, makes a
+single request. Call
+:meth:`Auth.invalidate_authorization` when a token is revoked or replaced.
+
 """
+import hashlib
 import urllib.request, urllib.parse, urllib.error
-import json
 
-from .base import Base
+from . import codec
+from .base import Base, Call, operation
+from .cache import IdentityCache
 from .exceptions import BasecampAPIError
 
 
+def _token_key(access_token):
+    # don't keep tokens around in memory longer than needed.
+    return hashlib.sha1(access_token.encode('utf-8')).hexdigest()
+
+
+# authorization documents by access token, shared by every Auth.
+default_authorization_cache = IdentityCache(max_entries=1024, ttl=60.0)
+
+
 class Auth(Base):
     """
     Class to perform basic auth operations
@@ -85,15 +107,19 @@ class Auth(Base):
     auth_type = 'web_server'
     auth_base_url = 'https://launchpad.37signals.com/'
 
-    def __init__(self, client_id, client_secret, redirect_uri):
+    def __init__(self, client_id, client_secret, redirect_uri,
+            transport=None, authorization_cache=None):
         self.client_secret = client_secret
+        if authorization_cache is None:
+            authorization_cache = default_authorization_cache
+        self.authorization_cache = authorization_cache
         self.query_args = dict(
             client_id=client_id,
             type=self.auth_type,
             redirect_uri=redirect_uri
         )
 
-        super(Auth, self).__init__()
+        super(Auth, self).__init__(transport=transport)
 
     def __repr__(self):
         return '<BasecampAuth at 0x%x>' % (id(self))
@@ -114,6 +140,7 @@ class Auth(Base):
             self.auth_base_url,
             urllib.parse.urlencode(self.query_args))
 
+    @operation
     def get_token(self, code):
         """
         This function requests the auth token from basecamp after
@@ -128,31 +155,105 @@ class Auth(Base):
         - access_token (a really long string, you'll need this later)
         - refresh_token (another really long string. Hang onto this as well.)
         """
-        self.query_args.update({
-            'code': code,
-            'client_secret': self.client_secret
-        })
-        url = '{0}authorization/token'.format(self.auth_base_url)
-        request = self.post(url, post_data=self.query_args)
+        query_args = dict(self.query_args,
+            code=code,
+            client_secret=self.client_secret
+        )
+        url = '{0}authorization/token?{1}'.format(
+            self.auth_base_url,
+            urllib.parse.urlencode(query_args))
+        request = yield Call('POST', url)
+
+        if request.status_code == 200:
+            return codec.decode(request)  # pylint: disable=E1103
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
+
+    @operation
+    def refresh(self, refresh_token):
+        """
+        Trade a refresh token for a new access token, once the one from
+        :meth:`get_token` expires.
+
+        :param refresh_token: the ``refresh_token`` from :meth:`get_token`
+        :rtype: dictionary with the new ``access_token`` and its
+            ``expires_in``.
+
+        See :class:`basecamp.tokens.TokenManager` to have tokens refreshed
+        as they expire.
+        """
+        query_args = dict(self.query_args,
+            type='refresh',
+            refresh_token=refresh_token,
+            client_secret=self.client_secret
+        )
+        url = '{0}authorization/token?{1}'.format(
+            self.auth_base_url,
+            urllib.parse.urlencode(query_args))
+        request = yield Call('POST', url)
 
         if request.status_code == 200:
-            return json.loads(request.content)  # pylint: disable=E1103
+            return codec.decode(request)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+        raise BasecampAPIError(codec.decode(request).get('error'))
 
     def _do_authorization_request(self, access_token):
         """
-        Do the authorization request.
+        Describe the authorization request.
 
-        This method is used by ``get_identity`` and ``get_accounts``
+        This method is used by :meth:`_authorization`.
         """
         url = '{0}authorization.json'.format(self.auth_base_url)
         headers = {
             'Authorization': 'Bearer {0}'.format(access_token)
         }
 
-        return self.get(url, headers=headers)
+        return Call('GET', url, headers=headers)
+
+    def _authorization(self, access_token):
+        """
+        Operation getting the authorization document of an access token,
+        from the cache if it is there.
+
+        It is shared by :meth:`get_authorization`, :meth:`get_identity`
+        and :meth:`get_accounts`.
+        """
+        key = _token_key(access_token)
+        cached = self.authorization_cache.get(key)
+        if cached is not None:
+            return cached
+
+        request = yield self._do_authorization_request(access_token)
+
+        if request.status_code == 200:
+            return self.authorization_cache.put(key, codec.decode(request))
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
+
+    @operation
+    def get_authorization(self, access_token):
+        """
+        Get the authorization document of an access token: its
+        ``identity``, ``accounts`` and ``expires_at``.
+
+        It is served from :attr:`authorization_cache` while cached.
+
+        :param access_token: access token obtained from :meth:`get_token`
+        :rtype: dictionary
+        """
+        return (yield from self._authorization(access_token))
+
+    def invalidate_authorization(self, access_token=None):
+        """
+        Drop the cached authorization document of ``access_token``, or of
+        every token if None.
+        """
+        if access_token is None:
+            self.authorization_cache.clear()
+        else:
+            self.authorization_cache.invalidate(_token_key(access_token))
 
+    @operation
     def get_identity(self, access_token):
         """
         Get the users identity.
@@ -170,13 +271,11 @@ class Auth(Base):
         :param access_token: access token obtained from :meth:`get_token`
         :rtype: dictionary
         """
-        request = self._do_authorization_request(access_token)
-
-        if request.status_code == 200:
-            return request.content.get('identity')
+        authorization = yield from self._authorization(access_token)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+        return authorization.get('identity')
 
+    @operation
     def get_accounts(self, access_token, account_type='bcx'):
         """
         Get 37signals accounts for the authenticated user.
@@ -186,18 +285,15 @@ class Auth(Base):
             Basecamp Next accounts by default.
         :rtype: dictionary
         """
-        request = self._do_authorization_request(access_token)
-
-        if request.status_code == 200:
-            if account_type == 'all':
-                return json.loads(request.content.get('accounts'))
-            else:
-                _accounts = []
+        authorization = yield from self._authorization(access_token)
 
-                for account in json.loads(request.content).get('accounts'):
-                    if account['product'] == account_type:
-                        _accounts.append(account)
+        if account_type == 'all':
+            return authorization.get('accounts')
+        else:
+            _accounts = []
 
-                return _accounts
+            for account in authorization.get('accounts'):
+                if account['product'] == account_type:
+                    _accounts.append(account)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+            return _accounts
@@ -1,7 +1,56 @@
 # -*- coding: utf-8 -*-
-import requests
+import contextlib
+import functools
+import time
 import urllib.request, urllib.parse, urllib.error
+from . import codec
+from .cache import canonical_url
+from .coalescing import get_default_coalescer
 from .exceptions import (ImproperlyConfigured, BasecampAPIError)
+from .instrumentation import current_operation, get_default_instrumentation
+from .pagination import PageIterator
+from .ratelimit import get_rate_limiter, retry_after
+from .retry import get_default_retry_policy
+from .tokens import token_in
+from .transport import get_default_transport
+
+
+class Call(object):
+    """
+    A request an operation wants made.
+
+    Resource methods describe their requests with calls instead of sending
+    them, so the same url and payload logic drives both the blocking
+    resources and their :mod:`basecamp.aio` counterparts.
+    """
+    __slots__ = ('method', 'url', 'payload', 'headers', 'stream')
+
+    def __init__(self, method, url, payload=None, headers=None,
+            stream=False):
+        self.method = method
+        self.url = url
+        self.payload = payload
+        self.headers = headers
+        self.stream = stream
+
+    def __repr__(self):
+        return '<BasecampCall {0} {1}>'.format(self.method, self.url)
+
+
+def operation(func):
+    """
+    Turn a generator that yields :class:`Call` objects and receives their
+    responses into a method that runs it.
+
+    The operation is run by the instance's :meth:`Base._run`, so on a
+    blocking resource the method returns the operation's result, and on an
+    asynchronous one it returns an awaitable.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self._run(func(self, *args, **kwargs))
+
+    return wrapper
 
 
 class Base(object):
@@ -13,45 +62,271 @@ class Base(object):
         'Content-Type': 'application/json; charset=utf-8',
     }
 
-    def get(self, url, headers=None):
+    # how many times a request answered with a 429 is replayed.
+    rate_limit_replays = 5
+
+    # :class:`basecamp.tokens.TokenManager` keeping the access token fresh.
+    token_manager = None
+
+    def __init__(self, transport=None, cache=None, rate_limiter=None,
+            retry_policy=None, coalescer=None, instrumentation=None):
+        self.transport = transport or self._default_transport()
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or get_default_retry_policy()
+
+        if coalescer is None:
+            coalescer = get_default_coalescer()
+        elif coalescer is False:
+            coalescer = None
+        self.coalescer = coalescer
+
+        if instrumentation is None:
+            instrumentation = get_default_instrumentation()
+        elif instrumentation is False:
+            instrumentation = None
+        self.instrumentation = instrumentation
+
+    def _default_transport(self):
+        """
+        Get the transport to use when none is given.
+        """
+        return get_default_transport()
+
+    @contextlib.contextmanager
+    def _instrumented(self, method, url, payload=None, stream=False):
+        """
+        Report the request made in the block to the instrumentation hooks.
+
+        Yields the :class:`basecamp.instrumentation.RequestEvent` to fill
+        in, or None if nobody is listening.
+        """
+        event = None
+        if self.instrumentation is not None:
+            event = self.instrumentation.start(method, url, payload)
+
+        if event is None:
+            yield None
+            return
+
+        event.stream = stream
+        try:
+            yield event
+        except BaseException as error:
+            event.error = error
+            raise
+        finally:
+            self.instrumentation.finish(event)
+
+    def _send(self, method, url, headers=None, payload=None, stream=False,
+            event=None):
+        """
+        Send a request through the transport, paced by the rate limiter.
+
+        A ``429`` response is replayed after waiting out its
+        ``Retry-After`` period, up to :attr:`rate_limit_replays` times.
+        Errors and responses the retry policy covers are retried after
+        backing off. With ``stream``, the body of the response is left
+        unread.
+
+        With a :attr:`token_manager`, an access token about to expire is
+        refreshed first, and a ``401`` refreshes it and replays the request
+        once.
+
+        ``event`` is filled in with the retries, replays and final response.
+        Streamed responses that aren't returned are closed, so their
+        connection goes back to the pool.
+        """
+        replays = 0
+        retries = 0
+        reauthorized = False
+        started = self.retry_policy.clock()
+        # only asked of transports when needed, so custom ones without
+        # streaming support keep working.
+        options = {'stream': True} if stream else {}
+
+        request = None
+        try:
+            while True:
+                request = None
+
+                if self.token_manager is not None:
+                    url = self.token_manager.prepare(url)
+
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+
+                try:
+                    request = self.transport.request(method, url,
+                        data=payload,
+                        headers=headers or self.headers,
+                        **options)
+                except self.retry_policy.exceptions as error:
+                    if self.retry_policy.wait(method, retries + 1, started,
+                            error=error):
+                        retries += 1
+                        continue
+                    raise
+
+                if request.status_code == 429 and \
+                        replays < self.rate_limit_replays:
+                    replays += 1
+                    delay = retry_after(request)
+                    self._release(request, stream)
+
+                    if self.rate_limiter is not None:
+                        # hold back everyone sharing the limiter, not just
+                        # us.
+                        self.rate_limiter.pause(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
+
+                if request.status_code == 401 and not reauthorized and \
+                        self.token_manager is not None and \
+                        self.token_manager.can_refresh:
+                    reauthorized = True
+                    self._release(request, stream)
+                    self.token_manager.refresh(stale=token_in(url))
+                    continue
+
+                if self.retry_policy.wait(method, retries + 1, started,
+                        status_code=request.status_code):
+                    retries += 1
+                    self._release(request, stream)
+                    continue
+
+                return request
+        finally:
+            if event is not None:
+                event.retries = retries
+                event.replays = replays + int(reauthorized)
+                event.rate_limited = replays
+                event.response = request
+
+    def _release(self, request, stream):
+        """
+        Close a streamed response that won't be read.
+        """
+        close = getattr(request, 'close', None)
+        if stream and close is not None:
+            close()
+
+    def get(self, url, headers=None, stream=False):
         """
         Perform a GET request.
+
+        If a cache is set, the request is made conditional on the cached
+        validators for ``url`` and a ``304`` is answered from the cache.
+        Identical GETs made at the same time share one request through the
+        :attr:`coalescer`. Streamed requests, whose body is read by the
+        caller, bypass both.
         """
+        request_headers = dict(self.headers)
         if headers:
-            self.headers.update(headers)
-        request = requests.get(url, headers=self.headers)
+            request_headers.update(headers)
+
+        if stream:
+            with self._instrumented('GET', url, stream=True) as event:
+                request = self._send('GET', url, headers=request_headers,
+                    stream=True, event=event)
+                return self._check_response_code(request)
+
+        if self.coalescer is not None:
+            return self.coalescer.run(
+                self._coalescing_key(url, request_headers),
+                lambda: self._get(url, request_headers))
+
+        return self._get(url, request_headers)
+
+    def _coalescing_key(self, url, headers):
+        """
+        Get what identifies a GET of ``url`` with ``headers``.
+        """
+        return (canonical_url(url), token_in(url),
+            headers.get('Authorization'))
+
+    def _get(self, url, request_headers):
+        """
+        Perform a GET request, revalidating it against the cache.
+        """
+        with self._instrumented('GET', url) as event:
+            if self.cache is not None:
+                request_headers.update(self.cache.validators(url))
+
+            request = self._send('GET', url, headers=request_headers,
+                event=event)
 
-        return self._check_response_code(request)
+            if self.cache is not None:
+                request = self.cache.update(url, request)
+                if event is not None:
+                    event.cache = 'hit' if getattr(request, 'from_cache',
+                        False) else 'miss'
+
+            return self._check_response_code(request)
 
     def post(self, url, payload=None):
         """
         Perform a POST request.
         """
-        request = requests.post(url,
-            data=payload,
-            headers=self.headers)
+        with self._instrumented('POST', url, payload) as event:
+            request = self._send('POST', url, payload=payload, event=event)
 
-        return self._check_response_code(request)
+            return self._check_response_code(request)
 
     def put(self, url, payload=None):
         """
         Perform a PUT request.
         """
-        request = requests.put(url,
-            data=payload,
-            headers=self.headers)
+        with self._instrumented('PUT', url, payload) as event:
+            request = self._send('PUT', url, payload=payload, event=event)
 
-        return self._check_response_code(request)
+            return self._check_response_code(request)
 
     def delete(self, url, payload=None):
         """
         Perform a DELETE request.
         """
-        request = requests.delete(url,
-            data=payload,
-            headers=self.headers)
+        with self._instrumented('DELETE', url, payload) as event:
+            request = self._send('DELETE', url, payload=payload,
+                event=event)
+
+            return self._check_response_code(request)
+
+    def _perform(self, call):
+        """
+        Make the request described by ``call``.
+        """
+        if call.method == 'GET' and call.stream:
+            return self.get(call.url, headers=call.headers, stream=True)
+        elif call.method == 'GET':
+            return self.get(call.url, headers=call.headers)
+        elif call.method == 'POST':
+            return self.post(call.url, payload=call.payload)
+        elif call.method == 'PUT':
+            return self.put(call.url, payload=call.payload)
+        elif call.method == 'DELETE':
+            return self.delete(call.url, payload=call.payload)
 
-        return self._check_response_code(request)
+        raise ImproperlyConfigured(
+            'Unsupported method {0}.'.format(call.method))
+
+    def _run(self, operation, name=None):
+        """
+        Run an operation to completion, making each request it yields.
+
+        :param name: the operation its requests are reported as. Defaults
+            to the name of ``operation``.
+        """
+        name = current_operation.set(name or operation.__qualname__)
+        try:
+            call = next(operation)
+            while True:
+                call = operation.send(self._perform(call))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            current_operation.reset(name)
 
     def _check_response_code(self, request):
         """
@@ -65,27 +340,123 @@ class Base(object):
 
 
 class Basecamp(Base):
+    """
+    Base class for the API resources.
+
+    :param account_url: API url of the account, eg:
+        ``https://basecamp.com/12345/api/v1``
+    :param access_token: access token obtained from :meth:`Auth.get_token`
+    :param refresh_token: refresh token obtained from :meth:`Auth.get_token`
+    :param transport: a :class:`basecamp.transport.BaseTransport` to send
+        requests through, eg. a :class:`basecamp.transport.Transport` or a
+        :class:`basecamp.http2.HTTP2Transport`. The shared default
+        transport is used if omitted.
+    :param cache: a :class:`basecamp.cache.HTTPCache` to revalidate GET
+        requests against. Responses aren't cached if omitted.
+    :param rate_limiter: a :class:`basecamp.ratelimit.RateLimiter` to pace
+        requests with. Defaults to the limiter shared by every resource
+        using the same account.
+    :param retry_policy: a :class:`basecamp.retry.RetryPolicy` deciding
+        which failed requests are retried. The shared default policy is
+        used if omitted.
+    :param token_manager: a :class:`basecamp.tokens.TokenManager` that
+        refreshes the access token as it expires. The token passed as
+        ``access_token`` is used for as long as it lasts if omitted.
+    :param coalescer: a :class:`basecamp.coalescing.Coalescer` merging
+        identical GETs in flight at the same time. The shared default
+        coalescer is used if omitted; pass ``False`` to send every GET.
+    :param instrumentation: a
+        :class:`basecamp.instrumentation.Instrumentation` whose hooks are
+        told about every request. The shared default instrumentation is
+        used if omitted; pass ``False`` to report nothing.
+    """
 
     endpoint = None
 
-    def __init__(self, account_url, access_token, refresh_token=None):
+    def __init__(self, account_url, access_token, refresh_token=None,
+            transport=None, cache=None, rate_limiter=None,
+            retry_policy=None, token_manager=None, coalescer=None,
+            instrumentation=None):
         self.account_url = account_url
         self.access_token = access_token
         self.refresh_token = refresh_token
+        self.token_manager = token_manager
+
+        if rate_limiter is None:
+            rate_limiter = get_rate_limiter(account_url)
+
+        super(Basecamp, self).__init__(transport=transport, cache=cache,
+            rate_limiter=rate_limiter, retry_policy=retry_policy,
+            coalescer=coalescer, instrumentation=instrumentation)
 
-    def construct_url(self):
+    @property
+    def access_token(self):
+        """
+        The access token sent with requests.
+        """
+        if self.token_manager is not None:
+            return self.token_manager.access_token
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, value):
+        self._access_token = value
+
+    def construct_url(self, endpoint=None, query=None):
         """
         Construct a url with the account url, complete API endpoint and
         the access token as a query string.
+
+        Nothing on the instance is modified, so a single instance can build
+        urls for any number of threads at once.
+
+        :param endpoint: API endpoint, eg: ``projects/1/todos.json``.
+            Defaults to the class :attr:`endpoint`.
+        :param query: optional dictionary of extra query string arguments.
         """
-        if not self.endpoint:
+        endpoint = endpoint or self.endpoint
+        if not endpoint:
             raise ImproperlyConfigured('No endpoint has been set.')
 
-        # strip slashes from the endpoint.
-        self.endpoint = self.endpoint.strip('/')
+        query_args = [('access_token', self.access_token)]
+        if query:
+            query_args.extend(sorted(query.items()))
 
+        # strip slashes from the endpoint.
         return '{0}/{1}?{2}'.format(
             self.account_url,
-            self.endpoint,
-            urllib.parse.urlencode({'access_token': self.access_token})
+            endpoint.strip('/'),
+            urllib.parse.urlencode(query_args)
         )
+
+    def _paginate(self, endpoint, query=None, prefetch=False):
+        """
+        Lazily walk every page of a list endpoint.
+
+        :param endpoint: API endpoint of the list.
+        :param query: optional dictionary of extra query string arguments.
+        :param prefetch: fetch the next page in the background while the
+            current one is being consumed.
+        :rtype: :class:`basecamp.pagination.PageIterator`
+        """
+        # pages are reported as the operation asking for them, whichever
+        # thread fetches them.
+        name = current_operation.get()
+
+        def fetch_page(page):
+            return self._run(self._fetch_page(endpoint, query, page),
+                name=name)
+
+        return PageIterator(fetch_page, prefetch=prefetch)
+
+    def _fetch_page(self, endpoint, query, page):
+        """
+        Operation getting a single page of a list endpoint.
+        """
+        page_query = dict(query or {}, page=page)
+        request = yield Call('GET', self.construct_url(endpoint, page_query))
+
+        if request.status_code == 200:
+            return codec.decode(request)
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
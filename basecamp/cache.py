@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+=====
+Cache
+=====
+
+An in-memory HTTP cache for GET requests.
+
+Basecamp sends an ``ETag`` and/or ``Last-Modified`` header with its
+responses. When a :class:`HTTPCache` is handed to a resource, every GET
+sends the stored validators back as ``If-None-Match`` and
+``If-Modified-Since``. If nothing changed, Basecamp answers with a bodiless
+``304 Not Modified`` and the cached body is served instead, already decoded
+if it was decoded before.
+
+>>> import basecamp.api
+>>> from basecamp.cache import HTTPCache
+>>> cache = HTTPCache(max_entries=5000, max_bytes=64 * 1024 * 1024)
+>>> todos = basecamp.api.Todo(account_url, access_token, cache=cache)
+>>> todos.fetch(project_id=1)  # downloaded
+>>> todos.fetch(project_id=1)  # revalidated, 304, served from the cache
+>>> cache.stats()
+{'entries': 1, 'bytes': 5120, 'hits': 1, 'misses': 1, ...}
+
+Entries are keyed by the url without its ``access_token``, and the least
+recently used entries are evicted once either bound is exceeded.
+
+:class:`IdentityCache` keeps decoded records by id instead, for records
+that are looked up far more often than they change, like people.
+"""
+import threading
+import time
+import urllib.request, urllib.parse, urllib.error
+from collections import OrderedDict
+
+from . import codec
+
+
+def canonical_url(url):
+    """
+    Get ``url`` with the ``access_token`` removed and the remaining query
+    string arguments sorted.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = sorted((key, value) for key, value in
+        urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key != 'access_token')
+
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path,
+        urllib.parse.urlencode(query), ''))
+
+
+class CacheEntry(object):
+    """
+    A cached response body and the validators needed to revalidate it.
+    """
+    __slots__ = ('etag', 'last_modified', 'content', 'headers', 'decoded')
+
+    def __init__(self, etag, last_modified, content, headers):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+        self.headers = headers
+        self.decoded = None
+
+    @property
+    def size(self):
+        return len(self.content or b'')
+
+
+class CachedResponse(object):
+    """
+    A response served from the cache after a ``304 Not Modified``.
+
+    It quacks like a :class:`requests.Response` as far as the resource
+    classes are concerned.
+    """
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, entry):
+        self._entry = entry
+        self.content = entry.content
+        self.headers = entry.headers
+
+    def json(self):
+        """
+        Get the decoded body. It is decoded once and shared by every
+        later hit, so treat it as read only.
+        """
+        if self._entry.decoded is None:
+            self._entry.decoded = codec.loads(self.content)
+        return self._entry.decoded
+
+
+class HTTPCache(object):
+    """
+    A least recently used cache of GET responses.
+
+    :param max_entries: maximum number of responses to keep.
+    :param max_bytes: maximum total size of the cached bodies.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return '<BasecampHTTPCache at 0x%x>' % (id(self))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def validators(self, url):
+        """
+        Get the conditional request headers for ``url``.
+
+        :rtype dictionary: empty if nothing is cached for ``url``.
+        """
+        with self._lock:
+            entry = self._entries.get(canonical_url(url))
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        return headers
+
+    def update(self, url, response):
+        """
+        Update the cache with a response to a GET of ``url``.
+
+        :rtype: a :class:`CachedResponse` if the response was a ``304`` for
+            a cached url, otherwise ``response`` itself.
+        """
+        key = canonical_url(url)
+
+        if response.status_code == 304:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return CachedResponse(entry)
+            return response
+
+        with self._lock:
+            self.misses += 1
+
+        if response.status_code in (404, 410):
+            self.invalidate(url)
+        elif response.status_code == 200:
+            headers = response.headers or {}
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+
+            if etag or last_modified:
+                self._store(key, CacheEntry(etag, last_modified,
+                    response.content, headers))
+
+        return response
+
+    def _store(self, key, entry):
+        if entry.size > self.max_bytes:
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while (len(self._entries) > self.max_entries or
+                    self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, url):
+        """
+        Drop the cached response for ``url``.
+        """
+        with self._lock:
+            entry = self._entries.pop(canonical_url(url), None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        """
+        Drop every cached response.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        :rtype dictionary: number of ``entries``, total ``bytes`` cached,
+            ``hits`` (304s served from the cache), ``misses`` and
+            ``evictions``.
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class IdentityCache(object):
+    """
+    A least recently used map of ids to records, each kept for a limited
+    time.
+
+    The same id maps to the same object until a fresher copy of the record
+    is stored, which replaces it: records already handed out are never
+    changed under their holders. Expired records are no longer served, but
+    stay in place until refreshed or evicted.
+
+    :param max_entries: maximum number of records to keep.
+    :param ttl: seconds a record is served for before it has to be fetched
+        again.
+    :param clock: function returning the current time in seconds.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __repr__(self):
+        return '<BasecampIdentityCache at 0x%x>' % (id(self))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get the record cached for ``key``, or None.
+        """
+        key = str(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] <= self.clock():
+                self.expired += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, record):
+        """
+        Cache ``record`` for ``key``.
+
+        :rtype: ``record``.
+        """
+        key = str(key)
+        expires = self.clock() + self.ttl
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (record, expires)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return record
+
+    def invalidate(self, key):
+        """
+        Drop the record cached for ``key``.
+        """
+        with self._lock:
+            self._entries.pop(str(key), None)
+
+    def clear(self):
+        """
+        Drop every cached record.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        :rtype dictionary: number of ``entries``, ``hits``, ``misses``,
+            ``evictions`` and records dropped because they ``expired``.
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expired': self.expired,
+            }
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+======
+Client
+======
+
+A :class:`BasecampClient` owns everything that should be shared by the
+calls made to one account: a connection pool, an HTTP cache, a rate
+limiter and a retry policy. Each resource is reached through an attribute
+of the client, and every one of them sends its requests through the
+client's shared components.
+
+    >>> import basecamp.api
+    >>> client = basecamp.api.BasecampClient(account_url, access_token)
+    >>> for project in client.projects.fetch():
+    ...     todos = client.todos.fetch(project['id'])
+    >>> client.people.fetch(person='me')
+    >>> client.stats()
+    {'transport': {...}, 'cache': {...}, 'rate_limiter': {...}, ...}
+
+The resources are created once, on first use, and don't keep any state
+between calls, so they can be used from any number of threads at once.
+
+:class:`basecamp.aio.AsyncBasecampClient` is the asyncio counterpart.
+"""
+from .cache import HTTPCache, IdentityCache
+from .coalescing import Coalescer
+from .comments import Comment
+from .documents import Document
+from .events import Event
+from .instrumentation import get_default_instrumentation
+from .people import Person
+from .projects import Project
+from .ratelimit import get_rate_limiter
+from .retry import RetryPolicy
+from .todo_lists import TodoList
+from .todos import Todo
+from .transport import Transport
+
+
+class BasecampClient(object):
+    """
+    One account's resources, sharing one transport, cache and rate limiter.
+
+    :param account_url: API url of the account, eg:
+        ``https://basecamp.com/12345/api/v1``
+    :param access_token: access token obtained from :meth:`Auth.get_token`
+    :param refresh_token: refresh token obtained from :meth:`Auth.get_token`
+    :param transport: transport to send every request through. The client
+        creates its own if omitted.
+    :param cache: :class:`basecamp.cache.HTTPCache` shared by every
+        resource. The client creates its own if omitted; pass ``False`` to
+        disable caching.
+    :param rate_limiter: :class:`basecamp.ratelimit.RateLimiter` pacing
+        every request. Defaults to the limiter shared by everything using
+        the same account.
+    :param retry_policy: :class:`basecamp.retry.RetryPolicy` shared by
+        every resource. The client creates its own if omitted.
+    :param token_manager: :class:`basecamp.tokens.TokenManager` shared by
+        every resource, to have the access token refreshed as it expires.
+    :param coalescer: :class:`basecamp.coalescing.Coalescer` merging the
+        identical GETs of every resource. The client creates its own if
+        omitted; pass ``False`` to send every GET.
+    :param instrumentation: :class:`basecamp.instrumentation.Instrumentation`
+        whose hooks are told about the requests of every resource. The
+        shared default instrumentation is used if omitted; pass ``False`` to
+        report nothing.
+    :param identity_cache: :class:`basecamp.cache.IdentityCache` the
+        ``people`` resource looks people up in. The client creates its own
+        if omitted; pass ``False`` to always fetch people.
+    """
+
+    transport_class = Transport
+
+    resource_classes = {
+        'projects': Project,
+        'todo_lists': TodoList,
+        'todos': Todo,
+        'documents': Document,
+        'comments': Comment,
+        'people': Person,
+        'events': Event,
+    }
+
+    def __init__(self, account_url, access_token, refresh_token=None,
+            transport=None, cache=None, rate_limiter=None,
+            retry_policy=None, token_manager=None, coalescer=None,
+            instrumentation=None, identity_cache=None):
+        self.account_url = account_url
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.token_manager = token_manager
+
+        self.transport = transport or self.transport_class()
+        if cache is None:
+            cache = HTTPCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            account_url)
+        self.retry_policy = retry_policy or RetryPolicy()
+        if coalescer is None:
+            coalescer = Coalescer()
+        self.coalescer = coalescer
+        if instrumentation is None:
+            instrumentation = get_default_instrumentation()
+        self.instrumentation = instrumentation
+        if identity_cache is None:
+            identity_cache = IdentityCache()
+        elif identity_cache is False:
+            identity_cache = None
+        self.identity_cache = identity_cache
+
+        self._resources = {}
+
+    def __repr__(self):
+        return '<BasecampClient {0} at 0x{1:x}>'.format(
+            self.account_url, id(self))
+
+    def resource(self, name):
+        """
+        Get the resource called ``name``, eg. ``'todos'``.
+        """
+        resource = self._resources.get(name)
+
+        if resource is None:
+            resource_class = self.resource_classes[name]
+            options = {}
+            if issubclass(resource_class, Person):
+                options['identity_cache'] = self.identity_cache
+
+            resource = resource_class(
+                self.account_url,
+                self.access_token,
+                self.refresh_token,
+                transport=self.transport,
+                cache=self.cache,
+                rate_limiter=self.rate_limiter,
+                retry_policy=self.retry_policy,
+                token_manager=self.token_manager,
+                coalescer=self.coalescer,
+                instrumentation=self.instrumentation,
+                **options)
+            # a lost race only costs a second, identical instance.
+            resource = self._resources.setdefault(name, resource)
+
+        return resource
+
+    @property
+    def projects(self):
+        """
+        :class:`basecamp.projects.Project` resource.
+        """
+        return self.resource('projects')
+
+    @property
+    def todo_lists(self):
+        """
+        :class:`basecamp.todo_lists.TodoList` resource.
+        """
+        return self.resource('todo_lists')
+
+    @property
+    def todos(self):
+        """
+        :class:`basecamp.todos.Todo` resource.
+        """
+        return self.resource('todos')
+
+    @property
+    def documents(self):
+        """
+        :class:`basecamp.documents.Document` resource.
+        """
+        return self.resource('documents')
+
+    @property
+    def comments(self):
+        """
+        :class:`basecamp.comments.Comment` resource.
+        """
+        return self.resource('comments')
+
+    @property
+    def people(self):
+        """
+        :class:`basecamp.people.Person` resource.
+        """
+        return self.resource('people')
+
+    @property
+    def events(self):
+        """
+        :class:`basecamp.events.Event` resource.
+        """
+        return self.resource('events')
+
+    def stats(self):
+        """
+        Get the statistics of every shared component.
+        """
+        return {
+            'transport': self.transport.stats(),
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'rate_limiter': self.rate_limiter.stats(),
+            'retry': self.retry_policy.stats(),
+            'identity_cache': self.identity_cache.stats()
+                if self.identity_cache is not None else None,
+            'coalescer': self.coalescer.stats() if self.coalescer else None,
+            'tokens': self.token_manager.stats()
+                if self.token_manager is not None else None,
+        }
+
+    def close(self):
+        """
+        Close the client's connections.
+        """
+        return self.transport.close()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+==========
+Coalescing
+==========
+
+Single-flight GET requests.
+
+When a pool of workers starts, they tend to ask for the same things at
+once: the project list, the same people. A :class:`Coalescer` lets the
+first GET of a url go out and makes every identical GET started before it
+returns wait for that response instead of sending its own. The decoded
+body is shared too, so it is decoded once however many callers read it.
+
+Every resource shares one coalescer by default:
+
+    >>> from basecamp.coalescing import get_default_coalescer
+    >>> get_default_coalescer().stats()
+    {'hits': 118, 'misses': 40, 'in_flight': 2}
+
+``hits`` is the number of requests that were never sent. Requests are
+identical when they have the same access token and the same
+:func:`basecamp.cache.canonical_url`. Only GETs are coalesced; streamed
+GETs, whose body can only be read once, aren't.
+"""
+import asyncio
+import threading
+
+from . import codec
+
+
+class SharedResponse(object):
+    """
+    A response handed to every caller of a coalesced request.
+
+    Its body is decoded once, by the first caller that needs it, and the
+    result is shared, so treat it as read only.
+    """
+    shared = True
+
+    def __init__(self, response):
+        self.response = response
+        self.status_code = response.status_code
+        self.content = response.content
+        self.headers = getattr(response, 'headers', None)
+
+        self._decoded = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<BasecampSharedResponse [{0}]>'.format(self.status_code)
+
+    def json(self):
+        """
+        Get the decoded body.
+        """
+        if self._decoded is None:
+            with self._lock:
+                if self._decoded is None:
+                    self._decoded = codec.loads(self.content)
+        return self._decoded
+
+
+def _share(response):
+    if getattr(response, 'from_cache', False) or \
+            isinstance(response, SharedResponse):
+        # already decoded at most once.
+        return response
+    return SharedResponse(response)
+
+
+class _Flight(object):
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer(object):
+    """
+    Runs at most one call per key at a time, sharing its outcome with
+    every caller that asks for the same key meanwhile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._futures = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return '<BasecampCoalescer at 0x%x>' % (id(self))
+
+    def run(self, key, func):
+        """
+        Get ``func()``, or wait for and share the outcome of the call
+        already running for ``key``.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = _share(func())
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+        return flight.result
+
+    async def run_async(self, key, func):
+        """
+        Asynchronous :meth:`run`, ``func`` returning an awaitable.
+        """
+        key = (id(asyncio.get_running_loop()), key)
+
+        future = self._futures.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        future = self._futures[key] = \
+            asyncio.get_running_loop().create_future()
+        self.misses += 1
+
+        try:
+            result = _share(await func())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # nobody may be waiting, don't warn about it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[key]
+
+    def stats(self):
+        """
+        Get coalescing statistics.
+
+        :rtype dictionary: ``hits``, calls that shared another's outcome,
+            ``misses``, calls that ran, and the number of calls
+            ``in_flight`` right now.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'in_flight': len(self._flights) + len(self._futures),
+            }
+
+
+_default_coalescer = None
+_default_lock = threading.Lock()
+
+
+def get_default_coalescer():
+    """
+    Get the coalescer shared by every resource that isn't given one.
+    """
+    global _default_coalescer  # pylint: disable=W0603
+
+    if _default_coalescer is None:
+        with _default_lock:
+            if _default_coalescer is None:
+                _default_coalescer = Coalescer()
+
+    return _default_coalescer
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+=====
+Codec
+=====
+
+Every JSON body the package sends or receives goes through the codec
+chosen here.
+
+Decoding large list responses is where most of the CPU time of a sync
+goes, so when `orjson <https://github.com/ijl/orjson>`_ is installed it is
+used instead of the standard library::
+
+    pip install orjson
+
+Response bodies are decoded straight from the bytes read off the socket,
+without first being copied into a ``str``. Responses served from the
+:class:`basecamp.cache.HTTPCache` or shared by coalesced requests are
+decoded once and the result shared by everyone reading them, so treat
+decoded records as read only.
+
+The codec can be chosen explicitly, eg. to compare them:
+
+    >>> from basecamp import codec
+    >>> codec.get_codec().name
+    'orjson'
+    >>> codec.set_codec('json')
+"""
+import json
+
+
+class JSONCodec(object):
+    """
+    Codec using the standard library :mod:`json` module.
+    """
+    name = 'json'
+
+    def __repr__(self):
+        return '<BasecampCodec {0}>'.format(self.name)
+
+    def loads(self, data):
+        """
+        Decode ``data``, bytes or text.
+        """
+        # bytes are decoded as UTF-8, UTF-16 or UTF-32 by json itself.
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """
+        Encode ``obj`` as compact JSON text.
+        """
+        return json.dumps(obj, separators=(',', ':'))
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec using orjson.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+        """
+        Decode ``data``, bytes or text.
+        """
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        """
+        Encode ``obj`` as compact JSON text.
+        """
+        return self._orjson.dumps(obj).decode('utf-8')
+
+
+CODECS = {
+    'orjson': OrjsonCodec,
+    'json': JSONCodec,
+}
+
+# fastest first.
+PREFERENCE = ('orjson', 'json')
+
+
+def _select():
+    for name in PREFERENCE:
+        try:
+            return CODECS[name]()
+        except ImportError:
+            continue
+
+
+_codec = _select()
+
+
+def get_codec():
+    """
+    Get the codec in use.
+    """
+    return _codec
+
+
+def set_codec(codec=None):
+    """
+    Use ``codec`` for every JSON body.
+
+    :param codec: the name of a codec in :data:`CODECS`, an object with
+        ``loads`` and ``dumps`` methods, or None to go back to the fastest
+        installed one.
+    """
+    global _codec  # pylint: disable=W0603
+
+    if codec is None:
+        codec = _select()
+    elif isinstance(codec, str):
+        codec = CODECS[codec]()
+
+    _codec = codec
+
+
+def loads(data):
+    """
+    Decode JSON ``data``, bytes or text.
+    """
+    return _codec.loads(data)
+
+
+def dumps(obj):
+    """
+    Encode ``obj`` as JSON text.
+    """
+    return _codec.dumps(obj)
+
+
+def decode(response):
+    """
+    Decode the body of ``response``.
+    """
+    if getattr(response, 'from_cache', False) or \
+            getattr(response, 'shared', False):
+        return response.json()
+    return _codec.loads(response.content)
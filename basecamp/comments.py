@@ -1,5 +1,5 @@
-import json
-from .base import Basecamp
+from . import codec
+from .base import Basecamp, Call, operation
 from .exceptions import BasecampAPIError
 
 
@@ -9,6 +9,7 @@ class Comment(Basecamp):
     """
     endpoint = 'projects'
 
+    @operation
     def create(self, project_id, topic, topic_id, content, subscribers=[]):
         """
         Create a new Comment list in a basecamp account.
@@ -25,7 +26,7 @@ class Comment(Basecamp):
         >>> api = basecamp.api.CommentList(account_url, access_token)
         >>> Comment_items = api.create('My New List', 'New stuff to do')
         """
-        self.endpoint = '{0}/{1}/{2}/{3}/comments.json'.format(
+        endpoint = '{0}/{1}/{2}/{3}/comments.json'.format(
             self.endpoint,
             project_id,
             topic,
@@ -36,10 +37,11 @@ class Comment(Basecamp):
             'subcribers': subscribers
         }
 
-        request = self.post(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('POST', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 201:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create Comment lists
             # or reached the Comment list limit
@@ -47,6 +49,7 @@ class Comment(Basecamp):
 
         raise BasecampAPIError(request.content)
 
+    @operation
     def remove(self, project_id, comment_id):
         """
         Remove a Comment list
@@ -61,11 +64,11 @@ class Comment(Basecamp):
         >>> api = basecamp.api.Comment list(account_url, access_token)
         >>> removed = api.remove(675)
         """
-        self.endpoint = '{0}/{1}/comments/{2}.json'.format(
+        endpoint = '{0}/{1}/comments/{2}.json'.format(
             self.endpoint,
             project_id,
             comment_id)
-        request = self.delete(self.construct_url())
+        request = yield Call('DELETE', self.construct_url(endpoint))
 
         if request.status_code == 204:
             return True
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+=======
+Crawler
+=======
+
+Export a snapshot of a whole account as newline delimited JSON.
+
+The :class:`Crawler` walks projects, archived ones included, then the todo
+lists of each project, completed ones included, the todos of each list,
+the documents of each project and the comments on todos and documents.
+Every fetch is a task on a bounded thread pool, and every record is
+written out the moment it arrives, so memory use doesn't grow with the
+size of the account. All requests go through the client's rate limiter.
+
+    >>> import basecamp.api
+    >>> from basecamp.crawler import Crawler
+    >>> client = basecamp.api.BasecampClient(account_url, access_token)
+    >>> crawler = Crawler(client, 'snapshot.jsonl', workers=16,
+    ...     state_path='snapshot.state', progress=print)
+    >>> crawler.run()
+    {'projects': 12, 'records': 48211, 'records_per_second': 312.4, ...}
+
+Each line of the output looks like::
+
+    {"type": "todo", "project_id": 1, "parent_type": "todolist",
+     "parent_id": 10, "data": {...}}
+
+where ``type`` is one of ``project``, ``todolist``, ``todo``, ``document``
+or ``comment`` and ``parent_type`` and ``parent_id`` identify the
+project, todo list, todo or document the record belongs to.
+
+Records can be sent somewhere other than a file by passing a ``sink``: any
+object with ``write(record)``, ``flush()`` and ``close()`` methods, like
+:class:`JSONLWriter`. :class:`basecamp.mirror.Mirror` loads its database
+this way.
+
+If ``state_path`` is given, the id of each project is recorded there once
+all of its records have been written. Running the crawler again after a
+crash skips those projects and appends to the output. Records of projects
+that were in progress when it crashed are written again, so deduplicate on
+``type`` and ``data['id']`` if that matters.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import codec
+
+
+class JSONLWriter(object):
+    """
+    Thread-safe writer of one JSON document per line.
+
+    :param output: path of the file to append to, or an open text file.
+    """
+
+    def __init__(self, output):
+        if hasattr(output, 'write'):
+            self._file = output
+            self._owned = False
+        else:
+            self._file = open(output, 'a', encoding='utf-8')
+            self._owned = True
+
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def write(self, record):
+        """
+        Write ``record`` as one line.
+        """
+        line = codec.dumps(record) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self.written += 1
+
+    def flush(self):
+        """
+        Flush written lines to disk.
+        """
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """
+        Close the file, if this writer opened it.
+        """
+        self.flush()
+        if self._owned:
+            self._file.close()
+
+
+class CrawlState(object):
+    """
+    The set of projects that have been completely exported.
+
+    :param path: path of the JSON file the state is kept in, or None to
+        keep it in memory only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.completed = set()
+
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as state_file:
+                self.completed = set(
+                    json.load(state_file).get('completed', []))
+
+    def complete(self, project_id):
+        """
+        Record ``project_id`` as done.
+        """
+        self.completed.add(project_id)
+
+        if self.path:
+            # write then rename, so a crash never leaves a torn file.
+            temp_path = '{0}.tmp'.format(self.path)
+            with open(temp_path, 'w', encoding='utf-8') as state_file:
+                json.dump({'completed': sorted(self.completed)}, state_file)
+            os.replace(temp_path, self.path)
+
+
+class Crawler(object):
+    """
+    Walk an account and stream every record to newline delimited JSON.
+
+    :param client: a :class:`basecamp.client.BasecampClient`.
+    :param output: path of the JSONL file to append to, or an open file.
+    :param sink: object receiving the records instead of ``output``.
+    :param workers: number of requests made at once.
+    :param state_path: path of a file to record completed projects in, so
+        an interrupted crawl can be resumed.
+    :param progress: optional callable, passed :meth:`stats` after every
+        completed project and at most every ``progress_interval`` seconds
+        as records arrive.
+    :param comments: also export comments on todos and documents. This
+        takes one extra request for every todo and document that has any.
+    :param archived: also export archived projects.
+    :param completed: also export completed todo lists.
+    """
+
+    def __init__(self, client, output=None, workers=8, state_path=None,
+            progress=None, progress_interval=5.0, comments=True, sink=None,
+            archived=True, completed=True):
+        if output is None and sink is None:
+            raise ValueError('Either output or sink is needed.')
+
+        self.client = client
+        self.output = output
+        self.sink = sink
+        self.workers = workers
+        self.state = CrawlState(state_path)
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.comments = comments
+        self.archived = archived
+        self.completed = completed
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = {}
+        self._outstanding = 0
+        self._failed = {}
+        self._counts = {}
+        self._projects_done = 0
+        self._projects_skipped = 0
+        self._started = None
+        self._last_progress = 0.0
+        self._writer = None
+        self._executor = None
+
+    def __repr__(self):
+        return '<BasecampCrawler at 0x%x>' % (id(self))
+
+    def run(self):
+        """
+        Crawl the account.
+
+        :rtype dictionary: the final :meth:`stats`.
+        """
+        self._started = time.monotonic()
+        self._writer = self.sink or JSONLWriter(self.output)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        try:
+            for project in self._projects():
+                if project['id'] in self.state.completed:
+                    self._projects_skipped += 1
+                    continue
+
+                with self._lock:
+                    self._pending[project['id']] = 0
+                self._emit('project', project['id'], None, None, project)
+                self._submit(project['id'], self._crawl_project, project)
+
+            with self._idle:
+                while self._outstanding:
+                    self._idle.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._writer.close()
+
+        return self.stats()
+
+    def stats(self):
+        """
+        Get the progress of the crawl.
+
+        :rtype dictionary: ``projects`` completed in this run,
+            ``projects_skipped`` because an earlier run completed them,
+            ``projects_failed``, total ``records`` written and a count
+            per record type, ``requests`` sent, ``elapsed`` seconds and the
+            ``records_per_second`` and ``requests_per_second`` throughput.
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        requests = self.client.transport.stats().get('requests', 0)
+
+        with self._lock:
+            records = sum(self._counts.values())
+            stats = {
+                'projects': self._projects_done,
+                'projects_skipped': self._projects_skipped,
+                'projects_failed': len(self._failed),
+                'in_progress': len(self._pending),
+                'records': records,
+                'requests': requests,
+                'elapsed': elapsed,
+                'records_per_second': records / elapsed if elapsed else 0.0,
+                'requests_per_second': requests / elapsed if elapsed else 0.0,
+            }
+            stats.update(self._counts)
+
+        return stats
+
+    @property
+    def failed(self):
+        """
+        Dictionary of project id to the exception that stopped its export.
+        Failed projects aren't recorded as completed, so they are crawled
+        again when resuming.
+        """
+        return dict(self._failed)
+
+    def _emit(self, record_type, project_id, parent_type, parent_id, data):
+        self._writer.write({
+            'type': record_type,
+            'project_id': project_id,
+            'parent_type': parent_type,
+            'parent_id': parent_id,
+            'data': data,
+        })
+
+        report = False
+        with self._lock:
+            self._counts[record_type] = self._counts.get(record_type, 0) + 1
+            now = time.monotonic()
+            if self.progress and \
+                    now - self._last_progress >= self.progress_interval:
+                self._last_progress = now
+                report = True
+
+        if report:
+            self.progress(self.stats())
+
+    def _submit(self, project_id, func, *args):
+        with self._lock:
+            self._pending[project_id] += 1
+            self._outstanding += 1
+
+        self._executor.submit(self._task, project_id, func, *args)
+
+    def _task(self, project_id, func, *args):
+        try:
+            if project_id not in self._failed:
+                func(project_id, *args)
+        except Exception as error:  # pylint: disable=W0703
+            with self._lock:
+                self._failed.setdefault(project_id, error)
+        finally:
+            self._task_done(project_id)
+
+    def _task_done(self, project_id):
+        completed = False
+
+        with self._lock:
+            self._pending[project_id] -= 1
+            if not self._pending[project_id]:
+                del self._pending[project_id]
+                completed = project_id not in self._failed
+
+        if completed:
+            # everything of this project is written, make it durable.
+            self._writer.flush()
+            self.state.complete(project_id)
+            with self._lock:
+                self._projects_done += 1
+            if self.progress:
+                self.progress(self.stats())
+
+        with self._idle:
+            self._outstanding -= 1
+            if not self._outstanding:
+                self._idle.notify_all()
+
+    def _projects(self):
+        projects = self.client.projects.fetch(lazy=True)
+        if self.archived:
+            projects = itertools.chain(projects,
+                self.client.projects.fetch(archived=True, lazy=True))
+        return projects
+
+    def _crawl_project(self, project_id, project):
+        todo_lists = self.client.todo_lists.fetch(project_id, lazy=True)
+        if self.completed:
+            todo_lists = itertools.chain(todo_lists,
+                self.client.todo_lists.fetch(project_id,
+                    todo_list_filter='completed', lazy=True))
+
+        for todo_list in todo_lists:
+            self._emit('todolist', project_id, 'project', project_id,
+                todo_list)
+            self._submit(project_id, self._crawl_todo_list, todo_list)
+
+        for document in self.client.documents.fetch(project_id=project_id,
+                lazy=True):
+            self._emit('document', project_id, 'project', project_id,
+                document)
+            if self.comments and document.get('comments_count'):
+                self._submit(project_id, self._crawl_document, document)
+
+    def _crawl_todo_list(self, project_id, todo_list):
+        for todo in self.client.todos.fetch(project_id,
+                todo_list_id=todo_list['id'], lazy=True):
+            self._emit('todo', project_id, 'todolist', todo_list['id'],
+                todo)
+            if self.comments and todo.get('comments_count'):
+                self._submit(project_id, self._crawl_todo, todo)
+
+    def _crawl_todo(self, project_id, todo):
+        detail = self.client.todos.fetch(project_id, todo_id=todo['id'])
+        for comment in (detail or {}).get('comments', []):
+            self._emit('comment', project_id, 'todo', todo['id'], comment)
+
+    def _crawl_document(self, project_id, document):
+        detail = self.client.documents.fetch(document_id=document['id'],
+            project_id=project_id)
+        for comment in (detail or {}).get('comments', []):
+            self._emit('comment', project_id, 'document', document['id'],
+                comment)
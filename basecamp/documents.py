@@ -8,8 +8,9 @@ Documents
 For more information, please see the official Basecamp API documentation on
 `documents <https://github.com/37signals/bcx-api/blob/master/sections/documents.md>`_
 """
-import json
-from .base import Basecamp
+from . import codec
+from . import streaming
+from .base import Basecamp, Call, operation
 from .exceptions import BasecampAPIError
 
 
@@ -17,13 +18,22 @@ class Document(Basecamp):
     """
     Actions on a document
     """
-    def fetch(self, document_id=None, project_id=None):
+    @operation
+    def fetch(self, document_id=None, project_id=None, lazy=False,
+            prefetch=False, stream=False, fields=None):
         """
         Get a specific document, or a list of documents, either by project, or
         all documents a user has access to in the basecamp account.
 
         :param document_id: integer of document
         :param project_id: integer of project
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of the list on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
+        :param stream: return an iterator decoding the documents one by one\
+        as the response arrives, see :mod:`basecamp.streaming`.
+        :param fields: with ``stream``, the keys to keep in each document,\
+        eg. ``('id', 'title')`` to never read the ``content`` of any.
         :rtype dictionary: Dictionary of documents, or a single document.
 
         .. note::
@@ -74,22 +84,30 @@ class Document(Basecamp):
 
         """
         if not document_id and not project_id:
-            self.endpoint = 'documents.json'
+            endpoint = 'documents.json'
         elif not document_id and project_id:
-            self.endpoint = 'projects/{0}/documents.json'.format(project_id)
+            endpoint = 'projects/{0}/documents.json'.format(project_id)
         elif document_id and project_id:
-            self.endpoint = 'projects/{0}/documents/{1}.json'.format(
+            endpoint = 'projects/{0}/documents/{1}.json'.format(
                 project_id, document_id)
         else:
             raise BasecampAPIError()
 
-        request = self.get(self.construct_url())
+        if not document_id and (lazy or prefetch):
+            return self._paginate(endpoint, prefetch=prefetch)
 
-        if request.status_code == 200:
-            return json.loads(request.content)
+        stream = stream and not document_id
+        request = yield Call('GET', self.construct_url(endpoint),
+            stream=stream)
+
+        if request.status_code == 200 and stream:
+            return streaming.iter_records(request, fields)
+        elif request.status_code == 200:
+            return codec.decode(request)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+        raise BasecampAPIError(codec.decode(request).get('error'))
 
+    @operation
     def create(self, project_id, title, content):
         """
         Create a new document.
@@ -112,22 +130,23 @@ class Document(Basecamp):
             document from :meth:`fetch`
         """
 
-        self.endpoint = 'projects/{0}/documents.json'.format(project_id)
+        endpoint = 'projects/{0}/documents.json'.format(project_id)
 
         data = dict(
             title=title,
             content=content
         )
 
-        request = self.post(self.construct_url(),
-            payload=json.dumps(data))
+        request = yield Call('POST', self.construct_url(endpoint),
+            codec.dumps(data))
         if request.status_code == 201:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             raise BasecampAPIError()
 
         raise BasecampAPIError()
 
+    @operation
     def update(self, project_id, document_id, title, content):
         """
         Update a document.
@@ -151,21 +170,22 @@ class Document(Basecamp):
             document from :meth:`fetch`
 
         """
-        self.endpoint = 'projects/{0}/documents/{1}.json'.format(
+        endpoint = 'projects/{0}/documents/{1}.json'.format(
             project_id, document_id)
 
         data = dict(
             title=title,
             content=content
         )
-        request = self.put(self.construct_url(),
-            payload=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
 
         raise BasecampAPIError()
 
+    @operation
     def remove(self, project_id, document_id):
         """
         Delete a document from the project/account
@@ -187,10 +207,10 @@ class Document(Basecamp):
             :class::`BasecampAPIError` exception will be raised.
 
         """
-        self.endpoint = 'projects/{0}/{1}.json'.format(
+        endpoint = 'projects/{0}/documents/{1}.json'.format(
             project_id, document_id)
 
-        request = self.delete(self.construct_url())
+        request = yield Call('DELETE', self.construct_url(endpoint))
 
         if request.status_code == 204:
             return True
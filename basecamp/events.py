@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+======
+Events
+======
+
+Everything that happens in an account, newest first. Events are the way to
+find out what changed since a given time without re-reading every project.
+
+A typical event looks like:
+
+::
+
+    {
+        "id": 955814467,
+        "summary": "re-assigned a to-do to Jason Fried: Design it",
+        "action": "re-assigned a to-do to Jason Fried",
+        "created_at": "2012-03-24T11:00:40-05:00",
+        "updated_at": "2012-03-24T11:00:40-05:00",
+        "bucket": {"id": 605816632, "name": "BCX", "type": "Project"},
+        "eventable": {
+            "id": 223304243,
+            "type": "Todo",
+            "url": "https://basecamp.com/1/api/v1/projects/1/todos/223.json"
+        },
+        "creator": {"id": 149087659, "name": "Jason Fried"}
+    }
+
+See `the Basecamp API docs
+<https://github.com/37signals/bcx-api/blob/master/sections/events.md>`_
+on events for more info.
+"""
+import urllib.parse
+
+from . import codec
+from .base import Basecamp, Call, operation
+from .exceptions import BasecampAPIError
+
+
+class Event(Basecamp):
+    """
+    Operations on the events of an account or project.
+    """
+    endpoint = 'events.json'
+
+    @operation
+    def fetch(self, since, project_id=None, lazy=False, prefetch=False):
+        """
+        Get the events created after ``since``, newest first.
+
+        :param since: ISO 8601 timestamp, eg.
+            ``2012-03-24T11:00:00-06:00``.
+        :param project_id: only get the events of this project.
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of events on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
+        :rtype list: list of events.
+
+        >>> import basecamp.api
+        >>> account_url = 'https://basecamp.com/12345/api/v1'
+        >>> access_token = 'access_token'
+        >>> api = basecamp.api.Event(account_url, access_token)
+        >>> events = api.fetch('2012-03-24T11:00:00-06:00', lazy=True)
+        """
+        if project_id:
+            endpoint = 'projects/{0}/events.json'.format(project_id)
+        else:
+            endpoint = self.endpoint
+
+        query = {'since': since}
+
+        if lazy or prefetch:
+            return self._paginate(endpoint, query, prefetch=prefetch)
+
+        request = yield Call('GET', self.construct_url(endpoint, query))
+
+        if request.status_code == 200:
+            return codec.decode(request)
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
+
+    @operation
+    def fetch_eventable(self, event):
+        """
+        Get the current state of the todo, document, comment, etc. an event
+        is about.
+
+        :param event: an event from :meth:`fetch`.
+        :rtype dictionary: the record, or None if it no longer exists.
+        :raises ValueError: if the record isn't one of this account's.
+        """
+        url = urllib.parse.urlsplit(event['eventable']['url'])
+        account = urllib.parse.urlsplit(self.account_url)
+        prefix = account.path.rstrip('/') + '/'
+
+        # the scheme may differ, the account may not.
+        if url.netloc.lower() != account.netloc.lower() or \
+                not url.path.startswith(prefix):
+            raise ValueError('{0} is not a url of {1}.'.format(
+                event['eventable']['url'], self.account_url))
+        endpoint = url.path[len(prefix):]
+
+        request = yield Call('GET', self.construct_url(endpoint))
+
+        if request.status_code == 200:
+            return codec.decode(request)
+        elif request.status_code in (403, 404, 410):
+            return None
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
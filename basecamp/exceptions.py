@@ -14,3 +14,10 @@ class ImproperlyConfigured(RuntimeError):
     Some kind of issue setting up the API call.
     """
     pass
+
+
+class ReplayMiss(ImproperlyConfigured):
+    """
+    A request that isn't in the cassette being replayed.
+    """
+    pass
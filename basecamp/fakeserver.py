@@ -0,0 +1,961 @@
+# -*- coding: utf-8 -*-
+"""
+===========
+Fake server
+===========
+
+A stand-in for Basecamp and Launchpad, served from a local socket, for
+testing and benchmarking with real connections on a machine with no
+network.
+
+    >>> from basecamp.fakeserver import FakeBasecamp
+    >>> with FakeBasecamp(todos=500, latency=0.02, rate_limit=100) as server:
+    ...     client = basecamp.api.BasecampClient(server.account_url,
+    ...         server.access_token)
+    ...     todos = list(client.todos.fetch(server.project_ids[0], lazy=True))
+
+It serves the endpoints of the Basecamp API the resources use (projects,
+todo lists, todos, documents, comments, people and events) from records
+generated at start, and keeps the changes made through it. Urls the API
+doesn't serve are answered with a 404, as Basecamp does. Launchpad's ``authorization.json``
+and ``authorization/token`` are served under :attr:`FakeBasecamp.
+launchpad_url`; point :attr:`basecamp.auth.Auth.auth_base_url` at it.
+
+Like Basecamp, it:
+
+- answers lists a page at a time, ``?page=2`` for the second;
+- sends an ``ETag`` with every ``GET`` and answers a matching
+  ``If-None-Match`` with ``304 Not Modified``;
+- answers requests beyond ``rate_limit`` per ``rate_period`` seconds for an
+  access token with ``429 Too Many Requests`` and a ``Retry-After``;
+- answers requests without a valid access token with ``401``;
+- keeps connections alive.
+
+On top of that it can wait ``latency`` seconds (plus up to ``jitter``)
+before answering, fail a random ``error_rate`` of the requests, or the
+next few ones with :meth:`FakeBasecamp.fail_next`. :meth:`FakeBasecamp.
+stats` counts what it answered.
+"""
+import collections
+import email.utils
+import hashlib
+import http.server
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+import urllib.request, urllib.parse, urllib.error
+
+
+EPOCH = 1388577600  # 2014-01-01
+
+# the ``eventable`` type Basecamp reports for each kind of record.
+EVENTABLE_TYPES = {
+    'projects': 'Project',
+    'todo_lists': 'Todolist',
+    'todos': 'Todo',
+    'documents': 'Document',
+    'comments': 'Comment',
+}
+
+
+def _timestamp(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(seconds))
+
+
+class FakeBasecamp(object):
+    """
+    A fake Basecamp account and Launchpad, served over HTTP.
+
+    :param host: address to listen on.
+    :param port: port to listen on, bound as soon as the server is
+        created; a free one if 0.
+    :param account_id: id of the account, part of :attr:`account_url`.
+    :param projects: number of projects created at start.
+    :param todo_lists: number of todo lists in each project.
+    :param todos: number of todos in each todo list.
+    :param documents: number of documents in each project.
+    :param people: number of people in the account.
+    :param page_size: records in a page of a list. Basecamp sends 50, which
+        is what :class:`basecamp.pagination.PageIterator` expects.
+    :param latency: seconds to wait before answering each request.
+    :param jitter: up to this many more seconds, at random.
+    :param error_rate: fraction of requests answered with
+        ``error_status``, at random.
+    :param error_status: status of injected errors.
+    :param rate_limit: requests allowed per access token in each
+        ``rate_period``, or None for no limit.
+    :param rate_period: length of the rate limit period, in seconds.
+    :param token_ttl: seconds the access tokens issued by Launchpad are
+        valid for.
+    :param seed: seed of the random choices, for repeatable runs.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, account_id=999999999,
+            projects=3, todo_lists=2, todos=60, documents=5, people=10,
+            page_size=50, latency=0.0, jitter=0.0, error_rate=0.0,
+            error_status=500, rate_limit=None, rate_period=10.0,
+            token_ttl=1209600, seed=0):
+        self.host = host
+        self.port = port
+        self.account_id = account_id
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.token_ttl = token_ttl
+
+        self.client_id = 'fake-client-id'
+        self.client_secret = 'fake-client-secret'
+        self.access_token = 'fake-access-token'
+        self.refresh_token = 'fake-refresh-token'
+        self.code = 'fake-code'
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._thread = None
+
+        fake = self
+
+        class Handler(_Handler):
+            app = fake
+
+        # bound now, so the urls in the records carry the real port.
+        self._server = _Server((host, port), Handler)
+        self.port = self._server.server_address[1]
+
+        # access token -> expiry, or None for the initial token.
+        self._tokens = {self.access_token: None}
+        self._refresh_tokens = {self.refresh_token}
+        self._sent = collections.defaultdict(collections.deque)
+        self._failures = collections.deque()
+        self._ids = iter(range(1000, 10 ** 9))
+
+        self.people = {}
+        self.projects = {}
+        self.todo_lists = {}
+        self.todos = {}
+        self.documents = {}
+        self.comments = {}
+        self.events = []
+        # (kind, id) of a record -> id of its project.
+        self._projects_of = {}
+        # (kind, id) of a topic -> ids of its comments.
+        self._comments_of = collections.defaultdict(list)
+
+        self._stats = collections.Counter()
+
+        self._populate(projects, todo_lists, todos, documents, people)
+
+    def __repr__(self):
+        return '<BasecampFakeServer at 0x%x>' % (id(self))
+
+    # -- serving
+
+    def start(self):
+        """
+        Start serving from a daemon thread.
+
+        :rtype: the server itself.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self):
+        """
+        Root url of the server.
+        """
+        return 'http://{0}:{1}'.format(self.host, self.port)
+
+    @property
+    def account_url(self):
+        """
+        API url of the account, to build resources with.
+        """
+        return '{0}/{1}/api/v1'.format(self.url, self.account_id)
+
+    @property
+    def launchpad_url(self):
+        """
+        Url to use as :attr:`basecamp.auth.Auth.auth_base_url`.
+        """
+        return '{0}/launchpad/'.format(self.url)
+
+    @property
+    def project_ids(self):
+        """
+        Ids of the projects, oldest first.
+        """
+        with self._lock:
+            return sorted(self.projects)
+
+    # -- faults
+
+    def fail_next(self, count=1, status=500, retry_after=None):
+        """
+        Answer the next ``count`` requests with ``status``.
+
+        :param retry_after: ``Retry-After`` seconds to send with them.
+        """
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def expire(self, access_token=None):
+        """
+        Make ``access_token``, the initial one if omitted, invalid.
+        """
+        with self._lock:
+            self._tokens.pop(access_token or self.access_token, None)
+
+    def stats(self):
+        """
+        Get serving statistics.
+
+        :rtype dictionary: number of ``requests`` answered, ``connections``
+            accepted, ``not_modified`` answers, ``rate_limited`` ones,
+            ``injected`` errors, ``unauthorized`` requests, and the number of
+            answers with each status, eg. ``status_200``.
+        """
+        with self._lock:
+            stats = dict.fromkeys(('requests', 'connections', 'not_modified',
+                'rate_limited', 'injected', 'unauthorized'), 0)
+            stats.update(self._stats)
+            return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    # -- records
+
+    def _next_id(self):
+        return next(self._ids)
+
+    def _api_url(self, path):
+        return '{0}/{1}'.format(self.account_url, path)
+
+    def _app_url(self, path):
+        return '{0}/{1}/{2}'.format(self.url, self.account_id,
+            path.rsplit('.json', 1)[0])
+
+    def _short_person(self, person_id):
+        person = self.people[person_id]
+        return {'id': person_id, 'name': person['name'], 'type': 'Person',
+            'avatar_url': person['avatar_url'],
+            'fullsize_avatar_url': person['fullsize_avatar_url']}
+
+    def _bucket(self, project_id):
+        project = self.projects[project_id]
+        return {'id': project_id, 'name': project['name'], 'type': 'Project',
+            'url': project['url'], 'app_url': project['app_url']}
+
+    def _author(self):
+        return self._short_person(self._random.choice(sorted(self.people)))
+
+    def _populate(self, projects, todo_lists, todos, documents, people):
+        for index in range(max(people, 1)):
+            person_id = self._next_id()
+            self.people[person_id] = {
+                'id': person_id,
+                'identity_id': person_id + 10 ** 6,
+                'name': 'Person {0}'.format(index),
+                'email_address': 'person{0}@example.com'.format(index),
+                'admin': index == 0,
+                'avatar_url': 'https://example.com/{0}/avatar.96.gif'.format(
+                    person_id),
+                'fullsize_avatar_url': 'https://example.com/{0}/avatar.gif'
+                    .format(person_id),
+                'created_at': _timestamp(EPOCH + index),
+                'updated_at': _timestamp(EPOCH + index),
+                'url': self._api_url('people/{0}.json'.format(person_id)),
+                'app_url': self._app_url('people/{0}'.format(person_id)),
+            }
+        self.me = min(self.people)
+
+        for index in range(projects):
+            project = self._create_project('Project {0}'.format(index),
+                'Everything about project {0}.'.format(index),
+                EPOCH + index)
+            for list_index in range(todo_lists):
+                todo_list = self._create_todo_list(project['id'],
+                    'List {0}'.format(list_index), '', EPOCH + index)
+                for todo_index in range(todos):
+                    self._create_todo(project['id'], todo_list['id'],
+                        'Todo {0} of {1}'.format(todo_index,
+                            todo_list['name']), EPOCH + todo_index)
+            for document_index in range(documents):
+                self._create_document(project['id'],
+                    'Document {0}'.format(document_index),
+                    '<div>Notes number {0}.</div>'.format(document_index),
+                    EPOCH + document_index)
+
+        # the initial records aren't news.
+        self.events = []
+
+    def _event(self, project_id, action, kind, record, now):
+        self.events.append({
+            'id': self._next_id(),
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'summary': '{0} {1}'.format(action,
+                EVENTABLE_TYPES[kind].lower()),
+            'action': action,
+            'url': record['url'],
+            'eventable': {'id': record['id'],
+                'type': EVENTABLE_TYPES[kind], 'url': record['url'],
+                'app_url': record['app_url']},
+            'creator': self._short_person(self.me),
+            'bucket': self._bucket(project_id),
+        })
+
+    def _create_project(self, name, description, now=None):
+        now = now or time.time()
+        project_id = self._next_id()
+        project = self.projects[project_id] = {
+            'id': project_id,
+            'name': name,
+            'description': description,
+            'archived': False,
+            'is_client_project': False,
+            'starred': False,
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'url': self._api_url('projects/{0}.json'.format(project_id)),
+            'app_url': self._app_url('projects/{0}'.format(project_id)),
+            'creator': self._short_person(self.me),
+        }
+        return project
+
+    def _create_todo_list(self, project_id, name, description, now=None):
+        now = now or time.time()
+        list_id = self._next_id()
+        position = sum(1 for key in self._projects_of if key[0] ==
+            'todo_lists' and self._projects_of[key] == project_id) + 1
+        todo_list = self.todo_lists[list_id] = {
+            'id': list_id,
+            'name': name,
+            'description': description,
+            'position': position,
+            'completed': False,
+            'completed_count': 0,
+            'remaining_count': 0,
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'url': self._api_url('projects/{0}/todolists/{1}.json'.format(
+                project_id, list_id)),
+            'app_url': self._app_url('projects/{0}/todolists/{1}'.format(
+                project_id, list_id)),
+            'creator': self._author(),
+            'bucket': self._bucket(project_id),
+        }
+        self._projects_of[('todo_lists', list_id)] = project_id
+        self._event(project_id, 'created', 'todo_lists', todo_list, now)
+        return todo_list
+
+    def _create_todo(self, project_id, list_id, content, now=None):
+        now = now or time.time()
+        todo_id = self._next_id()
+        todo_list = self.todo_lists[list_id]
+        todo_list['remaining_count'] += 1
+        todo = self.todos[todo_id] = {
+            'id': todo_id,
+            'todolist_id': list_id,
+            'content': content,
+            'completed': False,
+            'due_at': time.strftime('%Y-%m-%d', time.gmtime(now + 86400 *
+                (todo_id % 30))),
+            'position': todo_list['remaining_count'],
+            'comments_count': 0,
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'url': self._api_url('projects/{0}/todos/{1}.json'.format(
+                project_id, todo_id)),
+            'app_url': self._app_url('projects/{0}/todos/{1}'.format(
+                project_id, todo_id)),
+            'assignee': self._author(),
+            'creator': self._author(),
+            'bucket': self._bucket(project_id),
+        }
+        self._projects_of[('todos', todo_id)] = project_id
+        self._event(project_id, 'created', 'todos', todo, now)
+        return todo
+
+    def _create_document(self, project_id, title, content, now=None):
+        now = now or time.time()
+        document_id = self._next_id()
+        author = self._author()
+        document = self.documents[document_id] = {
+            'id': document_id,
+            'title': title,
+            'content': content,
+            'comments_count': 0,
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'url': self._api_url('projects/{0}/documents/{1}.json'.format(
+                project_id, document_id)),
+            'app_url': self._app_url('projects/{0}/documents/{1}'.format(
+                project_id, document_id)),
+            'creator': author,
+            'last_updater': author,
+            'bucket': self._bucket(project_id),
+        }
+        self._projects_of[('documents', document_id)] = project_id
+        self._event(project_id, 'created', 'documents', document, now)
+        return document
+
+    def _with_comments(self, kind, record):
+        record = dict(record, comments=[self.comments[comment_id]
+            for comment_id in self._comments_of[(kind, record['id'])]])
+        return record
+
+    def _in_project(self, kind, record_id, project_id):
+        return record_id in getattr(self, kind) and \
+            self._projects_of.get((kind, record_id)) == project_id
+
+    def _touch(self, kind, record, project_id):
+        now = time.time()
+        record['updated_at'] = _timestamp(now)
+        self._event(project_id, 'updated', kind, record, now)
+
+    # -- requests
+
+    def handle(self, method, path, query, headers, body):
+        """
+        Answer a request.
+
+        :param query: dictionary of the query string arguments.
+        :param headers: mapping of the request headers.
+        :param body: the request body, bytes.
+        :rtype: ``(status, headers, body)``.
+        """
+        self._count('requests')
+
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            failure = self._failures.popleft() if self._failures else None
+            if failure is None and self.error_rate and \
+                    self._random.random() < self.error_rate:
+                failure = (self.error_status, None)
+
+        if failure is not None:
+            self._count('injected')
+            status, retry_after = failure
+            extra = {}
+            if retry_after is not None:
+                extra['Retry-After'] = str(retry_after)
+            return self._json(status, {'error': 'Injected failure.'}, extra)
+
+        if path.startswith('/launchpad/'):
+            return self._launchpad(method, path[len('/launchpad/'):], query,
+                headers)
+
+        prefix = '/{0}/api/v1/'.format(self.account_id)
+        if not path.startswith(prefix):
+            return self._json(404, {'error': 'Not found.'})
+
+        token = query.get('access_token') or _bearer(headers)
+        with self._lock:
+            valid = token in self._tokens and (self._tokens[token] is None or
+                self._tokens[token] > time.time())
+        if not valid:
+            self._count('unauthorized')
+            return self._json(401, {'error': 'OAuth token expired.'})
+
+        limited = self._throttle(token)
+        if limited is not None:
+            self._count('rate_limited')
+            return self._json(429, {'error': 'Too many requests.'},
+                {'Retry-After': str(limited)})
+
+        try:
+            payload = json.loads(body.decode('utf-8')) if body else {}
+        except ValueError:
+            return self._json(400, {'error': 'Invalid JSON.'})
+
+        route = path[len(prefix):]
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.match(route)
+            if match is not None and route_method == method:
+                with self._lock:
+                    status, data = getattr(self, name)(query, payload,
+                        *[int(group) if group.isdigit() else group
+                            for group in match.groups()])
+                return self._answer(status, data, query, headers,
+                    method == 'GET')
+
+        return self._json(404, {'error': 'Not found.'})
+
+    def _throttle(self, token):
+        """
+        Count a request against the rate limit of ``token``.
+
+        :rtype: seconds to wait if the limit is reached, otherwise None.
+        """
+        if self.rate_limit is None:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            sent = self._sent[token]
+            while sent and sent[0] <= now - self.rate_period:
+                sent.popleft()
+
+            if len(sent) >= self.rate_limit:
+                return max(1, int(math.ceil(sent[0] + self.rate_period - now)))
+
+            sent.append(now)
+            return None
+
+    def _answer(self, status, data, query, headers, paginate):
+        if paginate and status == 200 and isinstance(data, list):
+            page = max(int(query.get('page') or 1), 1)
+            data = data[(page - 1) * self.page_size:page * self.page_size]
+
+        if data is None:
+            return status, {}, b''
+
+        body = json.dumps(data).encode('utf-8')
+        if not paginate or status != 200:
+            return self._encoded(status, body)
+
+        etag = '"{0}"'.format(hashlib.sha1(body).hexdigest()[:20])
+        if headers.get('If-None-Match') == etag:
+            self._count('not_modified')
+            return 304, {'ETag': etag}, b''
+
+        return self._encoded(status, body, {'ETag': etag,
+            'Cache-Control': 'max-age=0, private, must-revalidate'})
+
+    def _json(self, status, data, extra=None):
+        return self._encoded(status, json.dumps(data).encode('utf-8'), extra)
+
+    def _encoded(self, status, body, extra=None):
+        headers = {'Content-Type': 'application/json; charset=utf-8'}
+        headers.update(extra or {})
+        return status, headers, body
+
+    def _launchpad(self, method, path, query, headers):
+        if method == 'GET' and path == 'authorization/new':
+            location = '{0}?{1}'.format(query.get('redirect_uri', '/'),
+                urllib.parse.urlencode({'code': self.code}))
+            return 302, {'Location': location}, b''
+
+        if method == 'POST' and path == 'authorization/token':
+            return self._token(query)
+
+        if method == 'GET' and path == 'authorization.json':
+            token = _bearer(headers) or query.get('access_token')
+            with self._lock:
+                valid = token in self._tokens
+            if not valid:
+                self._count('unauthorized')
+                return self._json(401, {'error': 'OAuth token expired.'})
+
+            person = self.people[self.me]
+            return self._json(200, {
+                'expires_at': _timestamp(time.time() + self.token_ttl),
+                'identity': {
+                    'id': person['identity_id'],
+                    'first_name': person['name'].split()[0],
+                    'last_name': person['name'].split()[-1],
+                    'email_address': person['email_address'],
+                },
+                'accounts': [{
+                    'product': 'bcx',
+                    'id': self.account_id,
+                    'name': 'Fake Basecamp',
+                    'href': self.account_url,
+                }],
+            })
+
+        return self._json(404, {'error': 'Not found.'})
+
+    def _token(self, query):
+        if query.get('client_id') != self.client_id or \
+                query.get('client_secret') != self.client_secret:
+            return self._json(401, {'error': 'Invalid client.'})
+
+        with self._lock:
+            if query.get('type') == 'refresh':
+                if query.get('refresh_token') not in self._refresh_tokens:
+                    return self._json(401,
+                        {'error': 'Invalid refresh token.'})
+            elif query.get('code') != self.code:
+                return self._json(401, {'error': 'Invalid code.'})
+
+            access_token = 'fake-access-token-{0}'.format(self._next_id())
+            refresh_token = 'fake-refresh-token-{0}'.format(self._next_id())
+            self._tokens[access_token] = time.time() + self.token_ttl
+            self._refresh_tokens.add(refresh_token)
+
+        return self._json(200, {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'expires_in': self.token_ttl,
+        })
+
+    # -- routes, called with the lock held
+
+    def _projects(self, query, payload, archived=None):
+        return 200, [project for _, project in sorted(self.projects.items())
+            if project['archived'] == bool(archived)]
+
+    def _project(self, query, payload, project_id):
+        if project_id not in self.projects:
+            return 404, {'error': 'Not found.'}
+        return 200, self.projects[project_id]
+
+    def _create_project_route(self, query, payload):
+        if not payload.get('name'):
+            return 422, {'error': 'Name is required.'}
+        return 201, self._create_project(payload['name'],
+            payload.get('description', ''))
+
+    def _update_project(self, query, payload, project_id):
+        project = self.projects.get(project_id)
+        if project is None:
+            return 404, {'error': 'Not found.'}
+        for key in ('name', 'description', 'archived'):
+            if key in payload:
+                project[key] = payload[key]
+        self._touch('projects', project, project_id)
+        return 200, project
+
+    def _remove_project(self, query, payload, project_id):
+        if self.projects.pop(project_id, None) is None:
+            return 404, {'error': 'Not found.'}
+        return 204, None
+
+    def _all_todo_lists(self, query, payload, status=None):
+        return self._todo_lists(query, payload, status=status)
+
+    def _todo_lists(self, query, payload, project_id=None, status=None):
+        completed = status == 'completed'
+        return 200, [todo_list for list_id, todo_list
+            in sorted(self.todo_lists.items())
+            if (project_id is None or self._projects_of[('todo_lists',
+                list_id)] == project_id) and
+                todo_list['completed'] == completed]
+
+    def _todo_list(self, query, payload, project_id, list_id):
+        if not self._in_project('todo_lists', list_id, project_id):
+            return 404, {'error': 'Not found.'}
+        return 200, self._with_comments('todo_lists',
+            self.todo_lists[list_id])
+
+    def _create_todo_list_route(self, query, payload, project_id):
+        if project_id not in self.projects:
+            return 404, {'error': 'Not found.'}
+        return 201, self._create_todo_list(project_id,
+            payload.get('name', ''), payload.get('description', ''))
+
+    def _update_todo_list(self, query, payload, project_id, list_id):
+        if not self._in_project('todo_lists', list_id, project_id):
+            return 404, {'error': 'Not found.'}
+        todo_list = self.todo_lists[list_id]
+        for key in ('name', 'description'):
+            if key in payload:
+                todo_list[key] = payload[key]
+        self._touch('todo_lists', todo_list, project_id)
+        return 200, todo_list
+
+    def _remove_todo_list(self, query, payload, project_id, list_id):
+        if not self._in_project('todo_lists', list_id, project_id):
+            return 404, {'error': 'Not found.'}
+        del self.todo_lists[list_id]
+        return 204, None
+
+    def _todos(self, query, payload, project_id, list_id=None, status=None):
+        if project_id not in self.projects:
+            return 404, {'error': 'Not found.'}
+
+        todos = [todo for todo_id, todo in sorted(self.todos.items())
+            if self._projects_of[('todos', todo_id)] == project_id and
+                (list_id is None or todo['todolist_id'] == list_id)]
+
+        if status == 'completed':
+            todos = [todo for todo in todos if todo['completed']]
+        elif status == 'remaining':
+            todos = [todo for todo in todos if not todo['completed']]
+        elif status == 'trashed':
+            todos = []
+
+        if query.get('due_since'):
+            todos = [todo for todo in todos
+                if (todo['due_at'] or '') >= query['due_since']]
+
+        return 200, todos
+
+    def _todos_by_status(self, query, payload, project_id, status):
+        return self._todos(query, payload, project_id, status=status)
+
+    def _todo(self, query, payload, project_id, todo_id):
+        if not self._in_project('todos', todo_id, project_id):
+            return 404, {'error': 'Not found.'}
+        return 200, self._with_comments('todos', self.todos[todo_id])
+
+    def _create_todo_route(self, query, payload, project_id, list_id):
+        if not self._in_project('todo_lists', list_id, project_id):
+            return 404, {'error': 'Not found.'}
+        if not payload.get('content'):
+            return 422, {'error': 'Content is required.'}
+        return 201, self._create_todo(project_id, list_id,
+            payload['content'])
+
+    def _update_todo(self, query, payload, project_id, todo_id):
+        if not self._in_project('todos', todo_id, project_id):
+            return 404, {'error': 'Not found.'}
+        todo = self.todos[todo_id]
+        for key in ('content', 'completed', 'due_at'):
+            if key in payload:
+                todo[key] = payload[key]
+        self._touch('todos', todo, project_id)
+        return 200, todo
+
+    def _remove_todo(self, query, payload, project_id, todo_id):
+        if not self._in_project('todos', todo_id, project_id):
+            return 404, {'error': 'Not found.'}
+        del self.todos[todo_id]
+        return 204, None
+
+    def _documents(self, query, payload, project_id=None):
+        if project_id is not None and project_id not in self.projects:
+            return 404, {'error': 'Not found.'}
+        return 200, [document for document_id, document
+            in sorted(self.documents.items())
+            if project_id is None or self._projects_of[('documents',
+                document_id)] == project_id]
+
+    def _document(self, query, payload, project_id, document_id):
+        if not self._in_project('documents', document_id, project_id):
+            return 404, {'error': 'Not found.'}
+        return 200, self._with_comments('documents',
+            self.documents[document_id])
+
+    def _create_document_route(self, query, payload, project_id):
+        if project_id not in self.projects:
+            return 404, {'error': 'Not found.'}
+        return 201, self._create_document(project_id,
+            payload.get('title', ''), payload.get('content', ''))
+
+    def _update_document(self, query, payload, project_id, document_id):
+        if not self._in_project('documents', document_id, project_id):
+            return 404, {'error': 'Not found.'}
+        document = self.documents[document_id]
+        for key in ('title', 'content'):
+            if key in payload:
+                document[key] = payload[key]
+        document['last_updater'] = self._short_person(self.me)
+        self._touch('documents', document, project_id)
+        return 200, document
+
+    def _remove_document(self, query, payload, project_id, document_id):
+        if not self._in_project('documents', document_id, project_id):
+            return 404, {'error': 'Not found.'}
+        del self.documents[document_id]
+        return 204, None
+
+    def _create_comment(self, query, payload, project_id, topic, topic_id):
+        records = getattr(self, topic, None)
+        if not isinstance(records, dict) or \
+                not self._in_project(topic, topic_id, project_id):
+            return 404, {'error': 'Not found.'}
+
+        now = time.time()
+        comment_id = self._next_id()
+        comment = self.comments[comment_id] = {
+            'id': comment_id,
+            'content': payload.get('content', ''),
+            'created_at': _timestamp(now),
+            'updated_at': _timestamp(now),
+            'creator': self._short_person(self.me),
+        }
+        self._projects_of[('comments', comment_id)] = project_id
+        self._comments_of[(topic, topic_id)].append(comment_id)
+        records[topic_id]['comments_count'] += 1
+        self._touch(topic, records[topic_id], project_id)
+        return 201, comment
+
+    def _remove_comment(self, query, payload, project_id, comment_id):
+        if not self._in_project('comments', comment_id, project_id):
+            return 404, {'error': 'Not found.'}
+        del self.comments[comment_id]
+        for comment_ids in self._comments_of.values():
+            if comment_id in comment_ids:
+                comment_ids.remove(comment_id)
+        return 204, None
+
+    def _people(self, query, payload):
+        return 200, [person for _, person in sorted(self.people.items())]
+
+    def _person(self, query, payload, person_id):
+        if person_id == 'me':
+            person_id = self.me
+        if person_id not in self.people:
+            return 404, {'error': 'Not found.'}
+        return 200, self.people[person_id]
+
+    def _remove_person(self, query, payload, person_id):
+        if self.people.pop(person_id, None) is None:
+            return 404, {'error': 'Not found.'}
+        return 204, None
+
+    def _events(self, query, payload, project_id=None):
+        since = query.get('since')
+        if not since:
+            return 400, {'error': 'since is required.'}
+        since = _parse_timestamp(since)
+
+        return 200, [event for event in reversed(self.events)
+            if _parse_timestamp(event['created_at']) > since and
+                (project_id is None or event['bucket']['id'] == project_id)]
+
+
+def _route(method, pattern, name):
+    return (method, re.compile('^' + pattern + r'(?:\.json)?$'), name)
+
+
+_ROUTES = (
+    _route('GET', r'projects', '_projects'),
+    _route('GET', r'projects/(archived)', '_projects'),
+    _route('POST', r'projects', '_create_project_route'),
+    _route('GET', r'projects/(\d+)', '_project'),
+    _route('PUT', r'projects/(\d+)', '_update_project'),
+    _route('DELETE', r'projects/(\d+)', '_remove_project'),
+    _route('GET', r'todolists', '_todo_lists'),
+    _route('GET', r'todolists/(completed)', '_all_todo_lists'),
+    _route('GET', r'projects/(\d+)/todolists', '_todo_lists'),
+    _route('GET', r'projects/(\d+)/todolists/(completed)', '_todo_lists'),
+    _route('GET', r'projects/(\d+)/todolists/(\d+)', '_todo_list'),
+    _route('POST', r'projects/(\d+)/todolists', '_create_todo_list_route'),
+    _route('PUT', r'projects/(\d+)/todolists/(\d+)', '_update_todo_list'),
+    _route('DELETE', r'projects/(\d+)/todolists/(\d+)',
+        '_remove_todo_list'),
+    _route('GET', r'projects/(\d+)/todos', '_todos'),
+    _route('GET', r'projects/(\d+)/todos/(completed|remaining|trashed)',
+        '_todos_by_status'),
+    _route('GET', r'projects/(\d+)/todolists/(\d+)/todos', '_todos'),
+    _route('GET', r'projects/(\d+)/todolists/(\d+)/todos/'
+        r'(completed|remaining|trashed)', '_todos'),
+    _route('GET', r'projects/(\d+)/todos/(\d+)', '_todo'),
+    _route('POST', r'projects/(\d+)/todolists/(\d+)/todos',
+        '_create_todo_route'),
+    _route('PUT', r'projects/(\d+)/todos/(\d+)', '_update_todo'),
+    _route('DELETE', r'projects/(\d+)/todos/(\d+)', '_remove_todo'),
+    _route('GET', r'documents', '_documents'),
+    _route('GET', r'projects/(\d+)/documents', '_documents'),
+    _route('POST', r'projects/(\d+)/documents', '_create_document_route'),
+    _route('GET', r'projects/(\d+)/documents/(\d+)', '_document'),
+    _route('PUT', r'projects/(\d+)/documents/(\d+)', '_update_document'),
+    _route('DELETE', r'projects/(\d+)/documents/(\d+)', '_remove_document'),
+    _route('POST', r'projects/(\d+)/(todos|documents|todo_lists)/(\d+)/'
+        r'comments', '_create_comment'),
+    _route('DELETE', r'projects/(\d+)/comments/(\d+)', '_remove_comment'),
+    _route('GET', r'people', '_people'),
+    _route('GET', r'people/(\d+|me)', '_person'),
+    _route('DELETE', r'people/(\d+)', '_remove_person'),
+    _route('GET', r'events', '_events'),
+    _route('GET', r'projects/(\d+)/events', '_events'),
+)
+
+
+def _bearer(headers):
+    authorization = headers.get('Authorization') or ''
+    if authorization.startswith('Bearer '):
+        return authorization[len('Bearer '):]
+    return None
+
+
+def _parse_timestamp(value):
+    """
+    Get the seconds since the epoch of an ISO 8601 timestamp.
+    """
+    value = value.replace('Z', '+00:00')
+    match = re.match(r'^(\d{4})-(\d\d)-(\d\d)(?:T(\d\d):(\d\d):(\d\d)'
+        r'(?:\.\d+)?([+-]\d\d):?(\d\d))?', value)
+    if match is None:
+        raise ValueError('Invalid timestamp {0}.'.format(value))
+
+    parts = [int(part or 0) for part in match.groups()]
+    seconds = email.utils.mktime_tz(tuple(parts[:6]) + (0, 1, -1, 0))
+    offset = parts[6] * 3600 + (parts[7] * 60 if parts[6] >= 0 else
+        -parts[7] * 60)
+    return seconds - offset
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Hands requests to the fake, keeping connections alive.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeBasecamp'
+    app = None
+
+    def setup(self):
+        super(_Handler, self).setup()
+        # headers and body are written separately; don't hold the body
+        # back until the client acknowledges the headers.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY,
+            1)
+        self.app._count('connections')  # pylint: disable=W0212
+
+    def _dispatch(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query,
+            keep_blank_values=True))
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        status, headers, content = self.app.handle(self.command, parts.path,
+            query, self.headers, body)
+        self.app._count('status_{0}'.format(status))  # pylint: disable=W0212
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if content and self.command != 'HEAD':
+            self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
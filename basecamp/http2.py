@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+======
+HTTP/2
+======
+
+Transports that speak HTTP/2, so many concurrent requests share a single
+connection to basecamp.com instead of each holding one of their own.
+Highly parallel crawls save the TCP and TLS handshakes of every extra
+connection, and aren't capped by the size of a connection pool.
+
+Requests are sent with `httpx <https://www.python-httpx.org/>`_, which has
+to be installed separately::
+
+    pip install basecamp[http2]
+
+    >>> from basecamp.http2 import HTTP2Transport
+    >>> client = basecamp.api.BasecampClient(account_url, access_token,
+    ...     transport=HTTP2Transport())
+    >>> with concurrent.futures.ThreadPoolExecutor(64) as executor:
+    ...     todos = list(executor.map(client.todos.fetch, project_ids))
+    >>> client.transport.stats()
+    {'requests': 120, 'errors': 0, 'http_versions': {'HTTP/2': 120}}
+
+Servers that don't offer HTTP/2 are spoken to in HTTP/1.1 over pooled
+connections, as :class:`basecamp.transport.Transport` does.
+:class:`AsyncHTTP2Transport` does the same for :mod:`basecamp.aio`.
+"""
+import asyncio
+import threading
+
+import requests
+
+from .aio import AsyncResponse
+from .exceptions import ImproperlyConfigured
+from .transport import AsyncBaseTransport, BaseTransport
+
+
+def _import_httpx():
+    try:
+        import httpx
+        import h2  # noqa: F401 pylint: disable=W0611
+    except ImportError:
+        raise ImproperlyConfigured(
+            'httpx and h2 are needed for HTTP/2, install basecamp[http2].')
+    return httpx
+
+
+def _options(httpx, max_connections, timeout):
+    return dict(http2=True,
+        limits=httpx.Limits(max_connections=max_connections,
+            max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(timeout))
+
+
+def _body(data):
+    """
+    Get the keyword argument httpx sends ``data`` as.
+    """
+    if data is None:
+        return {}
+    if isinstance(data, dict):
+        return {'data': data}
+    return {'content': data}
+
+
+def _reraise(httpx, error):
+    """
+    Raise an httpx error as the :mod:`requests` error the retry policy
+    expects.
+    """
+    if isinstance(error, httpx.TimeoutException):
+        raise requests.Timeout(error)
+    raise requests.ConnectionError(error)
+
+
+class HTTP2Response(object):
+    """
+    A response received by :class:`HTTP2Transport`.
+
+    Streamed responses are read as they are iterated; ``content`` reads
+    what is left.
+    """
+
+    def __init__(self, response, httpx, stream=False):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+        self.url = str(response.url)
+        # the body is still on the connection.
+        self.raw = response if stream else None
+        self._httpx = httpx
+
+    def __repr__(self):
+        return '<BasecampHTTP2Response [{0}]>'.format(self.status_code)
+
+    @property
+    def content(self):
+        try:
+            return self.response.read()
+        except self._httpx.TransportError as error:
+            _reraise(self._httpx, error)
+
+    @property
+    def elapsed(self):
+        try:
+            return self.response.elapsed
+        except RuntimeError:
+            # only known once the body was read.
+            return None
+
+    def iter_content(self, chunk_size=None):
+        try:
+            for chunk in self.response.iter_bytes(chunk_size):
+                yield chunk
+        except self._httpx.TransportError as error:
+            _reraise(self._httpx, error)
+
+    def json(self):
+        return self.response.json()
+
+    def close(self):
+        self.response.close()
+
+
+class HTTP2Transport(BaseTransport):
+    """
+    An HTTP/2 transport, multiplexing concurrent requests over one
+    connection per host.
+
+    :param max_connections: maximum number of connections opened. HTTP/2
+        hosts need only one, however many requests are in flight.
+    :param timeout: default timeout in seconds for each request.
+    """
+
+    def __init__(self, max_connections=10, timeout=None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        self._httpx = _import_httpx()
+        self.client = self._httpx.Client(**_options(self._httpx,
+            max_connections, timeout))
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._versions = {}
+
+    def __repr__(self):
+        return '<BasecampHTTP2Transport at 0x%x>' % (id(self))
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        """
+        Send a request and return the response.
+
+        With ``stream``, the body is left on the connection to be read with
+        ``iter_content``; the stream is released once it is read or the
+        response is closed.
+        """
+        with self._lock:
+            self._requests += 1
+
+        try:
+            request = self.client.build_request(method, url,
+                headers=headers, **_body(data))
+            response = self.client.send(request, stream=stream)
+        except self._httpx.TransportError as error:
+            with self._lock:
+                self._errors += 1
+            _reraise(self._httpx, error)
+
+        with self._lock:
+            self._versions[response.http_version] = \
+                self._versions.get(response.http_version, 0) + 1
+
+        return HTTP2Response(response, self._httpx, stream=stream)
+
+    def stats(self):
+        """
+        Get transport statistics.
+
+        :rtype dictionary: ``requests`` and ``errors`` sent through this
+            transport, and the number of responses received in each
+            ``http_versions``.
+        """
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'errors': self._errors,
+                'http_versions': dict(self._versions),
+            }
+
+    def close(self):
+        """
+        Close every open connection.
+        """
+        self.client.close()
+
+
+class AsyncHTTP2Transport(AsyncBaseTransport):
+    """
+    A non-blocking :class:`HTTP2Transport`, for :mod:`basecamp.aio`.
+
+    :param max_in_flight: maximum number of requests sent at once; the
+        others wait for one of them to finish.
+    :param max_connections: maximum number of connections opened.
+    :param timeout: default timeout in seconds for each request.
+    """
+
+    def __init__(self, max_in_flight=1000, max_connections=10,
+            timeout=None):
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        self._httpx = _import_httpx()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._client = None
+        self._loop = None
+
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._versions = {}
+
+    def __repr__(self):
+        return '<BasecampAsyncHTTP2Transport at 0x%x>' % (id(self))
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or \
+                self._loop is not loop:
+            # connections belong to the loop they were opened in.
+            self._client = self._httpx.AsyncClient(**_options(self._httpx,
+                self.max_connections, self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+
+        return self._client
+
+    async def request(self, method, url, headers=None, data=None):
+        """
+        Send a request and read the whole response.
+        """
+        client = self._get_client()
+        self._requests += 1
+
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                response = await client.request(method, url,
+                    headers=headers, **_body(data))
+            except self._httpx.TransportError as error:
+                self._errors += 1
+                _reraise(self._httpx, error)
+            finally:
+                self._in_flight -= 1
+
+        self._versions[response.http_version] = \
+            self._versions.get(response.http_version, 0) + 1
+
+        return AsyncResponse(response.status_code, response.content,
+            response.headers)
+
+    def stats(self):
+        """
+        Get transport statistics.
+
+        :rtype dictionary: ``requests`` and ``errors`` sent through this
+            transport, the number of requests ``in_flight`` right now and
+            of responses received in each of the ``http_versions``.
+        """
+        return {
+            'requests': self._requests,
+            'errors': self._errors,
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+            'http_versions': dict(self._versions),
+        }
+
+    async def close(self):
+        """
+        Close every open connection.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
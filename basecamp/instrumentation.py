@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+===============
+Instrumentation
+===============
+
+Hooks told about every request sent to Basecamp, for shipping latency,
+size and outcome metrics wherever they are collected.
+
+    >>> from basecamp import instrumentation
+    >>> def record(event):
+    ...     statsd.timing('basecamp.{0}.{1}'.format(
+    ...         event.method, event.endpoint), event.total * 1000)
+    >>> instrumentation.add_hook(record)
+
+A hook is called once per request with a :class:`RequestEvent`, after the
+request completed or failed, and after its retries: a request retried
+twice is one event with ``retries`` set to 2. Identical GETs that were
+coalesced into another one don't send a request and aren't reported.
+
+Hooks run on the thread (or event loop) that made the request, so they
+should be quick. An exception raised by a hook is logged and otherwise
+ignored.
+
+Every resource reports to the default :class:`Instrumentation` unless
+given its own; :class:`basecamp.client.BasecampClient` shares its
+``instrumentation`` with all its resources.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+import urllib.request, urllib.parse, urllib.error
+
+
+logger = logging.getLogger(__name__)
+
+# resource method making the current request, eg. ``Todo.fetch``.
+current_operation = contextvars.ContextVar('basecamp_operation',
+    default=None)
+
+_ID = re.compile(r'^\d+(-[^/]*)?$')
+
+# query string arguments never reported.
+SECRETS = ('access_token', 'refresh_token', 'client_secret', 'code')
+
+
+def endpoint_template(url):
+    """
+    Get the endpoint of ``url`` with its ids replaced by ``{id}``, eg.
+    ``projects/{id}/todos`` for ``.../api/v1/projects/1/todos.json?page=2``.
+    """
+    path = urllib.parse.urlsplit(url).path
+    if '/api/v1/' in path:
+        path = path.split('/api/v1/', 1)[1]
+    if path.endswith('.json'):
+        path = path[:-len('.json')]
+
+    return '/'.join('{id}' if _ID.match(segment) else segment
+        for segment in path.strip('/').split('/'))
+
+
+def redact_url(url):
+    """
+    Get ``url`` with the values of its :data:`SECRETS` replaced, so it can
+    be logged.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if not parts.query:
+        return url
+
+    query = [(key, 'REDACTED' if key in SECRETS else value)
+        for key, value in urllib.parse.parse_qsl(parts.query,
+            keep_blank_values=True)]
+
+    return urllib.parse.urlunsplit(parts._replace(
+        query=urllib.parse.urlencode(query)))
+
+
+class RequestEvent(object):
+    """
+    What happened to one request.
+
+    :attr operation: resource method that made the request, eg.
+        ``Todo.fetch``, or None.
+    :attr method: HTTP method.
+    :attr endpoint: endpoint template, eg. ``projects/{id}/todos``.
+    :attr url: url of the request, with its secrets redacted.
+    :attr status_code: status of the final response, or None if no
+        response was received.
+    :attr request_bytes: size of the request body.
+    :attr response_bytes: size of the final response body, or None if it
+        isn't known yet (streamed responses without a Content-Length).
+    :attr retries: times the request was retried after an error.
+    :attr replays: times the request was replayed after a ``429`` or a
+        ``401`` that refreshed the token.
+    :attr rate_limited: ``429`` responses received, the final one
+        included.
+    :attr cache: ``'hit'`` when a ``304`` was served from the HTTP cache,
+        ``'miss'`` when the cache was consulted but the body downloaded,
+        ``'bypass'`` when it wasn't consulted.
+    :attr dns: seconds spent resolving the host, when the transport knows.
+    :attr connect: seconds spent opening a connection, when the transport
+        knows; 0 when a pooled connection was reused.
+    :attr ttfb: seconds from sending the final attempt to receiving its
+        response headers.
+    :attr total: seconds from the first attempt to the final response,
+        retries and waits included.
+    :attr error: the exception the request failed with, or None.
+    :attr started: time the request started, in seconds since the epoch.
+    """
+    __slots__ = ('operation', 'method', 'endpoint', 'url', 'status_code',
+        'request_bytes', 'response_bytes', 'retries', 'replays',
+        'rate_limited', 'cache', 'dns', 'connect', 'ttfb', 'total', 'error',
+        'started', 'stream', 'response', '_clock')
+
+    def __init__(self, method, url, payload=None):
+        self.operation = current_operation.get()
+        self.method = method
+        self.endpoint = endpoint_template(url)
+        self.url = redact_url(url)
+        self.status_code = None
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        self.request_bytes = len(payload) if payload else 0
+        self.response_bytes = None
+        self.retries = 0
+        self.replays = 0
+        self.rate_limited = 0
+        self.cache = 'bypass'
+        self.dns = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.error = None
+        self.started = time.time()
+        self.stream = False
+        # final raw response, read when the event is finished.
+        self.response = None
+        self._clock = time.monotonic()
+
+    def __repr__(self):
+        return '<BasecampRequestEvent {0} {1} [{2}]>'.format(
+            self.method, self.endpoint, self.status_code)
+
+    def as_dict(self):
+        """
+        Get the event as a dictionary.
+        """
+        return {name: getattr(self, name) for name in self.__slots__
+            if name not in ('stream', 'response', '_clock')}
+
+    def _finish(self):
+        self.total = time.monotonic() - self._clock
+
+        response = self.response
+        if response is None:
+            return
+
+        self.status_code = response.status_code
+        if self.status_code == 429:
+            self.rate_limited += 1
+
+        headers = getattr(response, 'headers', None) or {}
+        # the body of a streamed response hasn't been read yet.
+        if not self.stream and response.content is not None:
+            self.response_bytes = len(response.content)
+        elif headers.get('Content-Length'):
+            self.response_bytes = int(headers['Content-Length'])
+
+        timings = getattr(response, 'timings', None) or {}
+        self.dns = timings.get('dns')
+        self.connect = timings.get('connect')
+        self.ttfb = timings.get('ttfb')
+
+        elapsed = getattr(response, 'elapsed', None)
+        if self.ttfb is None and hasattr(elapsed, 'total_seconds'):
+            self.ttfb = elapsed.total_seconds()
+
+
+class Instrumentation(object):
+    """
+    A set of hooks called with a :class:`RequestEvent` for every request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hooks = ()
+
+    def __repr__(self):
+        return '<BasecampInstrumentation at 0x%x>' % (id(self))
+
+    def add_hook(self, hook):
+        """
+        Call ``hook(event)`` after every request.
+        """
+        with self._lock:
+            self.hooks = self.hooks + (hook,)
+
+    def remove_hook(self, hook):
+        """
+        Stop calling ``hook``.
+        """
+        with self._lock:
+            self.hooks = tuple(x for x in self.hooks if x is not hook)
+
+    def start(self, method, url, payload=None):
+        """
+        Get an event to fill in for a request, or None if nobody is
+        listening.
+        """
+        if not self.hooks:
+            return None
+        return RequestEvent(method, url, payload)
+
+    def finish(self, event):
+        """
+        Complete ``event`` and hand it to every hook.
+        """
+        event._finish()  # pylint: disable=W0212
+        event.response = None
+
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:  # pylint: disable=W0703
+                logger.exception('Instrumentation hook %r failed.', hook)
+
+
+_default_instrumentation = Instrumentation()
+
+
+def get_default_instrumentation():
+    """
+    Get the instrumentation shared by every resource that isn't given one.
+    """
+    return _default_instrumentation
+
+
+def add_hook(hook):
+    """
+    Call ``hook(event)`` after every request made through the default
+    instrumentation.
+    """
+    _default_instrumentation.add_hook(hook)
+
+
+def remove_hook(hook):
+    """
+    Stop calling ``hook`` from the default instrumentation.
+    """
+    _default_instrumentation.remove_hook(hook)
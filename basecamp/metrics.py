@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+=======
+Metrics
+=======
+
+Request latencies and counts, aggregated per operation, method and
+endpoint, in the `Prometheus text format
+<https://prometheus.io/docs/instrumenting/exposition_formats/>`_.
+
+:class:`Metrics` is an :mod:`basecamp.instrumentation` hook:
+
+    >>> from basecamp.metrics import Metrics, serve
+    >>> metrics = Metrics().install()
+    >>> server = serve(metrics, port=9100)  # scrape http://host:9100/metrics
+
+or render them wherever they are needed:
+
+    >>> print(metrics.render())
+    # HELP basecamp_request_duration_seconds Time spent on requests, ...
+    # TYPE basecamp_request_duration_seconds histogram
+    basecamp_request_duration_seconds_bucket{operation="Todo.fetch",...
+
+Series are labelled with the ``operation`` making the request (eg.
+``Todo.fetch``), the HTTP ``method`` and the ``endpoint`` template (eg.
+``projects/{id}/todos``), so their number doesn't grow with the number of
+projects. Latency is measured from the first attempt to the final
+response, retries included. :meth:`Metrics.quantile` estimates quantiles
+locally the way Prometheus' ``histogram_quantile`` does.
+"""
+import bisect
+import http.server
+import threading
+
+from .instrumentation import get_default_instrumentation
+
+
+# seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LABELS = ('operation', 'method', 'endpoint')
+
+# name, type and help of every metric, in rendering order.
+COUNTERS = (
+    ('requests', 'basecamp_requests_total', 'Requests made.'),
+    ('errors', 'basecamp_request_errors_total',
+        'Requests that failed or were answered with an error status.'),
+    ('rate_limited', 'basecamp_rate_limited_total',
+        '429 Too Many Requests responses received.'),
+    ('not_modified', 'basecamp_not_modified_total',
+        '304 Not Modified responses received.'),
+    ('request_bytes', 'basecamp_request_bytes_total',
+        'Bytes of request bodies sent.'),
+    ('response_bytes', 'basecamp_response_bytes_total',
+        'Bytes of response bodies received.'),
+)
+
+HISTOGRAM = 'basecamp_request_duration_seconds'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+
+def _labels(key, **extra):
+    pairs = list(zip(LABELS, key)) + sorted(extra.items())
+    return '{' + ','.join('{0}="{1}"'.format(name, _escape(value))
+        for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Series(object):
+    __slots__ = ('requests', 'errors', 'rate_limited', 'not_modified',
+        'request_bytes', 'response_bytes', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.not_modified = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # per bucket, not cumulative; the last one is +Inf.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+class Metrics(object):
+    """
+    Histograms and counters of requests, fed by instrumentation events.
+
+    :param buckets: upper bounds of the latency histogram buckets, in
+        seconds.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<BasecampMetrics at 0x%x>' % (id(self))
+
+    def install(self, instrumentation=None):
+        """
+        Start recording the requests reported to ``instrumentation``, the
+        default instrumentation if omitted.
+
+        :rtype: the metrics themselves.
+        """
+        if instrumentation is None:
+            instrumentation = get_default_instrumentation()
+        instrumentation.add_hook(self)
+        return self
+
+    def __call__(self, event):
+        self.observe(event)
+
+    def observe(self, event):
+        """
+        Record a :class:`basecamp.instrumentation.RequestEvent`.
+        """
+        key = (event.operation or '', event.method, event.endpoint)
+        status_code = event.status_code
+        total = event.total or 0.0
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.buckets)
+
+            series.requests += 1
+            if event.error is not None or \
+                    (status_code is not None and status_code >= 400):
+                series.errors += 1
+            series.rate_limited += event.rate_limited
+            if status_code == 304:
+                series.not_modified += 1
+            series.request_bytes += event.request_bytes
+            series.response_bytes += event.response_bytes or 0
+
+            series.counts[bisect.bisect_left(self.buckets, total)] += 1
+            series.sum += total
+
+    def reset(self):
+        """
+        Forget everything recorded.
+        """
+        with self._lock:
+            self._series = {}
+
+    def _matching(self, operation, method, endpoint):
+        return [series for key, series in self._series.items()
+            if (operation is None or key[0] == operation) and
+                (method is None or key[1] == method) and
+                (endpoint is None or key[2] == endpoint)]
+
+    def count(self, name='requests', operation=None, method=None,
+            endpoint=None):
+        """
+        Get the total of counter ``name``, eg. ``'errors'``, across the
+        series matching the given labels.
+        """
+        with self._lock:
+            return sum(getattr(series, name) for series in
+                self._matching(operation, method, endpoint))
+
+    def quantile(self, q, operation=None, method=None, endpoint=None):
+        """
+        Estimate the ``q`` quantile of the latency, eg. ``0.99``, across
+        the series matching the given labels.
+
+        The value is interpolated within the bucket it falls in, as
+        Prometheus does, so it is only as precise as the buckets.
+
+        :rtype: seconds, or None if nothing matching was recorded.
+        """
+        with self._lock:
+            counts = [0] * (len(self.buckets) + 1)
+            for series in self._matching(operation, method, endpoint):
+                counts = [a + b for a, b in zip(counts, series.counts)]
+
+        total = sum(counts)
+        if not total:
+            return None
+
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    # nothing to interpolate towards past the last bound.
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+
+        return self.buckets[-1]
+
+    def render(self):
+        """
+        Get every metric in the Prometheus text format.
+        """
+        # copied, so the lock isn't held while formatting.
+        with self._lock:
+            series = [(key, {name: getattr(value, name)
+                    for name in value.__slots__})
+                for key, value in sorted(self._series.items())]
+
+        lines = []
+        for attribute, name, description in COUNTERS:
+            lines.append('# HELP {0} {1}'.format(name, description))
+            lines.append('# TYPE {0} counter'.format(name))
+            for key, value in series:
+                lines.append('{0}{1} {2}'.format(name, _labels(key),
+                    _number(value[attribute])))
+
+        lines.append('# HELP {0} Time spent on requests, retries '
+            'included.'.format(HISTOGRAM))
+        lines.append('# TYPE {0} histogram'.format(HISTOGRAM))
+        for key, value in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),),
+                    value['counts']):
+                cumulative += count
+                lines.append('{0}_bucket{1} {2}'.format(HISTOGRAM,
+                    _labels(key, le=_number(bound)), cumulative))
+            lines.append('{0}_sum{1} {2}'.format(HISTOGRAM, _labels(key),
+                _number(value['sum'])))
+            lines.append('{0}_count{1} {2}'.format(HISTOGRAM, _labels(key),
+                cumulative))
+
+        return '\n'.join(lines) + '\n'
+
+
+def serve(metrics, port=9100, host=''):
+    """
+    Serve ``metrics`` over HTTP for Prometheus to scrape, from a daemon
+    thread.
+
+    :rtype: the :class:`http.server.ThreadingHTTPServer`; ``shutdown()`` it
+        to stop serving.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=C0103
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+======
+Mirror
+======
+
+A local SQLite copy of an account's projects, todo lists, todos,
+documents, comments and people, for answering frequent queries without
+calling the API.
+
+    >>> import basecamp.api
+    >>> from basecamp.mirror import Mirror
+    >>> client = basecamp.api.BasecampClient(account_url, access_token)
+    >>> mirror = Mirror(client, 'account.sqlite3')
+    >>> mirror.sync()  # the first sync loads everything
+    {'mode': 'full', 'records': 48211, ...}
+    >>> mirror.todos_for_assignee(149087659)
+    [{'id': 223304243, 'content': 'Design it', ...}, ...]
+
+Every later :meth:`Mirror.sync` is incremental. It reads the account's
+events since the previous sync and re-fetches only the records they name,
+plus the active and archived project lists and the people list, which are
+a handful of requests. Projects in neither list are dropped with their
+records. Run it on a timer and the mirror stays current while the API only
+sees deltas.
+
+Each table keeps the full record as JSON next to indexed columns for the
+fields that are queried most: todos by assignee, due date and project,
+and everything by project.
+"""
+import datetime
+import sqlite3
+import threading
+import time
+
+from . import codec
+from .crawler import Crawler
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    archived INTEGER,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todolists (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    name TEXT,
+    completed INTEGER,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    todolist_id INTEGER,
+    content TEXT,
+    completed INTEGER,
+    assignee_id INTEGER,
+    due_at TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    title TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER,
+    topic_type TEXT,
+    topic_id INTEGER,
+    creator_id INTEGER,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS people (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    email_address TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS todolists_project ON todolists (project_id);
+CREATE INDEX IF NOT EXISTS todos_assignee_due ON todos
+    (assignee_id, completed, due_at);
+CREATE INDEX IF NOT EXISTS todos_due ON todos (due_at, completed);
+CREATE INDEX IF NOT EXISTS todos_project ON todos (project_id, completed);
+CREATE INDEX IF NOT EXISTS todos_todolist ON todos (todolist_id);
+CREATE INDEX IF NOT EXISTS documents_project ON documents (project_id);
+CREATE INDEX IF NOT EXISTS comments_topic ON comments (topic_type, topic_id);
+CREATE INDEX IF NOT EXISTS comments_project ON comments (project_id);
+"""
+
+# event ``eventable`` types and the record type they map to.
+EVENTABLE_TYPES = {
+    'Project': 'project',
+    'Todo': 'todo',
+    'Todolist': 'todolist',
+    'Document': 'document',
+    'Comment': 'comment',
+}
+
+# columns linking a record to its parent, kept when a record is upserted
+# without knowing its parent, like a comment named by an event.
+PARENT_COLUMNS = {
+    'todos': ('todolist_id', ),
+    'comments': ('topic_type', 'topic_id'),
+}
+
+
+def _id(value):
+    return value.get('id') if isinstance(value, dict) else None
+
+
+def _row(record_type, project_id, parent_type, parent_id, data):
+    """
+    Get the table and column values of a record.
+    """
+    if record_type == 'project':
+        return 'projects', (data['id'], data.get('name'),
+            int(bool(data.get('archived'))), data.get('updated_at'))
+    elif record_type == 'todolist':
+        return 'todolists', (data['id'], project_id, data.get('name'),
+            int(bool(data.get('completed'))), data.get('updated_at'))
+    elif record_type == 'todo':
+        todolist_id = data.get('todolist_id')
+        if todolist_id is None and parent_type == 'todolist':
+            todolist_id = parent_id
+        return 'todos', (data['id'], project_id, todolist_id,
+            data.get('content'), int(bool(data.get('completed'))),
+            _id(data.get('assignee')),
+            data.get('due_at') or data.get('due_on'),
+            data.get('updated_at'))
+    elif record_type == 'document':
+        return 'documents', (data['id'], project_id, data.get('title'),
+            data.get('updated_at'))
+    elif record_type == 'comment':
+        return 'comments', (data['id'], project_id, parent_type, parent_id,
+            _id(data.get('creator')), data.get('created_at'))
+    elif record_type == 'person':
+        return 'people', (data['id'], data.get('name'),
+            data.get('email_address'), data.get('updated_at'))
+
+    raise ValueError('Unknown record type {0}.'.format(record_type))
+
+
+class MirrorSink(object):
+    """
+    Receives crawler records and writes them to the mirror in batches.
+    """
+
+    def __init__(self, mirror, batch_size=500):
+        self.mirror = mirror
+        self.batch_size = batch_size
+        self.written = 0
+
+        self._batch = []
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        """
+        Queue ``record`` to be written.
+        """
+        with self._lock:
+            self._batch.append(record)
+            if len(self._batch) < self.batch_size:
+                return
+            batch, self._batch = self._batch, []
+
+        self._write(batch)
+
+    def _write(self, batch):
+        self.mirror.upsert_many((record['type'], record['project_id'],
+            record['parent_type'], record['parent_id'], record['data'])
+            for record in batch)
+        self.written += len(batch)
+
+    def flush(self):
+        """
+        Write every queued record.
+        """
+        with self._lock:
+            batch, self._batch = self._batch, []
+
+        if batch:
+            self._write(batch)
+
+    def close(self):
+        """
+        Write every queued record.
+        """
+        self.flush()
+
+
+class Mirror(object):
+    """
+    A local SQLite mirror of one account.
+
+    :param client: a :class:`basecamp.client.BasecampClient`.
+    :param path: path of the SQLite database, created if missing.
+    :param workers: number of requests made at once during a full sync.
+    :param overlap: seconds of events re-read on each incremental sync, to
+        cover clock skew between us and Basecamp.
+    """
+
+    def __init__(self, client, path=':memory:', workers=8, overlap=60):
+        self.client = client
+        self.path = path
+        self.workers = workers
+        self.overlap = overlap
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if path != ':memory:':
+            # readers don't block the writer, nor the writer readers.
+            self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+        self._upserts = {}
+
+    def __repr__(self):
+        return '<BasecampMirror {0} at 0x{1:x}>'.format(self.path, id(self))
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._db.close()
+
+    # writing
+
+    def _upsert_sql(self, table):
+        """
+        Get the statement inserting or updating a row of ``table``.
+        """
+        if table not in self._upserts:
+            columns = [row['name'] for row in self._db.execute(
+                'PRAGMA table_info({0})'.format(table))]
+            updates = []
+            for column in columns[1:]:
+                if column in PARENT_COLUMNS.get(table, ()):
+                    updates.append('{0} = COALESCE(excluded.{0}, {0})'
+                        .format(column))
+                else:
+                    updates.append('{0} = excluded.{0}'.format(column))
+            self._upserts[table] = 'INSERT INTO {0} VALUES ({1}) ' \
+                'ON CONFLICT (id) DO UPDATE SET {2}'.format(table,
+                    ', '.join('?' * len(columns)), ', '.join(updates))
+        return self._upserts[table]
+
+    def upsert_many(self, records):
+        """
+        Insert or update records. Parent columns that a record doesn't
+        know, eg. the topic of a comment named by an event, keep their
+        value.
+
+        :param records: iterable of ``(record_type, project_id,
+            parent_type, parent_id, data)`` tuples.
+        """
+        rows = {}
+        for record_type, project_id, parent_type, parent_id, data in records:
+            table, values = _row(record_type, project_id, parent_type,
+                parent_id, data)
+            rows.setdefault(table, []).append(
+                values + (codec.dumps(data),))
+
+        with self._lock, self._db:
+            for table, values in rows.items():
+                self._db.executemany(self._upsert_sql(table), values)
+
+    def delete(self, record_type, record_id):
+        """
+        Delete a record.
+        """
+        table = _row(record_type, None, None, None, {'id': record_id})[0]
+        with self._lock, self._db:
+            self._db.execute(
+                'DELETE FROM {0} WHERE id = ?'.format(table), (record_id,))
+
+    def delete_projects(self, project_ids):
+        """
+        Delete projects and every record in them.
+        """
+        project_ids = list(project_ids)
+        with self._lock, self._db:
+            for table in ('todolists', 'todos', 'documents', 'comments'):
+                self._db.executemany(
+                    'DELETE FROM {0} WHERE project_id = ?'.format(table),
+                    [(x, ) for x in project_ids])
+            self._db.executemany('DELETE FROM projects WHERE id = ?',
+                [(x, ) for x in project_ids])
+
+    def _get_state(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM sync_state WHERE key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?)',
+                (key, value))
+
+    # syncing
+
+    @property
+    def last_synced(self):
+        """
+        ISO 8601 time the last sync started at, or None.
+        """
+        return self._get_state('since')
+
+    def sync(self):
+        """
+        Bring the mirror up to date: a :meth:`full_sync` the first time,
+        an :meth:`incremental_sync` after that.
+        """
+        if self.last_synced is None:
+            return self.full_sync()
+        return self.incremental_sync()
+
+    def _now(self):
+        return datetime.datetime.now(datetime.timezone.utc) - \
+            datetime.timedelta(seconds=self.overlap)
+
+    def _sync_people(self):
+        people = list(self.client.people.fetch(lazy=True))
+        self.upsert_many(('person', None, None, None, person)
+            for person in people)
+        return len(people)
+
+    def full_sync(self):
+        """
+        Load every record of the account.
+
+        :rtype dictionary: statistics of the sync.
+        """
+        started = time.monotonic()
+        since = self._now().isoformat(timespec='seconds')
+
+        sink = MirrorSink(self)
+        crawl = Crawler(self.client, sink=sink, workers=self.workers).run()
+        people = self._sync_people()
+
+        if not crawl['projects_failed']:
+            self._set_state('since', since)
+
+        return {
+            'mode': 'full',
+            'records': sink.written + people,
+            'projects_failed': crawl['projects_failed'],
+            'elapsed': time.monotonic() - started,
+        }
+
+    def incremental_sync(self):
+        """
+        Apply the changes made since the last sync.
+
+        :rtype dictionary: statistics of the sync.
+        """
+        started = time.monotonic()
+        since = self.last_synced
+        next_since = self._now().isoformat(timespec='seconds')
+
+        # archiving or deleting a project leaves it out of the active
+        # list, so both lists are read and anything in neither is gone.
+        projects = list(self.client.projects.fetch(lazy=True)) + \
+            list(self.client.projects.fetch(archived=True, lazy=True))
+        self.upsert_many(('project', project['id'], None, None, project)
+            for project in projects)
+        updated = len(projects) + self._sync_people()
+
+        listed = set(project['id'] for project in projects)
+        with self._lock:
+            removed = [row[0] for row in self._db.execute(
+                'SELECT id FROM projects') if row[0] not in listed]
+        self.delete_projects(removed)
+        deleted = len(removed)
+
+        # the lists above are the current state of every project.
+        seen = set(('project', project_id)
+            for project_id in listed.union(removed))
+        events = 0
+
+        # newest first, so the first event about a record is the one
+        # that counts.
+        for event in self.client.events.fetch(since, lazy=True):
+            events += 1
+            record_type = EVENTABLE_TYPES.get(
+                (event.get('eventable') or {}).get('type'))
+            key = (record_type, event['eventable'].get('id')) \
+                if record_type else None
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+
+            project_id = _id(event.get('bucket'))
+            data = self.client.events.fetch_eventable(event)
+
+            if data is None:
+                self.delete(record_type, key[1])
+                deleted += 1
+                continue
+
+            records = []
+            if 'comments' in data and record_type != 'comment':
+                # todos and documents come with their comments.
+                records.extend(('comment', project_id, record_type,
+                    data['id'], comment) for comment in data['comments'])
+            if record_type != 'comment' or 'content' in data:
+                records.append((record_type, project_id, None, None, data))
+            self.upsert_many(records)
+            updated += len(records)
+
+        self._set_state('since', next_since)
+
+        return {
+            'mode': 'incremental',
+            'events': events,
+            'records': updated,
+            'deleted': deleted,
+            'elapsed': time.monotonic() - started,
+        }
+
+    # reading
+
+    def query(self, sql, params=()):
+        """
+        Run a query and get the records in its ``data`` column.
+        """
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [codec.loads(row['data']) for row in rows]
+
+    def project(self, project_id):
+        """
+        Get a project, or None.
+        """
+        rows = self.query('SELECT data FROM projects WHERE id = ?',
+            (project_id,))
+        return rows[0] if rows else None
+
+    def person(self, person_id):
+        """
+        Get a person, or None.
+        """
+        rows = self.query('SELECT data FROM people WHERE id = ?',
+            (person_id,))
+        return rows[0] if rows else None
+
+    def todos_for_assignee(self, person_id, completed=False):
+        """
+        Get the todos assigned to a person, soonest due first.
+
+        :param completed: True for completed todos, False for remaining
+            ones, None for both.
+        """
+        sql = 'SELECT data FROM todos WHERE assignee_id = ?'
+        params = [person_id]
+        if completed is not None:
+            sql += ' AND completed = ?'
+            params.append(int(completed))
+        return self.query(sql + ' ORDER BY due_at IS NULL, due_at', params)
+
+    def todos_due(self, before=None, after=None, completed=False):
+        """
+        Get the todos due in a date range, soonest due first.
+
+        :param before: ISO 8601 date todos must be due on or before.
+        :param after: ISO 8601 date todos must be due on or after.
+        :param completed: True for completed todos, False for remaining
+            ones, None for both.
+        """
+        sql = 'SELECT data FROM todos WHERE due_at IS NOT NULL'
+        params = []
+        if before is not None:
+            sql += ' AND due_at <= ?'
+            params.append(before)
+        if after is not None:
+            sql += ' AND due_at >= ?'
+            params.append(after)
+        if completed is not None:
+            sql += ' AND completed = ?'
+            params.append(int(completed))
+        return self.query(sql + ' ORDER BY due_at', params)
+
+    def todos_for_project(self, project_id, completed=None):
+        """
+        Get the todos of a project.
+
+        :param completed: True for completed todos, False for remaining
+            ones, None for both.
+        """
+        sql = 'SELECT data FROM todos WHERE project_id = ?'
+        params = [project_id]
+        if completed is not None:
+            sql += ' AND completed = ?'
+            params.append(int(completed))
+        return self.query(sql, params)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+======
+Models
+======
+
+Compact, read-only objects for the records the API returns.
+
+Fetch methods return decoded JSON dictionaries. A dictionary keeps every
+field of the record, each key and value as its own object, plus a hash
+table sized for growth; a few hundred thousand todos held that way take
+gigabytes. The models here keep only the fields listed in their
+``__slots__``, share one copy of strings that repeat across records
+(person names, avatar urls, the ``type`` of nested objects), share one
+copy of the nested records repeated across the records of a
+:func:`load` call, and leave
+nested records (``assignee``, ``creator``, ``bucket``, ``comments``)
+undecoded until they are first read.
+
+    >>> from basecamp import models
+    >>> todos = models.load(client.todos.fetch(project_id), models.Todo)
+    >>> todos[0].content
+    'Design it'
+    >>> todos[0].assignee.name
+    'Jason Fried'
+
+:func:`load` also takes the iterators returned by lazy fetches, and wraps
+each record as it arrives:
+
+    >>> for todo in models.load(client.todos.fetch(1, lazy=True),
+    ...         models.Todo):
+    ...     print(todo.id, todo.due_at)
+
+Models also answer ``model['field']`` and ``model.get('field')``, so code
+written against dictionaries keeps working for the fields they keep.
+Fields that aren't in a model's ``__slots__`` are dropped; use the
+dictionaries for those.
+"""
+import sys
+
+
+def _share(value, shared=None):
+    """
+    Get a compact, shared form of a nested record: a tuple of its items.
+
+    :param shared: dictionary of the records already seen, to reuse the
+        copy of a record seen before.
+    """
+    if not isinstance(value, dict):
+        return value
+
+    items = []
+    for key, item in sorted(value.items()):
+        if isinstance(item, str):
+            item = sys.intern(item)
+        elif isinstance(item, (dict, list)):
+            # not worth sharing; keep the record as it is.
+            return value
+        items.append((sys.intern(key), item))
+
+    items = tuple(items)
+    if shared is None:
+        return items
+    return shared.setdefault(items, items)
+
+
+class Nested(object):
+    """
+    Descriptor for a nested record, decoded into a model when first read.
+
+    :param model: name of the model class of the record.
+    :param many: the field holds a list of records.
+    """
+
+    def __init__(self, model, many=False):
+        self.model = model
+        self.many = many
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = getattr(instance, self.slot)
+        if value is None or isinstance(value, Model) or \
+                (self.many and isinstance(value, list)):
+            return value
+
+        model = MODELS[self.model]
+        if self.many:
+            value = [model(dict(item) if isinstance(item, tuple) else item)
+                for item in value]
+        else:
+            value = model(dict(value) if isinstance(value, tuple) else value)
+        setattr(instance, self.slot, value)
+
+        return value
+
+
+class Model(object):
+    """
+    Base class of the models.
+
+    Slots starting with an underscore hold the nested record of the field
+    without it, served by a :class:`Nested` descriptor. Every other slot is
+    a field copied from the record, or None if the record doesn't have it.
+
+    :param data: the record.
+    :param shared: dictionary of the nested records already seen, see
+        :func:`load`.
+    """
+    __slots__ = ()
+
+    # fields whose values repeat across records.
+    interned = ()
+
+    def __init__(self, data, shared=None):
+        for slot in self.__slots__:
+            if slot[0] == '_':
+                value = data.get(slot[1:])
+                if isinstance(value, list):
+                    value = tuple(_share(item, shared) for item in value)
+                else:
+                    value = _share(value, shared)
+            else:
+                value = data.get(slot)
+                if slot in self.interned and isinstance(value, str):
+                    value = sys.intern(value)
+            setattr(self, slot, value)
+
+    def __repr__(self):
+        return '<Basecamp{0} {1} at 0x{2:x}>'.format(
+            type(self).__name__, self.id, id(self))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), self.id))
+
+    def __getitem__(self, name):
+        if name not in self.fields():
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        """
+        Get a field, or ``default`` if the model doesn't keep it.
+        """
+        if name not in self.fields():
+            return default
+        return getattr(self, name)
+
+    @classmethod
+    def fields(cls):
+        """
+        Get the names of the fields the model keeps.
+        """
+        return tuple(slot.lstrip('_') for slot in cls.__slots__)
+
+    def to_dict(self):
+        """
+        Get the kept fields as a dictionary, nested records included.
+        """
+        data = {}
+        for name in self.fields():
+            value = getattr(self, name)
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [item.to_dict() for item in value]
+            data[name] = value
+        return data
+
+
+class Person(Model):
+    """
+    A person, or the short form of one nested in another record.
+    """
+    __slots__ = ('id', 'identity_id', 'name', 'email_address', 'admin',
+        'avatar_url', 'fullsize_avatar_url', 'type', 'created_at',
+        'updated_at', 'url', 'app_url')
+
+    interned = ('name', 'email_address', 'avatar_url', 'fullsize_avatar_url',
+        'type')
+
+
+class Project(Model):
+    """
+    A project, or the ``bucket`` of another record.
+    """
+    __slots__ = ('id', 'name', 'description', 'archived',
+        'is_client_project', 'starred', 'type', 'created_at', 'updated_at',
+        'url', 'app_url', '_creator')
+
+    interned = ('name', 'type')
+
+    creator = Nested('Person')
+
+
+class Comment(Model):
+    """
+    A comment on a todo, document, etc.
+    """
+    __slots__ = ('id', 'content', 'created_at', 'updated_at', '_creator')
+
+    creator = Nested('Person')
+
+
+class TodoList(Model):
+    """
+    A todo list.
+    """
+    __slots__ = ('id', 'name', 'description', 'position', 'completed',
+        'completed_count', 'remaining_count', 'created_at', 'updated_at',
+        'url', 'app_url', '_creator', '_bucket')
+
+    interned = ('name',)
+
+    creator = Nested('Person')
+    bucket = Nested('Project')
+
+
+class Todo(Model):
+    """
+    A todo.
+    """
+    __slots__ = ('id', 'todolist_id', 'content', 'completed', 'due_at',
+        'position', 'comments_count', 'created_at', 'updated_at', 'url',
+        'app_url', '_assignee', '_creator', '_bucket', '_comments')
+
+    creator = Nested('Person')
+    assignee = Nested('Person')
+    bucket = Nested('Project')
+    comments = Nested('Comment', many=True)
+
+
+class Document(Model):
+    """
+    A document.
+    """
+    __slots__ = ('id', 'title', 'content', 'comments_count', 'created_at',
+        'updated_at', 'url', 'app_url', '_creator', '_last_updater',
+        '_bucket', '_comments')
+
+    creator = Nested('Person')
+    last_updater = Nested('Person')
+    bucket = Nested('Project')
+    comments = Nested('Comment', many=True)
+
+
+MODELS = {
+    'Person': Person,
+    'Project': Project,
+    'Comment': Comment,
+    'TodoList': TodoList,
+    'Todo': Todo,
+    'Document': Document,
+}
+
+
+def load(data, model):
+    """
+    Wrap fetched records in ``model``.
+
+    :param data: a record, a list of records, or an iterator of records
+        such as a :class:`basecamp.pagination.PageIterator`.
+    :param model: a model class, eg. :class:`Todo`.
+    :rtype: a model, a list of models, or an iterator of models, following
+        ``data``.
+
+    Nested records repeated across the records are stored once, for as
+    long as the models of this call live.
+    """
+    if data is None or isinstance(data, Model):
+        return data
+    elif isinstance(data, dict):
+        return model(data)
+
+    # only held while loading, so it doesn't outlive the models.
+    shared = {}
+    if isinstance(data, list):
+        return [model(record, shared) for record in data]
+
+    return (model(record, shared) for record in data)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+==========
+Pagination
+==========
+
+List endpoints return their results a page at a time. Passing ``lazy=True``
+to any list-style ``fetch()`` returns a :class:`PageIterator` that walks
+the pages on demand, requesting the next page only once the current one has
+been consumed.
+
+>>> import basecamp.api
+>>> todos = basecamp.api.Todo(account_url, access_token)
+>>> for todo in todos.fetch(project_id=1, lazy=True):
+...     print(todo['content'])
+
+Passing ``prefetch=True`` as well requests the next page in a background
+thread while the current page is being processed. Only one page is ever
+held in reserve, so memory stays flat no matter how big the account is.
+
+Breaking out of the loop stops the walk; pages that were never reached are
+never requested.
+
+The :mod:`basecamp.aio` resources return an :class:`AsyncPageIterator`
+instead, to be walked with ``async for``.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PageIterator(object):
+    """
+    Iterate over every record of a paginated list endpoint.
+
+    :param fetch_page: callable taking a 1-based page number and returning
+        the list of records on that page.
+    :param per_page: number of records the API returns on a full page. A
+        shorter page is the last one.
+    :param prefetch: fetch the next page in the background.
+    """
+
+    def __init__(self, fetch_page, per_page=50, prefetch=False):
+        self.fetch_page = fetch_page
+        self.per_page = per_page
+        self.prefetch = prefetch
+        self.pages_fetched = 0
+
+    def __repr__(self):
+        return '<BasecampPageIterator at 0x%x>' % (id(self))
+
+    def __iter__(self):
+        if self.prefetch:
+            return self._iter_prefetch()
+        return self._iter()
+
+    def _fetch(self, page):
+        records = self.fetch_page(page)
+        self.pages_fetched += 1
+        return records
+
+    def _repeats(self, records, previous):
+        """
+        Endpoints that ignore the ``page`` argument hand back the same
+        records every time, so a page starting with the same record as the
+        previous one ends the walk.
+        """
+        return previous is not None and records[:1] == previous[:1]
+
+    def _iter(self):
+        page = 1
+        previous = None
+
+        while True:
+            records = self._fetch(page)
+            if not records or self._repeats(records, previous):
+                return
+
+            for record in records:
+                yield record
+
+            if len(records) < self.per_page:
+                return
+
+            previous = records
+            page += 1
+
+    def _iter_prefetch(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        page = 1
+        previous = None
+        pending = executor.submit(self._fetch, page)
+
+        try:
+            while pending is not None:
+                records = pending.result()
+                pending = None
+
+                if not records or self._repeats(records, previous):
+                    return
+
+                if len(records) >= self.per_page:
+                    page += 1
+                    pending = executor.submit(self._fetch, page)
+
+                for record in records:
+                    yield record
+
+                previous = records
+        finally:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+
+
+class AsyncPageIterator(PageIterator):
+    """
+    Asynchronously iterate over every record of a paginated list endpoint.
+
+    Takes the same arguments as :class:`PageIterator`, except that
+    ``fetch_page`` returns an awaitable. With ``prefetch``, the next page is
+    requested in a separate task while the current one is consumed.
+    """
+
+    def __repr__(self):
+        return '<BasecampAsyncPageIterator at 0x%x>' % (id(self))
+
+    def __iter__(self):
+        raise TypeError('Use "async for" to walk an AsyncPageIterator.')
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _afetch(self, page):
+        records = await self.fetch_page(page)
+        self.pages_fetched += 1
+        return records
+
+    async def _aiter(self):
+        page = 1
+        previous = None
+        pending = asyncio.ensure_future(self._afetch(page))
+
+        try:
+            while pending is not None:
+                records = await pending
+                pending = None
+
+                if not records or self._repeats(records, previous):
+                    return
+
+                if len(records) >= self.per_page:
+                    page += 1
+                    next_page = self._afetch(page)
+                    if self.prefetch:
+                        pending = asyncio.ensure_future(next_page)
+                    else:
+                        pending = next_page
+
+                for record in records:
+                    yield record
+
+                previous = records
+        finally:
+            if pending is not None:
+                if asyncio.isfuture(pending):
+                    pending.cancel()
+                else:
+                    pending.close()
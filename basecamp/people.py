@@ -25,38 +25,133 @@ access to documents/etc. That's what access is for.
 
     Link to ``accesses`` class when it is complete.
 
+People are referenced by nearly every other record, as the ``creator``
+or ``assignee``. Hand :class:`Person` an
+:class:`basecamp.cache.IdentityCache` and :meth:`Person.fetch` answers
+repeated lookups of the same person from memory:
+
+    >>> from basecamp.cache import IdentityCache
+    >>> people = basecamp.api.Person(account_url, access_token,
+    ...     identity_cache=IdentityCache(ttl=600))
+    >>> people.warm()  # every person, from people.json
+    >>> people.resolve(todo['assignee'])  # no request
+
 See `the Basecamp API docs
 <https://github.com/37signals/bcx-api/blob/master/sections/people.md>`_
 on people for more info.
 
 
 """
-import json
-from .base import Basecamp
-from .exceptions import BasecampAPIError
+from . import codec
+from .base import Basecamp, Call, operation
+from .exceptions import BasecampAPIError, ImproperlyConfigured
+
+
+def _person_key(person):
+    """
+    Get a person id as the int records hold, or ``person`` as it is if it
+    isn't a number, eg. ``'me'``.
+    """
+    try:
+        return int(person)
+    except (TypeError, ValueError):
+        return person
 
 
 class Person(Basecamp):
     """
     Operations on People in a particular project
+
+    Takes the same arguments as :class:`basecamp.base.Basecamp`, plus:
+
+    :param identity_cache: optional :class:`basecamp.cache.IdentityCache`
+        that single people are looked up in before being fetched.
     """
-    def fetch(self, person=None):
+
+    def __init__(self, account_url, access_token, refresh_token=None,
+            transport=None, cache=None, rate_limiter=None,
+            retry_policy=None, token_manager=None, coalescer=None,
+            instrumentation=None, identity_cache=None):
+        super(Person, self).__init__(account_url, access_token,
+            refresh_token, transport=transport, cache=cache,
+            rate_limiter=rate_limiter, retry_policy=retry_policy,
+            token_manager=token_manager, coalescer=coalescer,
+            instrumentation=instrumentation)
+        self.identity_cache = identity_cache
+
+    @operation
+    def fetch(self, person=None, lazy=False, prefetch=False):
         """
         Get a person, or a list of people.
+
+        With an identity cache, a person is only fetched if they aren't
+        cached, and the same object is returned for every lookup of them.
+
+        :param person: person id, ``'me'`` or None for the list of people.
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of the list on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
         """
+        if person:
+            person = _person_key(person)
+
+        if person and self.identity_cache is not None:
+            cached = self.identity_cache.get(person)
+            if cached is not None:
+                return cached
+
         if not person:
             # get the list.
-            self.endpoint = 'people.json'
+            endpoint = 'people.json'
+
+            if lazy or prefetch:
+                return self._paginate(endpoint, prefetch=prefetch)
         else:
-            self.endpoint = 'people/{0}.json'.format(person)
+            endpoint = 'people/{0}.json'.format(person)
 
-        request = self.get(self.construct_url())
+        request = yield Call('GET', self.construct_url(endpoint))
 
-        if request.status_code == 200:
-            return json.loads(request.content)
+        if request.status_code == 200 and person and \
+                self.identity_cache is not None:
+            record = codec.decode(request)
+            record = self.identity_cache.put(record['id'], record)
+            if person != record['id']:
+                # eg. 'me'
+                self.identity_cache.put(person, record)
+            return record
+        elif request.status_code == 200:
+            return codec.decode(request)
 
         raise BasecampAPIError()
 
+    def warm(self):
+        """
+        Load every person of the account into the identity cache, with as
+        few requests as the list takes.
+
+        :rtype int: the number of people cached.
+        """
+        if self.identity_cache is None:
+            raise ImproperlyConfigured('Person has no identity cache.')
+
+        count = 0
+        for person in self.fetch(lazy=True):
+            self.identity_cache.put(person['id'], person)
+            count += 1
+
+        return count
+
+    def resolve(self, reference):
+        """
+        Get the person a record refers to, eg. a todo's ``assignee``.
+
+        :param reference: a dictionary with the person's ``id``, or None.
+        :rtype dictionary: the person, or None.
+        """
+        if not reference:
+            return None
+        return self.fetch(reference['id'])
+
     def remove(self, person):
         """
         Delete a person
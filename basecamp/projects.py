@@ -12,8 +12,10 @@ for more info.
 An ``access_token`` is needed to perform any tasks within this class.
 """
 
-import json
-from .base import Basecamp
+import warnings
+
+from . import codec
+from .base import Basecamp, Call, operation
 from .exceptions import BasecampAPIError
 
 
@@ -23,13 +25,18 @@ class Project(Basecamp):
     """
     endpoint = 'projects'
 
-    def fetch(self, project=None, archived=False):
+    @operation
+    def fetch(self, project=None, archived=False, lazy=False,
+            prefetch=False):
         """
         Get a project, or a list of projects.
 
         :param project: project id or None
         :param archived: True or False - By default, non-archived projects\
         are not included in the list of projects returned.
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of the list on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
         :rtype dictionary: dictionary of projects see `the following <https://\
         github.com/37signals/bcx-api/blob/master/sections/\
         projects.md#get-projects>`_ for the returned structure.
@@ -39,22 +46,31 @@ class Project(Basecamp):
         >>> access_token = 'access_token'
         >>> api = basecamp.api.Project(account_url, access_token)
         >>> projects = projects.fetch()
-        """
-        if archived:
-            self.endpoint = 'projects/archived.json'
 
+        *Walk every project, page by page:*
+
+        >>> for project in api.fetch(lazy=True):
+        ...     print(project['name'])
+        """
         if project:
-            self.endpoint = '{0}/{1}.json'.format(self.endpoint, project)
+            endpoint = '{0}/{1}.json'.format(self.endpoint, project)
         else:
-            self.endpoint = "{0}.json".format(self.endpoint)
+            if archived:
+                endpoint = '{0}/archived.json'.format(self.endpoint)
+            else:
+                endpoint = '{0}.json'.format(self.endpoint)
 
-        request = self.get(self.construct_url())
+            if lazy or prefetch:
+                return self._paginate(endpoint, prefetch=prefetch)
+
+        request = yield Call('GET', self.construct_url(endpoint))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+        raise BasecampAPIError(codec.decode(request).get('error'))
 
+    @operation
     def create(self, name, description):
         """
         Create a new project in a basecamp account.
@@ -75,10 +91,11 @@ class Project(Basecamp):
             description=description
         )
 
-        request = self.post(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('POST', self.construct_url(),
+            codec.dumps(data))
 
         if request.status_code == 201:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create projects
             # or reached the project limit
@@ -86,6 +103,7 @@ class Project(Basecamp):
 
         raise BasecampAPIError(request.content)
 
+    @operation
     def update(self, project_id, name, description):
         """
         Update an existing basecamp project.
@@ -102,17 +120,18 @@ class Project(Basecamp):
         >>> projects = projects.update(675, 'Giant Steps', 'John Coltrane')
 
         """
-        self.endpoint = 'projects/{0}'.format(project_id)
+        endpoint = 'projects/{0}'.format(project_id)
 
         data = dict(
             name=name,
             description=description
         )
 
-        request = self.put(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create projects
             # or reached the project limit
@@ -120,6 +139,7 @@ class Project(Basecamp):
 
         raise BasecampAPIError(request.content)
 
+    @operation
     def archive(self, project_id, archive=True):
         """
         Archive or unarchive a project.
@@ -134,12 +154,13 @@ class Project(Basecamp):
         >>> api = basecamp.api.Project(account_url, access_token)
         >>> projects = projects.archive(675, archive=True)
         """
-        self.endpoint = 'projects/{0}'.format(project_id)
+        endpoint = 'projects/{0}'.format(project_id)
         data = dict(archived=archive)
-        request = self.put(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 200:
-            json_data = json.loads(request.content)
+            json_data = codec.decode(request)
 
             if archive and not json_data.get('archived'):
                 # it should have been archived.
@@ -150,6 +171,7 @@ class Project(Basecamp):
 
         raise BasecampAPIError()
 
+    @operation
     def remove(self, project_id):
         """
         Remove a project
@@ -164,8 +186,8 @@ class Project(Basecamp):
         >>> api = basecamp.api.Project(account_url, access_token)
         >>> projects = projects.remove(675)
         """
-        self.endpoint = 'projects/{0}.json'.format(project_id)
-        request = self.delete(self.construct_url())
+        endpoint = 'projects/{0}.json'.format(project_id)
+        request = yield Call('DELETE', self.construct_url(endpoint))
 
         if request.status_code == 204:
             return True
@@ -175,6 +197,7 @@ class Project(Basecamp):
         raise BasecampAPIError()
 
     # Move to todo_list.
+    @operation
     def reorder_todo_lists(self, project_id, todo_list_ids):
         """
         Remove a todo list
@@ -183,13 +206,21 @@ class Project(Basecamp):
         :param todo_list_ids: ids of the todo list to in order.
         :rtype: True if successfully reordered.
 
+        .. deprecated:: 0.0.1
+            The API doesn't serve ``projects/{project_id}/todo_lists/reorder``
+            this sends the request to, so todo lists can't be reordered.
+
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
         >>> api = basecamp.api.todo list(account_url, access_token)
         >>> reordered = api.reorder([675, 674, 673])
         """
-        self.endpoint = 'projects/{0}/todo_lists/reorder'.format(project_id)
+        warnings.warn('Project.reorder_todo_lists is deprecated, the API '
+            'does not serve the url it requests.', DeprecationWarning,
+            stacklevel=4)
+
+        endpoint = 'projects/{0}/todo_lists/reorder'.format(project_id)
         data = [
             {
                 'todo-list': {
@@ -198,7 +229,8 @@ class Project(Basecamp):
             } for x in todo_list_ids
         ]
 
-        request = self.put(self.construct_url(), paylouad=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 204:
             return True
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+==========
+Rate limit
+==========
+
+Basecamp allows up to 500 requests per 10 second period for each account
+and answers anything beyond that with ``429 Too Many Requests`` and a
+``Retry-After`` header.
+
+Every resource paces its calls through a :class:`RateLimiter` shared by all
+resources using the same account, whatever their access token, so a batch
+job runs at the full allowed rate without tripping the limit, and a
+refreshed token keeps the budget of the one it replaced. If a ``429`` slips
+through anyway (another process using the same account, for instance),
+every request sharing the limiter waits out the ``Retry-After`` period and
+the request is replayed.
+
+>>> import basecamp.api
+>>> from basecamp.ratelimit import RateLimiter
+>>> limiter = RateLimiter(requests=250, period=10)  # leave room for others
+>>> todos = basecamp.api.Todo(account_url, access_token,
+...     rate_limiter=limiter)
+"""
+import email.utils
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter(object):
+    """
+    Pace requests to at most ``requests`` per ``period`` seconds.
+
+    This is a token bucket holding ``requests`` tokens, where a token spent
+    on a request comes back exactly ``period`` seconds after that request
+    was sent. Unlike a bucket refilled at a constant rate, this never lets
+    more than ``requests`` calls into any ``period`` long window, which is
+    how Basecamp counts.
+
+    :param requests: number of requests allowed per period.
+    :param period: length of the period in seconds.
+    """
+
+    def __init__(self, requests=500, period=10.0, clock=time.monotonic,
+            sleep=time.sleep):
+        self.requests = requests
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+
+        self._sent = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.delayed = 0
+        self.waited = 0.0
+        self.throttled = 0
+
+    def __repr__(self):
+        return '<BasecampRateLimiter %s/%ss at 0x%x>' % (
+            self.requests, self.period, id(self))
+
+    def reserve(self):
+        """
+        Claim a slot for one request.
+
+        :rtype: number of seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = self.clock()
+
+            while self._sent and self._sent[0] <= now - self.period:
+                self._sent.popleft()
+
+            send_at = max(now, self._paused_until)
+            if len(self._sent) >= self.requests:
+                send_at = max(send_at, self._sent.popleft() + self.period)
+
+            self._sent.append(send_at)
+            delay = send_at - now
+
+            self.acquired += 1
+            if delay > 0:
+                self.delayed += 1
+                self.waited += delay
+
+            return delay
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+
+        :rtype: number of seconds spent waiting.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        """
+        Hold back every request for ``seconds``, eg. after a ``429``.
+        """
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until,
+                self.clock() + seconds)
+
+    def stats(self):
+        """
+        Get rate limiter statistics.
+
+        :rtype dictionary: number of requests ``acquired``, how many were
+            ``delayed`` and the total seconds ``waited``, plus how many
+            times the server ``throttled`` us with a ``429``.
+        """
+        return {
+            'acquired': self.acquired,
+            'delayed': self.delayed,
+            'waited': self.waited,
+            'throttled': self.throttled,
+        }
+
+
+def retry_after(response, default=10.0):
+    """
+    Get the number of seconds a ``429`` response asks us to wait.
+
+    ``Retry-After`` is either a number of seconds or an HTTP date.
+    """
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not value:
+        return default
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(account_url):
+    """
+    Get the rate limiter shared by every resource using ``account_url``.
+    """
+    with _limiters_lock:
+        if account_url not in _limiters:
+            _limiters[account_url] = RateLimiter()
+        return _limiters[account_url]
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+=========
+Recording
+=========
+
+Record the requests a job makes and the responses it gets, then replay
+them, so two versions of the client can be compared on identical traffic
+without a network.
+
+    >>> from basecamp.recording import RecordingTransport, ReplayTransport
+    >>> from basecamp.transport import Transport
+    >>> client = basecamp.api.BasecampClient(account_url, access_token,
+    ...     transport=RecordingTransport(Transport(), 'crawl.jsonl.gz'))
+    >>> crawl(client)
+    >>> client.close()  # finishes the cassette
+
+and later, as many times as needed:
+
+    >>> client = basecamp.api.BasecampClient(account_url, 'anything',
+    ...     transport=ReplayTransport('crawl.jsonl.gz', speed=10))
+    >>> crawl(client)
+    >>> client.transport.stats()
+    {'requests': 5120, 'replayed': 5120, 'misses': 0, 'remaining': 0}
+
+A cassette is a gzipped file of JSON lines: a header, then one exchange per
+request with its method, url, response status, headers and body, and how
+long the response took. Access tokens, refresh tokens, client secrets and
+authorization codes are redacted from urls and token responses, and
+``Authorization`` headers aren't recorded, so cassettes can be shared.
+
+Replayed requests are matched to recorded ones by method and url, the
+access token left out, in the order they were recorded. ``speed`` replays
+responses at the recorded latency (1), faster (eg. 10), or without
+waiting at all (None). A request that wasn't recorded raises
+:class:`basecamp.exceptions.ReplayMiss`.
+
+:class:`AsyncRecordingTransport` and :class:`AsyncReplayTransport` do the
+same for :mod:`basecamp.aio`.
+"""
+import asyncio
+import base64
+import collections
+import datetime
+import gzip
+import json
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import get_version
+from .cache import canonical_url
+from .exceptions import ReplayMiss
+from .instrumentation import SECRETS, redact_url
+from .transport import AsyncBaseTransport, BaseTransport
+
+FORMAT = 1
+
+# the response headers the client reads; the others aren't recorded.
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After',
+    'Cache-Control', 'Location')
+
+# transport errors that are recorded and raised again on replay.
+ERRORS = {
+    'ConnectionError': requests.ConnectionError,
+    'Timeout': requests.Timeout,
+}
+
+
+def _redact_body(content):
+    """
+    Get a JSON body with the values of its :data:`SECRETS` keys replaced.
+    """
+    if not content or not content.lstrip().startswith(b'{') or \
+            b'_token' not in content:
+        return content
+
+    try:
+        document = json.loads(content.decode('utf-8'))
+    except ValueError:
+        return content
+
+    for key in SECRETS:
+        if key in document:
+            document[key] = 'REDACTED'
+    return json.dumps(document).encode('utf-8')
+
+
+def _encode_body(content):
+    try:
+        return {'body': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_base64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(exchange):
+    if 'body_base64' in exchange:
+        return base64.b64decode(exchange['body_base64'])
+    return (exchange.get('body') or '').encode('utf-8')
+
+
+def _key(method, url):
+    return method, canonical_url(redact_url(url))
+
+
+def _error_name(error):
+    for name, error_class in ERRORS.items():
+        if isinstance(error, error_class):
+            return name
+    return None
+
+
+class ReplayedResponse(object):
+    """
+    A recorded response.
+    """
+    # the body is in memory; read by :func:`basecamp.streaming.iter_records`.
+    raw = None
+
+    def __init__(self, exchange):
+        self.status_code = exchange['status']
+        self.content = _decode_body(exchange)
+        self.headers = CaseInsensitiveDict(exchange.get('headers') or {})
+        self.elapsed = datetime.timedelta(seconds=exchange.get('elapsed', 0))
+        self.url = exchange['url']
+
+    def __repr__(self):
+        return '<BasecampReplayedResponse [{0}]>'.format(self.status_code)
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class Cassette(object):
+    """
+    A cassette file being recorded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.exchanges = 0
+
+        self._write({'format': FORMAT, 'basecamp': get_version(),
+            'recorded_at': datetime.datetime.now(
+                datetime.timezone.utc).isoformat()})
+
+    def __repr__(self):
+        return '<BasecampCassette {0}>'.format(self.path)
+
+    def _write(self, line):
+        self._file.write(json.dumps(line, separators=(',', ':')) + '\n')
+
+    def record(self, method, url, data, started, elapsed, response=None,
+            error=None):
+        """
+        Add an exchange.
+
+        :param started: :func:`time.monotonic` when the request was sent.
+        :param elapsed: seconds the response took.
+        :param response: the response, if there was one.
+        :param error: name of the transport error, if there was one.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        exchange = {
+            'method': method,
+            'url': redact_url(url),
+            'request_bytes': len(data) if data else 0,
+            'at': round(started - self._started, 6),
+            'elapsed': round(elapsed, 6),
+        }
+
+        if error is not None:
+            exchange['error'] = error
+        else:
+            headers = response.headers or {}
+            exchange['status'] = response.status_code
+            exchange['headers'] = {name: headers[name]
+                for name in RECORDED_HEADERS if headers.get(name)}
+            exchange.update(_encode_body(_redact_body(response.content)))
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._write(exchange)
+            self.exchanges += 1
+
+    def close(self):
+        """
+        Finish the cassette.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load(path):
+    """
+    Read a cassette.
+
+    :rtype: ``(header, exchanges)``, the header dictionary and the list of
+        exchanges in the order they were recorded.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+        lines = [json.loads(line) for line in cassette if line.strip()]
+
+    if not lines or lines[0].get('format') != FORMAT:
+        raise ValueError('{0} is not a cassette.'.format(path))
+
+    return lines[0], lines[1:]
+
+
+class _Recorder(object):
+    """
+    What the recording transports share.
+    """
+
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.cassette = Cassette(path)
+
+    def stats(self):
+        """
+        Get the statistics of the wrapped transport, plus the number of
+        exchanges ``recorded``.
+        """
+        return dict(self.transport.stats(),
+            recorded=self.cassette.exchanges)
+
+
+class RecordingTransport(_Recorder, BaseTransport):
+    """
+    Sends requests through ``transport`` and records them to the cassette
+    at ``path``.
+    """
+
+    def __repr__(self):
+        return '<BasecampRecordingTransport at 0x%x>' % (id(self))
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        """
+        Send a request and record its response.
+
+        Streamed responses are read in full to be recorded.
+        """
+        options = {'stream': True} if stream else {}
+        started = time.monotonic()
+
+        try:
+            response = self.transport.request(method, url, headers=headers,
+                data=data, **options)
+        except Exception as error:
+            name = _error_name(error)
+            if name is not None:
+                self.cassette.record(method, url, data, started,
+                    time.monotonic() - started, error=name)
+            raise
+
+        # read before the clock stops, like a non-streamed request.
+        response.content  # pylint: disable=W0104
+        self.cassette.record(method, url, data, started,
+            time.monotonic() - started, response=response)
+
+        return response
+
+    def close(self):
+        """
+        Finish the cassette and close the wrapped transport.
+        """
+        self.cassette.close()
+        return self.transport.close()
+
+
+class _Replayer(object):
+    """
+    What the replaying transports share.
+    """
+
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed
+        self.header, exchanges = load(path)
+
+        self._queues = collections.defaultdict(collections.deque)
+        for exchange in exchanges:
+            self._queues[_key(exchange['method'], exchange['url'])].append(
+                exchange)
+        self._lock = threading.Lock()
+
+        self.recorded = len(exchanges)
+        self.requests = 0
+        self.replayed = 0
+        self.misses = 0
+
+    def _next(self, method, url):
+        """
+        Get the next recorded exchange for a request.
+        """
+        with self._lock:
+            self.requests += 1
+            queue = self._queues.get(_key(method, url))
+            if not queue:
+                self.misses += 1
+                raise ReplayMiss('{0} {1} was not recorded in {2}.'.format(
+                    method, redact_url(url), self.path))
+            self.replayed += 1
+            return queue.popleft()
+
+    def _delay(self, exchange):
+        if not self.speed:
+            return 0.0
+        return exchange.get('elapsed', 0.0) / self.speed
+
+    def _respond(self, exchange):
+        if 'error' in exchange:
+            raise ERRORS[exchange['error']]('Recorded {0}.'.format(
+                exchange['error']))
+        return ReplayedResponse(exchange)
+
+    def stats(self):
+        """
+        Get replay statistics.
+
+        :rtype dictionary: ``requests`` asked for, ``replayed`` ones,
+            ``misses`` that weren't recorded, and recorded exchanges
+            ``remaining`` unused.
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'replayed': self.replayed,
+                'misses': self.misses,
+                'remaining': sum(len(queue) for queue
+                    in self._queues.values()),
+            }
+
+
+class ReplayTransport(_Replayer, BaseTransport):
+    """
+    Answers requests with the responses recorded in the cassette at
+    ``path``.
+
+    :param speed: how much faster than recorded responses come back, or
+        None to answer at once.
+    """
+
+    def __init__(self, path, speed=None, sleep=time.sleep):
+        super(ReplayTransport, self).__init__(path, speed=speed)
+        self.sleep = sleep
+
+    def __repr__(self):
+        return '<BasecampReplayTransport {0}>'.format(self.path)
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        """
+        Get the recorded response to a request.
+        """
+        exchange = self._next(method, url)
+
+        delay = self._delay(exchange)
+        if delay:
+            self.sleep(delay)
+
+        return self._respond(exchange)
+
+    def close(self):
+        pass
+
+
+class AsyncRecordingTransport(_Recorder, AsyncBaseTransport):
+    """
+    Asynchronous :class:`RecordingTransport`, wrapping a
+    :class:`basecamp.aio.AsyncTransport`.
+    """
+
+    def __repr__(self):
+        return '<BasecampAsyncRecordingTransport at 0x%x>' % (id(self))
+
+    async def request(self, method, url, headers=None, data=None):
+        started = time.monotonic()
+
+        try:
+            response = await self.transport.request(method, url,
+                headers=headers, data=data)
+        except Exception as error:
+            name = _error_name(error)
+            if name is not None:
+                self.cassette.record(method, url, data, started,
+                    time.monotonic() - started, error=name)
+            raise
+
+        self.cassette.record(method, url, data, started,
+            time.monotonic() - started, response=response)
+
+        return response
+
+    async def close(self):
+        self.cassette.close()
+        await self.transport.close()
+
+
+class AsyncReplayTransport(_Replayer, AsyncBaseTransport):
+    """
+    Asynchronous :class:`ReplayTransport`.
+    """
+
+    def __repr__(self):
+        return '<BasecampAsyncReplayTransport {0}>'.format(self.path)
+
+    async def request(self, method, url, headers=None, data=None):
+        exchange = self._next(method, url)
+
+        delay = self._delay(exchange)
+        if delay:
+            await asyncio.sleep(delay)
+
+        return self._respond(exchange)
+
+    async def close(self):
+        pass
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+=====
+Retry
+=====
+
+A :class:`RetryPolicy` decides whether a failed request is sent again and
+how long to wait first. Connection errors, timeouts and ``5xx`` responses
+to idempotent requests (``GET``, ``PUT`` and ``DELETE``) are retried with
+exponential backoff and full jitter, until either the retry count or the
+total time budget runs out.
+
+``POST`` requests are not retried by default, since replaying one could
+create a second project, todo or comment.
+
+>>> import basecamp.api
+>>> from basecamp.retry import RetryPolicy
+>>> policy = RetryPolicy(max_retries=5, backoff_factor=1,
+...     total_timeout=120, status_rules={500: 1, 503: 8})
+>>> todos = basecamp.api.Todo(account_url, access_token,
+...     retry_policy=policy)
+>>> policy.stats()
+{'retries': 0, 'retried_requests': 0, 'gave_up': 0, 'delay': 0.0}
+
+Resources that aren't given a policy share a default one, so its counters
+show the retries across every call.
+"""
+import random
+import threading
+import time
+
+import requests
+
+
+class RetryPolicy(object):
+    """
+    When and how to retry a failed request.
+
+    :param max_retries: maximum number of retries for a single request.
+    :param backoff_factor: the wait before retry ``n`` is up to
+        ``backoff_factor * 2 ** (n - 1)`` seconds.
+    :param max_backoff: cap on a single wait, in seconds.
+    :param total_timeout: give up once this many seconds have passed since
+        the first attempt, waits included. ``None`` for no budget.
+    :param methods: HTTP methods that may be retried.
+    :param status_codes: response status codes that are retried.
+    :param status_rules: dictionary of status code to the maximum number of
+        retries for that status, overriding ``max_retries``. A status listed
+        here is retried even if it isn't in ``status_codes``.
+    :param jitter: wait a random time between zero and the backoff, so
+        clients failing together don't retry together.
+    :param exceptions: transport exceptions that are retried.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30.0,
+            total_timeout=60.0, methods=('GET', 'PUT', 'DELETE'),
+            status_codes=(500, 502, 503, 504), status_rules=None,
+            jitter=True, exceptions=(requests.ConnectionError,
+                requests.Timeout),
+            clock=time.monotonic, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.total_timeout = total_timeout
+        self.methods = frozenset(method.upper() for method in methods)
+        self.status_codes = frozenset(status_codes)
+        self.status_rules = dict(status_rules or {})
+        self.jitter = jitter
+        self.exceptions = tuple(exceptions)
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retried_requests = 0
+        self.gave_up = 0
+        self.delay = 0.0
+
+    def __repr__(self):
+        return '<BasecampRetryPolicy at 0x%x>' % (id(self))
+
+    def is_retryable(self, method, status_code=None, error=None):
+        """
+        Whether a response status or a transport error warrants a retry,
+        disregarding how many retries have been made.
+        """
+        if method.upper() not in self.methods:
+            return False
+        if error is not None:
+            return isinstance(error, self.exceptions)
+        return status_code in self.status_codes or \
+            status_code in self.status_rules
+
+    def backoff(self, retry):
+        """
+        Get the number of seconds to wait before retry number ``retry``.
+        """
+        delay = min(self.max_backoff,
+            self.backoff_factor * (2 ** (retry - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def next_delay(self, method, retry, started, status_code=None,
+            error=None):
+        """
+        Decide whether to retry, and how long to wait before doing so.
+
+        :param retry: number of the retry about to be made, starting at 1.
+        :param started: clock time of the first attempt.
+        :rtype: seconds to wait before retrying, or None to give up.
+        """
+        if not self.is_retryable(method, status_code, error):
+            return None
+
+        limit = self.status_rules.get(status_code, self.max_retries)
+        delay = self.backoff(retry)
+        elapsed = self.clock() - started
+
+        if retry > limit or (self.total_timeout is not None and
+                elapsed + delay > self.total_timeout):
+            with self._lock:
+                self.gave_up += 1
+            return None
+
+        with self._lock:
+            self.retries += 1
+            if retry == 1:
+                self.retried_requests += 1
+            self.delay += delay
+
+        return delay
+
+    def wait(self, method, retry, started, status_code=None, error=None):
+        """
+        Decide whether to retry, and wait before doing so.
+
+        Takes the same arguments as :meth:`next_delay`.
+
+        :rtype: True if the request should be sent again.
+        """
+        delay = self.next_delay(method, retry, started, status_code, error)
+        if delay is None:
+            return False
+
+        if delay > 0:
+            self.sleep(delay)
+        return True
+
+    def stats(self):
+        """
+        Get retry statistics.
+
+        :rtype dictionary: total ``retries`` made, number of requests
+            that needed at least one (``retried_requests``), how many
+            requests ``gave_up`` while still failing, and the total
+            ``delay`` in seconds the backoff added.
+        """
+        with self._lock:
+            return {
+                'retries': self.retries,
+                'retried_requests': self.retried_requests,
+                'gave_up': self.gave_up,
+                'delay': self.delay,
+            }
+
+
+_default_policy = None
+_default_lock = threading.Lock()
+
+
+def get_default_retry_policy():
+    """
+    Get the retry policy shared by every resource that isn't given one.
+    """
+    global _default_policy  # pylint: disable=W0603
+
+    if _default_policy is None:
+        with _default_lock:
+            if _default_policy is None:
+                _default_policy = RetryPolicy()
+
+    return _default_policy
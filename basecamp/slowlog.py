@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+========
+Slow log
+========
+
+A log of requests that took longer than they should have, like a
+database's slow query log.
+
+    >>> from basecamp.slowlog import SlowLog
+    >>> slow = SlowLog(threshold=2.0).install()
+    >>> ...
+    >>> for entry in slow.summary():
+    ...     print(entry['operation'], entry['endpoint'], entry['count'],
+    ...         entry['max'])
+
+Every request taking ``threshold`` seconds or more, retries included, is
+logged as a warning on the ``basecamp.slowlog`` logger and kept among the
+latest :attr:`SlowLog.max_entries`. Each entry holds the resource method
+that made the request, its endpoint template, its url with the access
+token redacted, payload and response sizes and where the time went.
+
+Entries carry a ``fingerprint`` identifying the request pattern: the
+method, endpoint template and query string argument names, so the 300
+slow fetches of different todo lists add up to a single line of
+:meth:`SlowLog.summary`.
+"""
+import collections
+import hashlib
+import logging
+import threading
+import urllib.request, urllib.parse, urllib.error
+
+from .instrumentation import get_default_instrumentation
+
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(method, endpoint, url):
+    """
+    Get an identifier of the request pattern of a request.
+
+    :param endpoint: endpoint template of the request.
+    :param url: url of the request; only the names of its query string
+        arguments are part of the pattern.
+    """
+    query = urllib.parse.urlsplit(url).query
+    names = sorted(set(key for key, _ in urllib.parse.parse_qsl(query,
+        keep_blank_values=True)))
+    pattern = '{0} {1}?{2}'.format(method, endpoint, '&'.join(names))
+
+    return hashlib.sha1(pattern.encode('utf-8')).hexdigest()[:12]
+
+
+class SlowLog(object):
+    """
+    Records requests taking ``threshold`` seconds or more.
+
+    :param threshold: seconds a request may take before it is slow.
+    :param max_entries: number of the latest slow requests kept.
+    :param log: :class:`logging.Logger` slow requests are logged to, the
+        ``basecamp.slowlog`` logger if omitted, or False not to log them.
+    """
+
+    def __init__(self, threshold=1.0, max_entries=1000, log=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.log = logger if log is None else log
+
+        self._entries = collections.deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<BasecampSlowLog %ss at 0x%x>' % (self.threshold, id(self))
+
+    def install(self, instrumentation=None):
+        """
+        Start recording the slow requests reported to ``instrumentation``,
+        the default instrumentation if omitted.
+
+        :rtype: the slow log itself.
+        """
+        if instrumentation is None:
+            instrumentation = get_default_instrumentation()
+        instrumentation.add_hook(self)
+        return self
+
+    def __call__(self, event):
+        self.observe(event)
+
+    def observe(self, event):
+        """
+        Record a :class:`basecamp.instrumentation.RequestEvent` if it was
+        slow.
+        """
+        if event.total is None or event.total < self.threshold:
+            return
+
+        entry = {
+            'fingerprint': fingerprint(event.method, event.endpoint,
+                event.url),
+            'operation': event.operation,
+            'method': event.method,
+            'endpoint': event.endpoint,
+            'url': event.url,
+            'status_code': event.status_code,
+            'error': repr(event.error) if event.error is not None else None,
+            'request_bytes': event.request_bytes,
+            'response_bytes': event.response_bytes,
+            'retries': event.retries,
+            'replays': event.replays,
+            'cache': event.cache,
+            'started': event.started,
+            'dns': event.dns,
+            'connect': event.connect,
+            'ttfb': event.ttfb,
+            'total': event.total,
+        }
+
+        with self._lock:
+            self._entries.append(entry)
+
+        if self.log:
+            self.log.warning(
+                'Slow request: %s %s took %.3fs (operation %s, status %s, '
+                'ttfb %s, %s retries, %s replays, %s bytes sent, %s bytes '
+                'received) [%s]', entry['method'], entry['url'],
+                entry['total'], entry['operation'], entry['status_code'],
+                entry['ttfb'], entry['retries'], entry['replays'],
+                entry['request_bytes'], entry['response_bytes'],
+                entry['fingerprint'],
+                extra={'basecamp_slow_request': entry})
+
+    def entries(self):
+        """
+        Get the latest slow requests, oldest first.
+
+        :rtype list: dictionaries describing each request.
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def summary(self):
+        """
+        Get the kept slow requests grouped by fingerprint, the most time
+        consuming pattern first.
+
+        :rtype list: dictionaries with the ``fingerprint``, ``operation``,
+            ``method`` and ``endpoint`` of each pattern, its ``count``, the
+            ``total`` and ``max`` seconds its requests took, and the ``url``
+            of the slowest one.
+        """
+        patterns = {}
+
+        for entry in self.entries():
+            pattern = patterns.get(entry['fingerprint'])
+            if pattern is None:
+                pattern = patterns[entry['fingerprint']] = {
+                    'fingerprint': entry['fingerprint'],
+                    'operation': entry['operation'],
+                    'method': entry['method'],
+                    'endpoint': entry['endpoint'],
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'url': None,
+                }
+
+            pattern['count'] += 1
+            pattern['total'] += entry['total']
+            if entry['total'] >= pattern['max']:
+                pattern['max'] = entry['total']
+                pattern['url'] = entry['url']
+
+        return sorted(patterns.values(), key=lambda pattern: -pattern['total'])
+
+    def clear(self):
+        """
+        Forget every slow request.
+        """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+=========
+Streaming
+=========
+
+Incremental parsing of JSON array responses.
+
+A list response is normally read whole and decoded in one go, so a page
+of documents briefly holds every body twice: once as bytes and once
+decoded. Streamed fetches instead read the response a chunk at a time and
+hand back each record as soon as its closing brace arrives:
+
+    >>> for document in client.documents.fetch(project_id=1, stream=True,
+    ...         fields=('id', 'title', 'updated_at')):
+    ...     print(document['title'])
+
+With ``fields``, every other key of a record is skipped while scanning, so
+a document's ``content`` is never copied, let alone decoded. Memory use is
+bounded by the chunk size plus the largest projected record.
+
+:class:`ArrayParser` does the scanning and can be fed from any source.
+"""
+import re
+import weakref
+
+from . import codec
+
+
+# structural characters outside strings, and the ones ending a run of
+# characters inside them.
+_STRUCTURE = re.compile(br'["\[\]{},:]')
+_STRING = re.compile(br'["\\]')
+
+# bytes read from the socket at a time.
+CHUNK_SIZE = 64 * 1024
+
+
+class ArrayParser(object):
+    """
+    Push parser splitting a JSON array into its decoded elements.
+
+    :param fields: optional collection of keys to keep when an element is
+        an object. Other keys and their values are discarded unread.
+    :param loads: function decoding one element, :func:`codec.loads` by
+        default.
+
+    >>> parser = ArrayParser(fields=('id',))
+    >>> parser.feed(b'[{"id": 1, "content": "...')
+    []
+    >>> parser.feed(b'"}, {"id": 2}]')
+    [{'id': 1}, {'id': 2}]
+    >>> parser.close()
+    """
+
+    def __init__(self, fields=None, loads=None):
+        self.fields = frozenset(fields) if fields is not None else None
+        self.loads = loads or codec.loads
+
+        self._depth = 0
+        self._done = False
+        self._count = 0
+        self._in_string = False
+        self._escape = False
+        self._element = bytearray()
+
+        # state of the object element being scanned, if any.
+        self._object = False
+        self._expect_key = False
+        self._key_start = None
+        self._members = 0
+        self._skipping = False
+
+    def __repr__(self):
+        return '<BasecampArrayParser at 0x%x>' % (id(self))
+
+    def feed(self, data):
+        """
+        Scan the next chunk of the array.
+
+        :rtype list: the elements completed by this chunk.
+        """
+        records = []
+        position = 0
+        end = len(data)
+
+        while position < end:
+            if self._in_string:
+                if self._escape:
+                    self._copy(data, position, position + 1)
+                    position += 1
+                    self._escape = False
+                    continue
+
+                match = _STRING.search(data, position)
+                if match is None:
+                    self._copy(data, position, end)
+                    break
+
+                index = match.start()
+                self._copy(data, position, index + 1)
+                position = index + 1
+
+                if data[index] == 0x5c:
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    self._string_done()
+                continue
+
+            match = _STRUCTURE.search(data, position)
+            if match is None:
+                self._copy(data, position, end)
+                break
+
+            index = match.start()
+            self._copy(data, position, index)
+            position = index + 1
+            self._token(data[index:position], records)
+
+        return records
+
+    def close(self):
+        """
+        Check the whole array was scanned.
+        """
+        if not self._done:
+            raise ValueError('Truncated JSON array.')
+
+    def _copy(self, data, start, end):
+        if start == end:
+            return
+
+        if self._depth == 0 or self._done:
+            if data[start:end].strip():
+                raise ValueError('Expected a JSON array.')
+        elif not self._skipping:
+            self._element += data[start:end]
+
+    def _string_done(self):
+        if self._key_start is None:
+            return
+
+        key = self.loads(bytes(self._element[self._key_start:]))
+        if self.fields is not None and key not in self.fields:
+            del self._element[self._key_start:]
+            self._skipping = True
+        else:
+            if self._members:
+                self._element[self._key_start:self._key_start] = b','
+            self._members += 1
+
+        self._key_start = None
+        self._expect_key = False
+
+    def _emit(self, records, last=False):
+        element = bytes(self._element).strip()
+        if element:
+            records.append(self.loads(element))
+            self._count += 1
+        elif self._count or not last:
+            raise ValueError('Empty element in JSON array.')
+
+        self._element = bytearray()
+        self._object = False
+        self._expect_key = False
+        self._members = 0
+        self._skipping = False
+
+    def _token(self, token, records):
+        if self._done:
+            raise ValueError('Data after the end of the JSON array.')
+
+        if self._depth == 0:
+            if token != b'[':
+                raise ValueError('Expected a JSON array.')
+            self._depth = 1
+        elif token == b'"':
+            if self._object and self._expect_key and self._depth == 2:
+                self._key_start = len(self._element)
+            self._copy(token, 0, 1)
+            self._in_string = True
+        elif token in (b'{', b'['):
+            self._copy(token, 0, 1)
+            self._depth += 1
+            if self._depth == 2 and token == b'{' and \
+                    not self._element.strip(b' \t\r\n{'):
+                self._object = True
+                self._expect_key = True
+        elif token in (b'}', b']'):
+            if self._depth == 1:
+                if token != b']':
+                    raise ValueError('Unbalanced JSON array.')
+                self._emit(records, last=True)
+                self._depth = 0
+                self._done = True
+                return
+            if self._depth == 2 and self._object:
+                self._skipping = False
+            self._copy(token, 0, 1)
+            self._depth -= 1
+        elif token == b',':
+            if self._depth == 1:
+                self._emit(records)
+            elif self._depth == 2 and self._object:
+                # put back when the next kept key is.
+                self._skipping = False
+                self._expect_key = True
+            else:
+                self._copy(token, 0, 1)
+        else:
+            self._copy(token, 0, 1)
+
+
+def iter_records(response, fields=None, chunk_size=CHUNK_SIZE):
+    """
+    Decode the JSON array body of ``response`` element by element.
+
+    Bodies that were already read, like those of the asynchronous
+    transport, are scanned from memory. The response is closed once read,
+    or once the iterator is discarded, even if it was never started.
+
+    :param response: a response sent with ``stream=True``.
+    :param fields: optional collection of keys to keep in each record.
+    """
+    records = _iter_records(response, fields, chunk_size)
+
+    close = getattr(response, 'close', None)
+    if close is not None:
+        weakref.finalize(records, close)
+
+    return records
+
+
+def _iter_records(response, fields, chunk_size):
+    parser = ArrayParser(fields=fields)
+
+    try:
+        if getattr(response, 'raw', None) is not None and \
+                hasattr(response, 'iter_content'):
+            chunks = response.iter_content(chunk_size)
+        else:
+            chunks = [response.content]
+
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            for record in parser.feed(chunk):
+                yield record
+
+        parser.close()
+    finally:
+        close = getattr(response, 'close', None)
+        if close is not None:
+            close()
@@ -1,5 +1,7 @@
-import json
-from .base import Basecamp
+import warnings
+
+from . import codec
+from .base import Basecamp, Call, operation
 from .exceptions import BasecampAPIError
 
 
@@ -9,11 +11,16 @@ class TodoList(Basecamp):
     """
     endpoint = 'todolists'
 
-    def fetch(self, project_id=None, todo_list_filter=None):
+    @operation
+    def fetch(self, project_id=None, todo_list_filter=None, lazy=False,
+            prefetch=False):
         """
         Get a todo list, or a list of todo lists.
 
         :param todo_list_filter: Optional, 'completed' or 'trashed'.
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of the list on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
         :rtype dictionary: dictionary of todo_list_id see `the following <https://\
         github.com/37signals/bcx-api/blob/master/sections/\
         todo_lists.md#get-all-lists-across-projects>`_ for the returned structure.
@@ -26,23 +33,28 @@ class TodoList(Basecamp):
         """
 
         if project_id:
-            self.endpoint = "{0}/{1}/{2}".format('projects', project_id, self.endpoint)
+            endpoint = "{0}/{1}/{2}".format('projects', project_id, self.endpoint)
         else:
-            self.endpoint = "{0}".format(self.endpoint)
+            endpoint = "{0}".format(self.endpoint)
 
         if todo_list_filter:
-            self.endpoint += '/{0}.json' % todo_list_filter
+            endpoint += '/{0}.json'.format(todo_list_filter)
         else:
-            self.endpoint += '.json'
+            endpoint += '.json'
+
+        if lazy or prefetch:
+            return self._paginate(endpoint, prefetch=prefetch)
 
-        request = self.get(self.construct_url())
+        request = yield Call('GET', self.construct_url(endpoint))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+        raise BasecampAPIError(codec.decode(request).get('error'))
 
-    def create(self, name, description='', milestone_id=None, private=False, tracked=False):
+    @operation
+    def create(self, name, description='', milestone_id=None, private=False, tracked=False,
+            project_id=None):
         """
         Create a new todo list in a basecamp account.
 
@@ -51,13 +63,20 @@ class TodoList(Basecamp):
         :param milestone_id: Id of milestone_id.
         :param private: Boolean if private todo list.
         :param tracked: Boolean if tracked todo list.
+        :param project_id: id of the project to create the todo list in.
+
+        .. deprecated:: 0.0.1
+            Without ``project_id``, the request is sent to
+            ``todolists``, which the API doesn't serve.
 
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
         >>> api = basecamp.api.TodoList(account_url, access_token)
-        >>> todo_list = api.create('My New List', 'New stuff to do')
+        >>> todo_list = api.create('My New List', 'New stuff to do',
+        ...     project_id=1)
         """
+        endpoint = self._endpoint('create', project_id)
 
         data = dict(
             name=name,
@@ -67,10 +86,11 @@ class TodoList(Basecamp):
             tracked=tracked
         )
 
-        request = self.post(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('POST', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 201:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create todo lists
             # or reached the todo list limit
@@ -78,7 +98,9 @@ class TodoList(Basecamp):
 
         raise BasecampAPIError(request.content)
 
-    def update(self, todo_list_id, name, description='', milestone_id=None, private=False, tracked=False):
+    @operation
+    def update(self, todo_list_id, name, description='', milestone_id=None, private=False, tracked=False,
+            project_id=None):
         """
         Update an existing basecamp todo list.
 
@@ -87,15 +109,22 @@ class TodoList(Basecamp):
         :param milestone_id: Id of milestone_id.
         :param private: Boolean if private todo list.
         :param tracked: Boolean if tracked todo list.
+        :param project_id: id of the project of the todo list.
+
+        .. deprecated:: 0.0.1
+            Without ``project_id``, the request is sent to
+            ``todo_lists/{todo_list_id}.json``, which the API doesn't
+            serve.
 
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
         >>> api = basecamp.api.todo list(account_url, access_token)
-        >>> todo lists = api.update(675, 'Giant Steps', 'John Coltrane')
+        >>> todo lists = api.update(675, 'Giant Steps', 'John Coltrane',
+        ...     project_id=1)
 
         """
-        self.endpoint = 'todo_lists/{0}.json'.format(todo_list_id)
+        endpoint = self._endpoint('update', project_id, todo_list_id)
 
         data = dict(
             name=name,
@@ -105,10 +134,11 @@ class TodoList(Basecamp):
             tracked=tracked
         )
 
-        request = self.put(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create todo lists
             # or reached the todo list limit
@@ -116,22 +146,29 @@ class TodoList(Basecamp):
 
         raise BasecampAPIError(request.content)
 
-    def remove(self, todo_list_id):
+    @operation
+    def remove(self, todo_list_id, project_id=None):
         """
         Remove a todo list
 
         :param todo_list_id: id of the todo list to delete.
+        :param project_id: id of the project of the todo list.
         :rtype: True if the todo list is removed, otherwise \
         a :class:`BasecampAPIError` exception.
 
+        .. deprecated:: 0.0.1
+            Without ``project_id``, the request is sent to
+            ``todo_lists/{todo_list_id}.json``, which the API doesn't
+            serve.
+
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
         >>> api = basecamp.api.todo list(account_url, access_token)
-        >>> removed = api.remove(675)
+        >>> removed = api.remove(675, project_id=1)
         """
-        self.endpoint = 'todo_lists/{0}.json'.format(todo_list_id)
-        request = self.delete(self.construct_url())
+        endpoint = self._endpoint('remove', project_id, todo_list_id)
+        request = yield Call('DELETE', self.construct_url(endpoint))
 
         if request.status_code == 204:
             return True
@@ -141,11 +178,13 @@ class TodoList(Basecamp):
         raise BasecampAPIError()
 
 
-    def todo_items(self, todo_list_id):
+    @operation
+    def todo_items(self, todo_list_id, project_id=None):
         """
         Get a list of todo list items.
 
         :param todo_list_id: todo list id
+        :param project_id: id of the project of the todo list.
         :rtype dictionary: dictionary of todo_items see `the following <https://\
         github.com/37signals/bcx-api/blob/master/sections/\
         todo_itemss.md#get-all-lists-across-projects>`_ for the returned structure.
@@ -154,14 +193,47 @@ class TodoList(Basecamp):
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
         >>> api = basecamp.api.TodoList(account_url, access_token)
-        >>> todo_itemss = api.fetch()
+        >>> todo_itemss = api.todo_items(675, project_id=1)
+
+        .. deprecated:: 0.0.1
+            Without ``project_id``, the request is sent to
+            ``todolists/{todo_list_id}/todo_items.json``, which the API
+            doesn't serve. :meth:`basecamp.todos.Todo.fetch` gets the same
+            todos.
         """
 
-        self.endpoint = '{0}/{1}/todo_items.json'.format(self.endpoint, todo_list_id)
+        endpoint = self._endpoint('todo_items', project_id, todo_list_id,
+            'todos')
 
-        request = self.get(self.construct_url())
+        request = yield Call('GET', self.construct_url(endpoint))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
+
+        raise BasecampAPIError(codec.decode(request).get('error'))
 
-        raise BasecampAPIError(json.loads(request.content).get('error'))
+    def _endpoint(self, action, project_id, todo_list_id=None, suffix=None):
+        """
+        Get the endpoint of a todo list, or of the todo lists of a project.
+
+        Without ``project_id``, warns and returns the endpoint ``action``
+        used before it took one.
+        """
+        if project_id is None:
+            warnings.warn('TodoList.{0} without a project_id is deprecated, '
+                'the API does not serve the url it requests.'.format(action),
+                DeprecationWarning, stacklevel=5)
+            legacy = {
+                'create': self.endpoint,
+                'update': 'todo_lists/{0}.json',
+                'remove': 'todo_lists/{0}.json',
+                'todo_items': self.endpoint + '/{0}/todo_items.json',
+            }[action]
+            return legacy.format(todo_list_id)
+
+        endpoint = 'projects/{0}/{1}'.format(project_id, self.endpoint)
+        if todo_list_id is not None:
+            endpoint += '/{0}'.format(todo_list_id)
+        if suffix:
+            endpoint += '/{0}'.format(suffix)
+        return endpoint + '.json'
@@ -1,5 +1,8 @@
-import json
-from .base import Basecamp
+import warnings
+
+from . import codec
+from . import streaming
+from .base import Basecamp, Call, operation
 from .exceptions import BasecampAPIError
 
 
@@ -9,13 +12,21 @@ class Todo(Basecamp):
     """
     endpoint = 'projects'
 
-    def fetch(self, project_id, todo_list_id=None, todo_id=None, todo_filter=None, due_since_date=None):
+    @operation
+    def fetch(self, project_id, todo_list_id=None, todo_id=None, todo_filter=None, due_since_date=None,
+            lazy=False, prefetch=False, stream=False, fields=None):
         """
         Get a todo list item, or a list of todo list items.
 
         :param todo_filter: 'complated', 'remaining', 'trashed'
         :param due_since_date: A date for filtering all todos due after date.
         :param todo_items: todo list id or None
+        :param lazy: return a :class:`basecamp.pagination.PageIterator` that\
+        walks every page of the list on demand instead of the first page.
+        :param prefetch: with ``lazy``, fetch the next page in the background.
+        :param stream: return an iterator decoding the todos one by one as\
+        the response arrives, see :mod:`basecamp.streaming`.
+        :param fields: with ``stream``, the keys to keep in each todo.
         :rtype dictionary: dictionary of todo_items see `the following <https://\
         github.com/37signals/bcx-api/blob/master/sections/\
         todo_itemss.md#get-all-lists-across-projects>`_ for the returned structure.
@@ -47,72 +58,129 @@ class Todo(Basecamp):
 
         """
 
-        self.endpoint += "/{0}/".format(project_id)
-
-        if todo_list_id:
-            self.endpoint += 'todolists/{0}/todos'.format(todo_list_id)
+        endpoint = '{0}/{1}/'.format(self.endpoint, project_id)
 
         if todo_id:
-            self.endpoint += 'todos/{0}'.format(todo_id)
+            endpoint += 'todos/{0}'.format(todo_id)
+        elif todo_list_id:
+            endpoint += 'todolists/{0}/todos'.format(todo_list_id)
+        else:
+            endpoint += 'todos'
 
         if todo_filter:
-            self.endpoint += '/{0}'.format(todo_filter)
+            endpoint += '/{0}'.format(todo_filter)
 
-        self.endpoint += '.json'
+        endpoint += '.json'
 
+        query = {}
         if due_since_date:
-            self.endpoint += '?due_since={0}'.format(due_since_date)
+            query['due_since'] = due_since_date
 
-        request = self.get(self.construct_url())
+        if not todo_id and (lazy or prefetch):
+            return self._paginate(endpoint, query, prefetch=prefetch)
 
-        if request.status_code == 200:
-            return json.loads(request.content)
+        stream = stream and not todo_id
+        request = yield Call('GET', self.construct_url(endpoint, query),
+            stream=stream)
+
+        if request.status_code == 200 and stream:
+            return streaming.iter_records(request, fields)
+        elif request.status_code == 200:
+            return codec.decode(request)
 
         try:
-            raise BasecampAPIError(json.loads(request.content).get('error'))
+            raise BasecampAPIError(codec.decode(request).get('error'))
         except:
             pass
 
-    def complete(self, todo_item_id):
+    @operation
+    def complete(self, project_id, todo_item_id=None):
         """
         Complete a todo list item
 
-        :param todo_item_id: id of the todo item to copmlete.
-        :rtype: True if the todo list is removed, otherwise \
+        :param project_id: id of the project of the todo item.
+        :param todo_item_id: id of the todo item to complete.
+        :rtype dictionary: the updated todo item, otherwise \
         a :class:`BasecampAPIError` exception.
 
+        .. deprecated:: 0.0.1
+            ``complete(todo_item_id)``, without the project, sends the
+            request to ``projects/{todo_item_id}/complete.json``, which
+            the API doesn't serve, and returns True. Pass the project id.
+
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
-        >>> api = basecamp.api.todo list(account_url, access_token)
-        >>> removed = api.remove(675)
+        >>> api = basecamp.api.Todo(account_url, access_token)
+        >>> todo = api.complete(1, 675)
         """
-        self.endpoint = '{0}/{1}/complete.json'.format(self.endpoint, todo_item_id)
-        request = self.put(self.construct_url())
-
-        if request.status_code == 200:
-            return True
-        elif request.status_code == 403:
-            raise BasecampAPIError()
-
-        raise BasecampAPIError()
+        return (yield from self._set_completed(project_id, todo_item_id,
+            True))
 
-    def uncomplete(self, todo_item_id):
+    @operation
+    def uncomplete(self, project_id, todo_item_id=None):
         """
         UnComplete a todo list item
 
-        :param todo_item_id: id of the todo item to copmlete.
-        :rtype: True if the todo list is removed, otherwise \
+        :param project_id: id of the project of the todo item.
+        :param todo_item_id: id of the todo item to uncomplete.
+        :rtype dictionary: the updated todo item, otherwise \
         a :class:`BasecampAPIError` exception.
 
+        .. deprecated:: 0.0.1
+            ``uncomplete(todo_item_id)``, without the project, sends the
+            request to ``projects/{todo_item_id}/uncomplete.json``, which
+            the API doesn't serve, and returns True. Pass the project id.
+
         >>> import basecamp.api
         >>> account_url = 'https://basecamp.com/12345/api/v1'
         >>> access_token = 'access_token'
-        >>> api = basecamp.api.todo list(account_url, access_token)
-        >>> removed = api.remove(675)
+        >>> api = basecamp.api.Todo(account_url, access_token)
+        >>> todo = api.uncomplete(1, 675)
         """
-        self.endpoint = '{0}/{1}/uncomplete.json'.format(todo_item_id)
-        request = self.put(self.construct_url())
+        return (yield from self._set_completed(project_id, todo_item_id,
+            False))
+
+    def _set_completed(self, project_id, todo_item_id, completed):
+        """
+        Operation completing or uncompleting a todo item.
+        """
+        if todo_item_id is None:
+            return (yield from self._set_completed_legacy(project_id,
+                completed))
+
+        endpoint = '{0}/{1}/todos/{2}.json'.format(
+            self.endpoint,
+            project_id,
+            todo_item_id)
+
+        data = {
+            'completed': completed
+        }
+
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
+
+        if request.status_code == 200:
+            return codec.decode(request)
+        elif request.status_code == 403:
+            raise BasecampAPIError()
+
+        raise BasecampAPIError(request.content)
+
+    def _set_completed_legacy(self, todo_item_id, completed):
+        """
+        Operation completing or uncompleting a todo item the way
+        ``complete(todo_item_id)`` used to.
+        """
+        action = 'complete' if completed else 'uncomplete'
+        warnings.warn('Todo.{0}(todo_item_id) is deprecated, pass the '
+            'project id too: Todo.{0}(project_id, todo_item_id).'.format(
+                action), DeprecationWarning, stacklevel=6)
+
+        endpoint = '{0}/{1}/{2}.json'.format(self.endpoint, todo_item_id,
+            action)
+        request = yield Call('PUT', self.construct_url(endpoint))
 
         if request.status_code == 200:
             return True
@@ -121,6 +189,7 @@ class Todo(Basecamp):
 
         raise BasecampAPIError()
 
+    @operation
     def create(self, project_id, todo_list_id, content):
         """
         Create a new todo list in a basecamp account.
@@ -137,7 +206,7 @@ class Todo(Basecamp):
         >>> api = basecamp.api.TodoList(account_url, access_token)
         >>> todo_items = api.create('My New List', 'New stuff to do')
         """
-        self.endpoint = '{0}/{1}/todolists/{2}/todos.json'.format(
+        endpoint = '{0}/{1}/todolists/{2}/todos.json'.format(
             self.endpoint,
             project_id,
             todo_list_id)
@@ -146,10 +215,11 @@ class Todo(Basecamp):
             'content': content
         }
 
-        request = self.post(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('POST', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 201:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create todo lists
             # or reached the todo list limit
@@ -157,6 +227,7 @@ class Todo(Basecamp):
 
         raise BasecampAPIError(request.content)
 
+    @operation
     def update(self, project_id, todo_id, content):
         """
         Update an existing basecamp todo list.
@@ -174,7 +245,7 @@ class Todo(Basecamp):
         >>> todo lists = api.update(675, 'Giant Steps', 'John Coltrane')
 
         """
-        self.endpoint = '{0}/{1}/todos/{2}.json'.format(
+        endpoint = '{0}/{1}/todos/{2}.json'.format(
             self.endpoint,
             project_id,
             todo_id)
@@ -183,10 +254,11 @@ class Todo(Basecamp):
             'content': content
         }
 
-        request = self.put(self.construct_url(), payload=json.dumps(data))
+        request = yield Call('PUT', self.construct_url(endpoint),
+            codec.dumps(data))
 
         if request.status_code == 200:
-            return json.loads(request.content)
+            return codec.decode(request)
         elif request.status_code == 403:
             # not allowed to create todo lists
             # or reached the todo list limit
@@ -194,6 +266,7 @@ class Todo(Basecamp):
 
         raise BasecampAPIError(request.content)
 
+    @operation
     def remove(self, project_id, todo_id):
         """
         Remove a todo list
@@ -208,12 +281,12 @@ class Todo(Basecamp):
         >>> api = basecamp.api.todo list(account_url, access_token)
         >>> removed = api.remove(675)
         """
-        self.endpoint = '{0}/{1}/todos/{2}.json'.format(
+        endpoint = '{0}/{1}/todos/{2}.json'.format(
             self.endpoint,
             project_id,
             todo_id)
 
-        request = self.delete(self.construct_url())
+        request = yield Call('DELETE', self.construct_url(endpoint))
 
         if request.status_code == 204:
             return True
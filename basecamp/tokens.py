@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+======
+Tokens
+======
+
+Access tokens expire (Basecamp's last two weeks). A :class:`TokenManager`
+keeps track of when, and trades the refresh token for a new access token
+before that happens, so a long crawl doesn't die halfway.
+
+    >>> import basecamp.api
+    >>> from basecamp.tokens import TokenManager
+    >>> auth = basecamp.api.Auth(client_id, client_secret, redirect_uri)
+    >>> tokens = TokenManager.from_token(auth, auth.get_token(code),
+    ...     on_refresh=save_tokens)
+    >>> client = basecamp.api.BasecampClient(account_url,
+    ...     tokens.access_token, tokens.refresh_token, token_manager=tokens)
+
+Every resource built with the manager sends the current token. Shortly
+before it expires, the next request refreshes it first. A request that is
+still answered with a ``401 Unauthorized`` refreshes the token once and is
+replayed with the new one.
+
+However many threads find the token expired at the same time, only one
+of them calls Launchpad; the others wait for its result. The same goes
+for asyncio tasks when the manager is given an
+:class:`basecamp.aio.AsyncAuth`.
+"""
+import asyncio
+import threading
+import time
+import urllib.request, urllib.parse, urllib.error
+
+from .exceptions import ImproperlyConfigured
+
+
+def token_in(url):
+    """
+    Get the ``access_token`` query string argument of ``url``, or None.
+    """
+    query = urllib.parse.urlsplit(url).query
+    for key, value in urllib.parse.parse_qsl(query, keep_blank_values=True):
+        if key == 'access_token':
+            return value
+    return None
+
+
+def replace_token(url, access_token):
+    """
+    Get ``url`` with its ``access_token`` replaced by ``access_token``.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = [(key, access_token if key == 'access_token' else value)
+        for key, value in urllib.parse.parse_qsl(parts.query,
+            keep_blank_values=True)]
+
+    return urllib.parse.urlunsplit(parts._replace(
+        query=urllib.parse.urlencode(query)))
+
+
+class TokenManager(object):
+    """
+    The current access token of an account, refreshed as it expires.
+
+    :param auth: :class:`basecamp.auth.Auth` used to refresh the token, or
+        an :class:`basecamp.aio.AsyncAuth` for asyncio resources.
+    :param access_token: the current access token.
+    :param refresh_token: the refresh token from :meth:`Auth.get_token`.
+    :param expires_in: seconds the access token is valid for, from now.
+        Without it the token is only refreshed after a ``401``.
+    :param margin: refresh this many seconds before the token expires.
+    :param on_refresh: optional callable passed the manager after every
+        refresh, eg. to store the new tokens.
+    :param clock: function returning the current time in seconds.
+    """
+
+    def __init__(self, auth, access_token, refresh_token, expires_in=None,
+            margin=300.0, on_refresh=None, clock=time.time):
+        self.auth = auth
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.margin = margin
+        self.on_refresh = on_refresh
+        self.clock = clock
+
+        self.expires_at = None
+        if expires_in is not None:
+            self.expires_at = clock() + expires_in
+
+        self._lock = threading.Lock()
+        self._pending = None
+
+        self.refreshes = 0
+        self.failures = 0
+
+    def __repr__(self):
+        return '<BasecampTokenManager at 0x%x>' % (id(self))
+
+    @classmethod
+    def from_token(cls, auth, token, **kwargs):
+        """
+        Create a manager for a token returned by :meth:`Auth.get_token`.
+        """
+        return cls(auth, token['access_token'], token.get('refresh_token'),
+            expires_in=token.get('expires_in'), **kwargs)
+
+    @property
+    def can_refresh(self):
+        """
+        Whether there is what it takes to refresh the token.
+        """
+        return bool(self.auth is not None and self.refresh_token)
+
+    def expiring(self):
+        """
+        Whether the token expires within :attr:`margin` seconds.
+        """
+        return self.expires_at is not None and \
+            self.expires_at - self.margin <= self.clock()
+
+    def _update(self, token):
+        stale = self.access_token
+        self.access_token = token['access_token']
+        self.refresh_token = token.get('refresh_token') or self.refresh_token
+
+        self.expires_at = None
+        if token.get('expires_in') is not None:
+            self.expires_at = self.clock() + token['expires_in']
+
+        self.refreshes += 1
+
+        invalidate = getattr(self.auth, 'invalidate_authorization', None)
+        if invalidate is not None:
+            invalidate(stale)
+
+    def refresh(self, stale=None):
+        """
+        Get a new access token.
+
+        :param stale: the token found to be expired. If another thread has
+            replaced it in the meantime, its token is used instead of
+            refreshing again.
+        :rtype: the current access token.
+        """
+        if not self.can_refresh:
+            raise ImproperlyConfigured('No refresh token to refresh with.')
+
+        with self._lock:
+            if stale is not None and stale != self.access_token:
+                return self.access_token
+
+            try:
+                token = self.auth.refresh(self.refresh_token)
+            except Exception:
+                self.failures += 1
+                raise
+            self._update(token)
+
+        if self.on_refresh is not None:
+            self.on_refresh(self)
+
+        return self.access_token
+
+    async def refresh_async(self, stale=None):
+        """
+        Asynchronous :meth:`refresh`, for a manager given an
+        :class:`basecamp.aio.AsyncAuth`.
+        """
+        if not self.can_refresh:
+            raise ImproperlyConfigured('No refresh token to refresh with.')
+
+        if stale is not None and stale != self.access_token:
+            return self.access_token
+
+        pending = self._pending
+        if pending is None or pending.done():
+            pending = self._pending = asyncio.ensure_future(
+                self._refresh_async())
+
+        # shielded, so one caller being cancelled doesn't cancel the
+        # refresh the others are waiting on.
+        await asyncio.shield(pending)
+        return self.access_token
+
+    async def _refresh_async(self):
+        try:
+            token = await self.auth.refresh(self.refresh_token)
+        except Exception:
+            self.failures += 1
+            raise
+        self._update(token)
+
+        if self.on_refresh is not None:
+            self.on_refresh(self)
+
+    def prepare(self, url):
+        """
+        Get ``url`` ready to send: refresh the token if it is about to
+        expire, and make sure ``url`` carries the current one.
+        """
+        if self.expiring() and self.can_refresh:
+            self.refresh(stale=self.access_token)
+        return self._current(url)
+
+    async def prepare_async(self, url):
+        """
+        Asynchronous :meth:`prepare`.
+        """
+        if self.expiring() and self.can_refresh:
+            await self.refresh_async(stale=self.access_token)
+        return self._current(url)
+
+    def _current(self, url):
+        token = token_in(url)
+        if token is None or token == self.access_token:
+            return url
+        return replace_token(url, self.access_token)
+
+    def stats(self):
+        """
+        Get token statistics.
+
+        :rtype dictionary: number of ``refreshes``, refresh ``failures``
+            and seconds until the token ``expires_in``, or None if unknown.
+        """
+        expires_in = None
+        if self.expires_at is not None:
+            expires_in = self.expires_at - self.clock()
+
+        return {
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'expires_in': expires_in,
+        }
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+=========
+Transport
+=========
+
+Every API call made by :class:`basecamp.base.Base` goes through a transport.
+The default transport wraps a single :class:`requests.Session`, so TCP and
+TLS connections to basecamp.com are kept alive and reused between calls
+instead of being opened and torn down for every request.
+
+A single transport is shared by every resource class that is not handed one
+explicitly, so a :class:`Project`, a :class:`Todo` and an :class:`Auth`
+instance all draw from the same connection pool.
+
+>>> import basecamp.api
+>>> from basecamp.transport import Transport
+>>> transport = Transport(pool_connections=4, pool_maxsize=20)
+>>> projects = basecamp.api.Project(account_url, access_token,
+...     transport=transport)
+>>> todos = basecamp.api.Todo(account_url, access_token,
+...     transport=transport)
+>>> transport.stats()
+{'requests': 0, 'errors': 0, 'pools': 0, 'connections': 0, ...}
+
+Any subclass of :class:`BaseTransport` can be handed to a resource
+instead, eg. :class:`basecamp.http2.HTTP2Transport`, which multiplexes
+concurrent requests over a single HTTP/2 connection. The asynchronous
+resources of :mod:`basecamp.aio` take an :class:`AsyncBaseTransport`.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class BaseTransport(object):
+    """
+    The interface every transport implements.
+
+    Responses need a ``status_code``, a ``headers`` mapping and the body as
+    ``content``. Streamed responses may also have ``raw`` and
+    ``iter_content`` to read the body in chunks.
+    """
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        """
+        Send a request and return the response.
+
+        Connection errors and timeouts are raised as
+        :class:`requests.ConnectionError` and :class:`requests.Timeout`, so
+        the retry policy covers them whichever transport is used.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Get transport statistics, at least ``requests`` and ``errors``.
+        """
+        return {}
+
+    def close(self):
+        """
+        Close every open connection.
+        """
+
+
+class AsyncBaseTransport(object):
+    """
+    The interface every transport of :mod:`basecamp.aio` implements.
+
+    Responses are read in full, and need a ``status_code``, a ``headers``
+    mapping and the body as ``content``.
+    """
+
+    async def request(self, method, url, headers=None, data=None):
+        """
+        Send a request and return the response, raising the same errors as
+        :meth:`BaseTransport.request`.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Get transport statistics, at least ``requests`` and ``errors``.
+        """
+        return {}
+
+    async def close(self):
+        """
+        Close every open connection.
+        """
+
+
+class Transport(BaseTransport):
+    """
+    A pooled, keep-alive HTTP/1.1 transport.
+
+    :param pool_connections: number of per-host connection pools to cache.
+    :param pool_maxsize: maximum number of connections kept alive per host.
+    :param max_retries: number of times a connection is retried at the
+        socket level (DNS failures, refused connections, etc). Requests that
+        reached the server are never retried here.
+    :param pool_block: block when a host pool is exhausted instead of
+        opening throwaway connections.
+    :param timeout: default timeout in seconds for each request.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, max_retries=0,
+            pool_block=False, timeout=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.pool_block = pool_block
+        self.timeout = timeout
+
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=pool_block)
+
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def __repr__(self):
+        return '<BasecampTransport at 0x%x>' % (id(self))
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        """
+        Send a request over a pooled connection and return the response.
+
+        With ``stream``, the body is left on the socket to be read with
+        ``iter_content``; the connection goes back to the pool once it is
+        read or the response is closed.
+        """
+        with self._lock:
+            self._requests += 1
+
+        try:
+            return self.session.request(method, url,
+                headers=headers,
+                data=data,
+                stream=stream,
+                timeout=self.timeout)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def stats(self):
+        """
+        Get connection pool statistics.
+
+        :rtype dictionary: ``requests`` and ``errors`` sent through this
+            transport, the number of live host ``pools``, the number of
+            ``connections`` ever opened, the number of requests served by
+            those pools (``pool_requests``), and how many connections are
+            currently ``idle`` waiting to be reused.
+
+        ``requests - connections`` is roughly the number of handshakes that
+        keep-alive saved.
+        """
+        pools = self.adapter.poolmanager.pools
+        stats = {
+            'requests': self._requests,
+            'errors': self._errors,
+            'pools': 0,
+            'connections': 0,
+            'pool_requests': 0,
+            'idle': 0,
+        }
+
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+
+            stats['pools'] += 1
+            stats['connections'] += pool.num_connections
+            stats['pool_requests'] += pool.num_requests
+            if pool.pool is not None:
+                stats['idle'] += len([conn for conn in list(pool.pool.queue)
+                    if conn is not None])
+
+        return stats
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+        self.session.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_default_transport():
+    """
+    Get the transport shared by every resource that isn't given one.
+    """
+    global _default_transport  # pylint: disable=W0603
+
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+
+    return _default_transport
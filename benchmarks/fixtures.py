@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Records shaped like the ones the Basecamp API returns, generated
+deterministically so every run benchmarks the same bytes.
+"""
+import functools
+import json
+
+ACCOUNT_URL = 'https://basecamp.com/1234567/api/v1'
+APP_URL = 'https://basecamp.com/1234567'
+
+# a team of 40, so nested people repeat the way they do in real accounts.
+TEAM = 40
+PROJECTS = 25
+
+TIMESTAMP = '2014-03-24T11:00:40.000-05:00'
+
+
+def person(person_id):
+    """
+    Get the short form of a person nested in other records.
+    """
+    person_id = person_id % TEAM
+    return {
+        'id': 149087659 + person_id,
+        'name': 'Person Number {0}'.format(person_id),
+        'type': 'Person',
+        'avatar_url': 'https://asset0.37img.com/global/{0}/avatar.96.gif'
+            .format(person_id),
+        'fullsize_avatar_url': 'https://asset0.37img.com/global/{0}/'
+            'avatar.gif'.format(person_id),
+    }
+
+
+def bucket(project_id):
+    """
+    Get the ``bucket`` of a record in a project.
+    """
+    project_id = project_id % PROJECTS
+    return {
+        'id': 605816632 + project_id,
+        'name': 'Project {0}'.format(project_id),
+        'type': 'Project',
+        'url': '{0}/projects/{1}.json'.format(ACCOUNT_URL,
+            605816632 + project_id),
+        'app_url': '{0}/projects/{1}'.format(APP_URL, 605816632 + project_id),
+    }
+
+
+def comment(comment_id):
+    """
+    Get a comment.
+    """
+    return {
+        'id': 1028592764 + comment_id,
+        'content': 'Looks good to me, shipping it ({0}).'.format(comment_id),
+        'created_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'attachments': [],
+        'creator': person(comment_id),
+    }
+
+
+def project(project_id):
+    """
+    Get a project.
+    """
+    return dict(bucket(project_id), **{
+        'description': 'Everything about project {0}.'.format(project_id),
+        'archived': False,
+        'is_client_project': False,
+        'created_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'draft': False,
+        'template': False,
+        'last_event_at': TIMESTAMP,
+        'starred': project_id % 5 == 0,
+        'trashed': False,
+        'creator': person(project_id),
+    })
+
+
+def todo(todo_id):
+    """
+    Get a todo.
+    """
+    return {
+        'id': 223304243 + todo_id,
+        'todolist_id': 968316918 + todo_id // 50,
+        'position': todo_id % 50 + 1,
+        'content': 'Do the thing number {0}, then tell everyone about it'
+            .format(todo_id),
+        'completed': todo_id % 4 == 0,
+        'due_at': '2014-04-{0:02d}'.format(todo_id % 28 + 1),
+        'due_on': '2014-04-{0:02d}'.format(todo_id % 28 + 1),
+        'comments_count': todo_id % 3,
+        'created_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'private': False,
+        'trashed': False,
+        'url': '{0}/projects/{1}/todos/{2}.json'.format(ACCOUNT_URL,
+            605816632 + todo_id % PROJECTS, 223304243 + todo_id),
+        'app_url': '{0}/projects/{1}/todos/{2}'.format(APP_URL,
+            605816632 + todo_id % PROJECTS, 223304243 + todo_id),
+        'subscribers': [person(todo_id), person(todo_id + 1)],
+        'assignee': person(todo_id + 7),
+        'creator': person(todo_id),
+        'bucket': bucket(todo_id),
+    }
+
+
+def document(document_id):
+    """
+    Get a document.
+    """
+    return {
+        'id': 2080221 + document_id,
+        'title': 'Meeting notes {0}'.format(document_id),
+        'content': '<div>{0}</div>'.format(
+            'We talked about the roadmap and agreed on priorities. ' * 20),
+        'comments_count': 2,
+        'created_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'private': False,
+        'trashed': False,
+        'url': '{0}/projects/{1}/documents/{2}.json'.format(ACCOUNT_URL,
+            605816632 + document_id % PROJECTS, 2080221 + document_id),
+        'app_url': '{0}/projects/{1}/documents/{2}'.format(APP_URL,
+            605816632 + document_id % PROJECTS, 2080221 + document_id),
+        'creator': person(document_id),
+        'last_updater': person(document_id + 3),
+        'bucket': bucket(document_id),
+        'comments': [comment(document_id * 2), comment(document_id * 2 + 1)],
+    }
+
+
+FACTORIES = {
+    'person': person,
+    'project': project,
+    'todo': todo,
+    'document': document,
+}
+
+
+def records(kind, count):
+    """
+    Get ``count`` records of ``kind``, eg. ``'todo'``.
+    """
+    factory = FACTORIES[kind]
+    return [factory(index) for index in range(count)]
+
+
+@functools.lru_cache(maxsize=None)
+def body(kind, count):
+    """
+    Get the JSON response body listing ``count`` records of ``kind``.
+    """
+    return json.dumps(records(kind, count)).encode('utf-8')
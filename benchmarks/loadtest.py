@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+=========
+Load test
+=========
+
+How many operations per second one process sustains, and how their
+latency behaves as concurrency grows, against a
+:class:`basecamp.fakeserver.FakeBasecamp` running in a separate process.
+
+    python benchmarks/loadtest.py --concurrency 1,8,32 --duration 10
+    python benchmarks/loadtest.py --mode async --concurrency 64,256 \\
+        --mix Todo.fetch=8,Todo.create=1,Project.fetch=1 --latency 0.05
+
+Each concurrency level runs for ``--duration`` seconds: that many threads
+(``--mode threads``) or asyncio tasks (``--mode async``) share one client
+and call resource methods picked at random from ``--mix``, weighted by
+their share. Available operations are the keys of :data:`OPERATIONS`.
+
+Results are written as JSON, to stdout or ``--output``: for every level
+its throughput, errors, the client's CPU time per call and resident memory,
+and for every operation its throughput, error rate and ``p50``, ``p95``,
+``p99`` and ``max`` latency in seconds. ``--url`` and ``--token`` aim the
+load at a server started separately instead.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import basecamp  # noqa: E402
+import basecamp.api  # noqa: E402
+from basecamp import codec  # noqa: E402
+from basecamp.fakeserver import FakeBasecamp  # noqa: E402
+from basecamp.ratelimit import RateLimiter  # noqa: E402
+
+
+def _project(context, rng):
+    return rng.choice(context['projects'])
+
+
+# name -> call made against a client, given the ids found at start.
+OPERATIONS = {
+    'Project.fetch': lambda client, context, rng: client.projects.fetch(),
+    'Project.fetch_one': lambda client, context, rng: client.projects.fetch(
+        _project(context, rng)),
+    'Person.fetch': lambda client, context, rng: client.people.fetch(),
+    'TodoList.fetch': lambda client, context, rng: client.todo_lists.fetch(
+        _project(context, rng)),
+    'Todo.fetch': lambda client, context, rng: client.todos.fetch(
+        _project(context, rng)),
+    'Todo.create': lambda client, context, rng: client.todos.create(
+        *rng.choice(context['todo_lists']), content='Load test todo'),
+    'Document.fetch': lambda client, context, rng: client.documents.fetch(
+        project_id=_project(context, rng)),
+    'Document.update': lambda client, context, rng: client.documents.update(
+        *rng.choice(context['documents']), title='Load test',
+        content='<div>Updated under load.</div>'),
+}
+
+DEFAULT_MIX = 'Todo.fetch=5,Project.fetch=3,Todo.create=2'
+
+
+def parse_mix(mix):
+    """
+    Get the operations and weights of a mix, eg.
+    ``Todo.fetch=5,Todo.create=1``.
+    """
+    names, weights = [], []
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation {0}, choose from {1}.'
+                .format(name, ', '.join(sorted(OPERATIONS))))
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def percentile(ordered, fraction):
+    """
+    Get the nearest-rank ``fraction`` percentile of sorted values.
+    """
+    if not ordered:
+        return None
+    index = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def _serve(connection, options):
+    server = FakeBasecamp(**options).start()
+    connection.send((server.account_url, server.access_token))
+    # until told to stop.
+    connection.recv()
+    server.stop()
+
+
+class ServerProcess(object):
+    """
+    A fake server running in a child process, so its CPU time isn't the
+    client's.
+    """
+
+    def __init__(self, **options):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve,
+            args=(child, options), daemon=True)
+
+    def __enter__(self):
+        self.process.start()
+        self.account_url, self.access_token = self.connection.recv()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.send('stop')
+        self.process.join(5)
+
+
+def discover(client):
+    """
+    Get the ids the operations pick from.
+    """
+    context = {'projects': [], 'todo_lists': [], 'documents': []}
+
+    for project in client.projects.fetch():
+        context['projects'].append(project['id'])
+        for todo_list in client.todo_lists.fetch(project['id']):
+            context['todo_lists'].append((project['id'], todo_list['id']))
+        for document in client.documents.fetch(project_id=project['id']):
+            context['documents'].append((project['id'], document['id']))
+
+    return context
+
+
+def _rss():
+    """
+    Get the resident memory of the process in bytes, and its peak.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS.
+    peak *= 1 if sys.platform == 'darwin' else 1024
+
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[1]) * os.sysconf(
+                'SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        current = None
+
+    return current, peak
+
+
+def _cpu():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_threads(client, context, names, weights, concurrency, duration,
+        seed):
+    """
+    Call operations from ``concurrency`` threads for ``duration`` seconds.
+
+    :rtype list: ``(name, seconds, error)`` of every call.
+    """
+    deadline = time.perf_counter() + duration
+    samples = [[] for _ in range(concurrency)]
+
+    def work(index):
+        rng = random.Random(seed + index)
+        record = samples[index].append
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            error = None
+            try:
+                OPERATIONS[name](client, context, rng)
+            except Exception as exception:  # pylint: disable=W0703
+                error = type(exception).__name__
+            record((name, time.perf_counter() - started, error))
+
+    threads = [threading.Thread(target=work, args=(index,))
+        for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return [sample for worker in samples for sample in worker]
+
+
+def run_tasks(client, context, names, weights, concurrency, duration,
+        seed):
+    """
+    Call operations from ``concurrency`` asyncio tasks for ``duration``
+    seconds.
+
+    :rtype list: ``(name, seconds, error)`` of every call.
+    """
+    samples = []
+
+    async def work(index, deadline):
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            error = None
+            try:
+                await OPERATIONS[name](client, context, rng)
+            except Exception as exception:  # pylint: disable=W0703
+                error = type(exception).__name__
+            samples.append((name, time.perf_counter() - started, error))
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[work(index, deadline)
+            for index in range(concurrency)])
+        await client.close()
+
+    asyncio.run(main())
+
+    return samples
+
+
+def summarize(samples, elapsed):
+    """
+    Get the throughput, errors and latency percentiles of samples.
+    """
+    latencies = sorted(seconds for _, seconds, _ in samples)
+    errors = sum(1 for _, _, error in samples if error)
+
+    return {
+        'calls': len(samples),
+        'throughput': len(samples) / elapsed,
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def run_level(args, account_url, access_token, names, weights,
+        concurrency):
+    """
+    Run one concurrency level.
+    """
+    options = dict(rate_limiter=RateLimiter(requests=args.rate_limit,
+        period=10.0))
+
+    if args.mode == 'async':
+        from basecamp.aio import AsyncBasecampClient, AsyncTransport
+
+        client = AsyncBasecampClient(account_url, access_token,
+            transport=AsyncTransport(limit=max(100, concurrency)),
+            **options)
+        runner = run_tasks
+    else:
+        from basecamp.transport import Transport
+
+        client = basecamp.api.BasecampClient(account_url, access_token,
+            transport=Transport(pool_maxsize=max(10, concurrency)),
+            **options)
+        runner = run_threads
+
+    context = discover(basecamp.api.BasecampClient(account_url,
+        access_token))
+
+    cpu = _cpu()
+    started = time.perf_counter()
+    samples = runner(client, context, names, weights, concurrency,
+        args.duration, args.seed)
+    elapsed = time.perf_counter() - started
+    cpu = _cpu() - cpu
+    rss, max_rss = _rss()
+
+    if args.mode != 'async':
+        client.close()
+
+    result = dict(summarize(samples, elapsed),
+        mode=args.mode,
+        concurrency=concurrency,
+        duration=elapsed,
+        cpu_seconds=cpu,
+        cpu_per_call=cpu / len(samples) if samples else None,
+        rss=rss,
+        max_rss=max_rss,
+        operations={},
+        error_types={})
+
+    for name in names:
+        result['operations'][name] = summarize(
+            [sample for sample in samples if sample[0] == name], elapsed)
+    for _, _, error in samples:
+        if error:
+            result['error_types'][error] = \
+                result['error_types'].get(error, 0) + 1
+
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--mode', choices=('threads', 'async'),
+        default='threads')
+    parser.add_argument('--concurrency', default='1,4,16',
+        help='comma separated numbers of threads or tasks, one run each')
+    parser.add_argument('--duration', type=float, default=10.0,
+        help='seconds each concurrency level runs for')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+        help='operations and their weights, eg. ' + DEFAULT_MIX)
+    parser.add_argument('--rate-limit', type=int, default=10 ** 9,
+        help='requests per 10 seconds the client allows itself')
+    parser.add_argument('--latency', type=float, default=0.005,
+        help='seconds the fake server waits before answering')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--todos', type=int, default=100,
+        help='todos in each todo list of the fake server')
+    parser.add_argument('--url', help='account url of a running server')
+    parser.add_argument('--token', help='access token for --url')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write the results to')
+    args = parser.parse_args(argv)
+
+    names, weights = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    results = []
+
+    def run_all(account_url, access_token):
+        for concurrency in levels:
+            result = run_level(args, account_url, access_token, names,
+                weights, concurrency)
+            results.append(result)
+            sys.stderr.write('{0:>6} {1:<7} {2:>10.1f} calls/s  p50 {3:>8.2f} '
+                'ms  p99 {4:>8.2f} ms  errors {5:.2%}  cpu {6:>7.1f} '
+                'us/call\n'.format(concurrency, args.mode,
+                    result['throughput'], (result['p50'] or 0) * 1e3,
+                    (result['p99'] or 0) * 1e3, result['error_rate'],
+                    (result['cpu_per_call'] or 0) * 1e6))
+
+    if args.url:
+        run_all(args.url, args.token)
+    else:
+        with ServerProcess(projects=args.projects, todos=args.todos,
+                latency=args.latency, jitter=args.jitter,
+                error_rate=args.error_rate, seed=args.seed) as server:
+            run_all(server.account_url, server.access_token)
+
+    report = {
+        'timestamp': datetime.datetime.now(
+            datetime.timezone.utc).isoformat(),
+        'basecamp': basecamp.get_version(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'codec': codec.get_codec().name,
+        'mix': dict(zip(names, weights)),
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
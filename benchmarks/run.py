@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+==========
+Benchmarks
+==========
+
+Per-call CPU cost of the client's hot paths, measured offline: requests
+are answered from memory by a transport that never touches the network.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --sizes 1000 --filter decode
+    python benchmarks/run.py --compare results.json --tolerance 0.1
+
+Covered:
+
+- ``construct_url``, building the url of every call;
+- ``Project.create``, ``Todo.create`` and ``Document.update``, whose cost
+  is mostly serializing the payload;
+- ``fetch`` of projects, people, todos and documents lists, whose cost is
+  mostly decoding the response;
+- hydrating the decoded records into :mod:`basecamp.models`.
+
+Lists are benchmarked at every size of ``--sizes``, 1k, 10k and 100k
+records by default.
+
+Results are written as JSON, to stdout or ``--output``: the Python
+version, platform and codec, then for every benchmark its ``name``,
+``size``, and the ``min``, ``median``, ``mean`` and ``stdev`` seconds per
+call over ``repeat`` rounds of ``number`` calls. With ``--compare``, every
+benchmark whose best time is more than ``--tolerance`` slower than in the
+given results is reported and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import basecamp  # noqa: E402
+import basecamp.api  # noqa: E402
+from basecamp import codec, models  # noqa: E402
+from basecamp.ratelimit import RateLimiter  # noqa: E402
+
+import fixtures  # noqa: E402
+
+
+SIZES = (1000, 10000, 100000)
+
+TOKEN = 'BAhbByIBsHsidmVyc2lvbiI6MSwidXNlcl9pZHMiOlsyMjA5NTg1OSwy--0a1b2c'
+
+
+class Response(object):
+    """
+    A response read from memory.
+    """
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+    def json(self):
+        return codec.loads(self.content)
+
+
+class FixedTransport(object):
+    """
+    Transport answering every request with the same body.
+    """
+
+    def __init__(self, content, status_code=200):
+        self.response = Response(status_code, content)
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        return self.response
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def resource(resource_class, content=b'{}', status_code=200):
+    """
+    Get a resource answered with ``content``, with nothing but the call
+    itself on the path: no cache, pacing, coalescing or instrumentation.
+    """
+    return resource_class(fixtures.ACCOUNT_URL, TOKEN,
+        transport=FixedTransport(content, status_code),
+        cache=None,
+        rate_limiter=RateLimiter(requests=sys.maxsize, period=1.0),
+        coalescer=False,
+        instrumentation=False)
+
+
+def bench_construct_url(size):
+    todos = resource(basecamp.api.Todo)
+    return lambda: todos.construct_url('projects/605816632/todos.json',
+        {'page': 2, 'due_since': '2014-04-01'})
+
+
+def bench_project_create(size):
+    projects = resource(basecamp.api.Project,
+        fixtures.body('project', 1)[1:-1], status_code=201)
+    description = 'Everything about the launch. ' * 10
+    return lambda: projects.create('Launch', description)
+
+
+def bench_todo_create(size):
+    todos = resource(basecamp.api.Todo, fixtures.body('todo', 1)[1:-1],
+        status_code=201)
+    return lambda: todos.create(605816632, 968316918,
+        'Do the thing, then tell everyone about it')
+
+
+def bench_document_update(size):
+    document = fixtures.document(1)
+    documents = resource(basecamp.api.Document,
+        codec.dumps(document).encode('utf-8'))
+    return lambda: documents.update(605816632, document['id'],
+        document['title'], document['content'])
+
+
+def bench_fetch_projects(size):
+    projects = resource(basecamp.api.Project, fixtures.body('project', size))
+    return lambda: projects.fetch()
+
+
+def bench_fetch_people(size):
+    people = resource(basecamp.api.Person, fixtures.body('person', size))
+    return lambda: people.fetch()
+
+
+def bench_fetch_todos(size):
+    todos = resource(basecamp.api.Todo, fixtures.body('todo', size))
+    return lambda: todos.fetch(605816632)
+
+
+def bench_fetch_documents(size):
+    documents = resource(basecamp.api.Document,
+        fixtures.body('document', size))
+    return lambda: documents.fetch()
+
+
+def hydrate(kind, model):
+    def bench(size):
+        records = codec.loads(fixtures.body(kind, size))
+        return lambda: models.load(records, model)
+    return bench
+
+
+# name, setup taking the list size, and whether it depends on the size.
+BENCHMARKS = (
+    ('construct_url', bench_construct_url, False),
+    ('serialize.project_create', bench_project_create, False),
+    ('serialize.todo_create', bench_todo_create, False),
+    ('serialize.document_update', bench_document_update, False),
+    ('decode.project_fetch', bench_fetch_projects, True),
+    ('decode.person_fetch', bench_fetch_people, True),
+    ('decode.todo_fetch', bench_fetch_todos, True),
+    ('decode.document_fetch', bench_fetch_documents, True),
+    ('hydrate.project', hydrate('project', models.Project), True),
+    ('hydrate.todo', hydrate('todo', models.Todo), True),
+    ('hydrate.document', hydrate('document', models.Document), True),
+)
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """
+    Time ``func``.
+
+    :rtype dictionary: seconds per call over ``repeat`` rounds of as many
+        calls as take ``min_time`` seconds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time and number < 10 ** 7:
+        number *= 10
+    # the probe warmed things up, it isn't counted.
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def run(sizes=SIZES, name_filter=None, repeat=5, min_time=0.2, log=None):
+    """
+    Run the benchmarks.
+
+    :rtype list: a result dictionary for every benchmark and size.
+    """
+    results = []
+
+    for name, setup, sized in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+
+        for size in (sizes if sized else (None,)):
+            result = dict(name=name, size=size, **measure(setup(size),
+                repeat=repeat, min_time=min_time))
+            results.append(result)
+
+            if log is not None:
+                log.write('{0:<28} {1:>8} {2:>14.3f} us\n'.format(name,
+                    size or '', result['min'] * 1e6))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Get the benchmarks slower than in ``baseline`` by more than
+    ``tolerance``, a fraction.
+
+    :rtype list: ``(name, size, ratio)`` of every regression.
+    """
+    before = {(result['name'], result['size']): result['min']
+        for result in baseline['results']}
+
+    regressions = []
+    for result in results:
+        previous = before.get((result['name'], result['size']))
+        if previous:
+            ratio = result['min'] / previous
+            if ratio > 1 + tolerance:
+                regressions.append((result['name'], result['size'], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+        help='comma separated numbers of records in list benchmarks')
+    parser.add_argument('--filter', dest='name_filter',
+        help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+        help='seconds each round runs for at least')
+    parser.add_argument('--output', help='file to write the results to')
+    parser.add_argument('--compare', help='results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+        help='slowdown tolerated by --compare, eg. 0.1 for 10%%')
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(size) for size in args.sizes.split(','))
+    results = run(sizes, args.name_filter, args.repeat, args.min_time,
+        log=sys.stderr)
+
+    report = {
+        'timestamp': datetime.datetime.now(
+            datetime.timezone.utc).isoformat(),
+        'basecamp': basecamp.get_version(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'codec': codec.get_codec().name,
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline),
+                args.tolerance)
+        for name, size, ratio in regressions:
+            sys.stderr.write('REGRESSION {0} {1}: {2:.2f}x slower\n'.format(
+                name, size or '', ratio))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,11 @@ setup(
     test_suite='nose.collector',
     tests_require=['nose', ],
     install_requires=['requests>=0.14.0', ],
+    extras_require={
+        'async': ['aiohttp>=3.8', ],
+        'fast': ['orjson', ],
+        'http2': ['httpx[http2]', ],
+    },
     classifiers=[
         "Development Status :: 1 - Planning",
         "Topic :: Utilities",
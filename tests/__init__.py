@@ -8,3 +8,24 @@ from .base import BuildURLTests
 from .projects import Projects
 from .people import People
 from .documents import Documents
+from .transport import Transports
+from .pagination import Pagination
+from .cache import Cache
+from .ratelimit import RateLimit
+from .retry import Retry
+from .aio import Aio
+from .client import Client
+from .crawler import Crawl
+from .mirror import MirrorTests
+from .models import Models
+from .codec import Codec
+from .streaming import Streaming
+from .tokens import Tokens
+from .coalescing import Coalescing
+from .instrumentation import Instrumentations
+from .metrics import Metric
+from .slowlog import SlowLogs
+from .fakeserver import FakeServer
+from .recording import Recording
+from .http2 import HTTP2
+from .events import Events
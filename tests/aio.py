@@ -0,0 +1,110 @@
+"""
+Tests for the asyncio resources.
+"""
+import asyncio
+import json
+import fudge
+import unittest
+
+from nose.tools import raises
+
+from .base import RequestMock
+from basecamp.aio import AsyncDocument, AsyncProject, AsyncTodo
+from basecamp.exceptions import BasecampAPIError
+
+
+class Aio(unittest.TestCase):
+    """
+    asyncio resource tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def make_response(self, status_code, response=None):
+        """
+        Build a response.
+        """
+        mock = RequestMock()
+        mock.status_code = status_code
+        mock.headers = {}
+        mock.content = json.dumps(response)
+
+        return mock
+
+    def test_fetch(self):
+        """
+        A fetch is awaited and builds the same url as the blocking class.
+        """
+        urls = []
+
+        async def fake_request(method, url, headers=None, data=None):
+            urls.append((method, url))
+            return self.make_response(200, [{'id': 1}])
+
+        todos = AsyncTodo(self.url, self.token)
+
+        with fudge.patch('basecamp.aio.AsyncTransport.request') as fake:
+            fake.is_callable().calls(fake_request)
+
+            self.assertEqual(asyncio.run(todos.fetch(1, todo_list_id=2)),
+                [{'id': 1}])
+
+        self.assertEqual(urls, [('GET',
+            '{0}/projects/1/todolists/2/todos.json?access_token={1}'.format(
+                self.url, 'JVGltZQ2WIxzA4%2Fw4kg%3D%3D--8f2687d'))])
+
+    def test_create(self):
+        """
+        Payloads are sent as they are by the blocking class.
+        """
+        sent = []
+
+        async def fake_request(method, url, headers=None, data=None):
+            sent.append(json.loads(data))
+            return self.make_response(201, {'id': 1})
+
+        projects = AsyncProject(self.url, self.token)
+
+        with fudge.patch('basecamp.aio.AsyncTransport.request') as fake:
+            fake.is_callable().calls(fake_request)
+
+            self.assertEqual(asyncio.run(projects.create('foo', 'bar')),
+                {'id': 1})
+
+        self.assertEqual(sent, [{'name': 'foo', 'description': 'bar'}])
+
+    def test_lazy_fetch(self):
+        """
+        A lazy fetch returns an asynchronous page iterator.
+        """
+        async def fake_request(method, url, headers=None, data=None):
+            page = int(url.rsplit('page=', 1)[1])
+            return self.make_response(200,
+                [{'id': x} for x in (range(50) if page == 1 else
+                    range(50, 53))])
+
+        async def walk():
+            documents = AsyncDocument(self.url, self.token)
+            return [x async for x in await documents.fetch(lazy=True,
+                prefetch=True)]
+
+        with fudge.patch('basecamp.aio.AsyncTransport.request') as fake:
+            fake.is_callable().calls(fake_request)
+
+            self.assertEqual(len(asyncio.run(walk())), 53)
+
+    @raises(BasecampAPIError)
+    def test_error(self):
+        """
+        Errors are raised when awaited.
+        """
+        async def fake_request(method, url, headers=None, data=None):
+            return self.make_response(403, {'error': 'no permission'})
+
+        projects = AsyncProject(self.url, self.token)
+
+        with fudge.patch('basecamp.aio.AsyncTransport.request') as fake:
+            fake.is_callable().calls(fake_request)
+
+            asyncio.run(projects.fetch(project=1))
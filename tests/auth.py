@@ -65,3 +65,50 @@ class Auth(BasecampBaseTest):
             self.assertEqual(
                 self.auth.get_token('foobar'),
                 content)
+
+    def test_refresh(self):
+        """
+        Trade a refresh token for a new access token.
+        """
+        content = {
+            'access_token': 'abceasyas456==--1d3c',
+            'expires_in': 1209600,
+        }
+
+        urls = []
+
+        def fake_post(url, payload=None):
+            urls.append(url)
+            return self.setup_mock(200, content)
+
+        with fudge.patch('basecamp.base.Base.post') as fake:
+            fake.is_callable().calls(fake_post)
+            self.assertEqual(self.auth.refresh('yICSwF7ImV4c==--zxvf'),
+                content)
+
+        self.assertTrue('type=refresh' in urls[0])
+        self.assertTrue('refresh_token=yICSwF7ImV4c' in urls[0])
+
+    def test_authorization_cached(self):
+        """
+        Identity and accounts are read from a single authorization request.
+        """
+        content = {
+            'identity': {'id': 9999999, 'first_name': 'Jason'},
+            'accounts': [
+                {'id': 1, 'product': 'bcx'},
+                {'id': 2, 'product': 'campfire'}],
+        }
+        self.auth.invalidate_authorization()
+
+        with fudge.patch('basecamp.base.Base.get') as fake_get:
+            fake_get.is_callable().returns(
+                self.setup_mock(200, content)).times_called(2)
+
+            self.assertEqual(self.auth.get_identity('token')['id'], 9999999)
+            self.assertEqual(self.auth.get_accounts('token'),
+                [{'id': 1, 'product': 'bcx'}])
+            self.assertEqual(len(self.auth.get_accounts('token', 'all')), 2)
+
+            self.auth.invalidate_authorization('token')
+            self.auth.get_identity('token')
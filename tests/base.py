@@ -2,7 +2,9 @@
 Test Base.
 """
 import json
+import fudge
 import unittest
+import basecamp.api
 
 from nose.tools import raises
 
@@ -77,3 +79,45 @@ class BuildURLTests(unittest.TestCase):
         self.assertEqual(
             some_api.construct_url(),
             'http://example.com/foobars?access_token=abceasyas123')
+
+    def test_endpoint_argument(self):
+        """
+        Test that an endpoint and query passed in are used without
+        modifying the instance.
+        """
+        account_url = 'http://example.com'
+        access_token = 'abceasyas123'
+
+        some_api = Basecamp(account_url, access_token)
+        some_api.endpoint = 'foobars'
+        self.assertEqual(
+            some_api.construct_url('/bazes/1.json', {'page': 2}),
+            'http://example.com/bazes/1.json?access_token=abceasyas123&page=2')
+        self.assertEqual(some_api.endpoint, 'foobars')
+
+    def test_repeated_calls(self):
+        """
+        Test that calling a method twice on one instance builds the same url.
+        """
+        account_url = 'http://example.com'
+        access_token = 'abceasyas123'
+        urls = []
+
+        def fake_get(url, headers=None):
+            urls.append(url)
+            mock = RequestMock()
+            mock.status_code = 200
+            mock.content = '[]'
+            return mock
+
+        todos = basecamp.api.Todo(account_url, access_token)
+
+        with fudge.patch('basecamp.base.Base.get') as fake:
+            fake.is_callable().calls(fake_get)
+
+            todos.fetch(1, todo_list_id=2, due_since_date='2012-03-24')
+            todos.fetch(1, todo_list_id=2, due_since_date='2012-03-24')
+
+        self.assertEqual(urls, [
+            'http://example.com/projects/1/todolists/2/todos.json'
+            '?access_token=abceasyas123&due_since=2012-03-24'] * 2)
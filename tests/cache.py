@@ -0,0 +1,143 @@
+"""
+Tests for the conditional GET cache.
+"""
+import json
+import fudge
+import unittest
+import basecamp.api
+
+from .base import RequestMock
+from .ratelimit import FakeClock
+from basecamp.cache import HTTPCache, IdentityCache, canonical_url
+
+
+class Cache(unittest.TestCase):
+    """
+    HTTP cache tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    response = [{'id': 1, 'name': 'BCX'}]
+
+    def make_response(self, status_code, response=None, headers=None):
+        """
+        Build a response with headers.
+        """
+        mock = RequestMock()
+        mock.status_code = status_code
+        mock.headers = headers or {}
+        mock.content = json.dumps(response).encode('utf-8') if response \
+            else b''
+
+        return mock
+
+    def test_canonical_url(self):
+        """
+        The access token is dropped and the query string is sorted.
+        """
+        self.assertEqual(
+            canonical_url('{0}/todos.json?page=2&access_token=abc&a=1'.format(
+                self.url)),
+            '{0}/todos.json?a=1&page=2'.format(self.url))
+
+    def test_revalidate(self):
+        """
+        Validators are sent back and a 304 is served from the cache.
+        """
+        cache = HTTPCache()
+        projects = basecamp.api.Project(self.url, self.token, cache=cache)
+        ok = self.make_response(200, self.response, {'ETag': '"abc"'})
+        not_modified = self.make_response(304)
+
+        responses = [ok, not_modified]
+        sent_headers = []
+
+        def fake_request(method, url, headers=None, data=None):
+            sent_headers.append(headers)
+            return responses.pop(0)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            fake.is_callable().calls(fake_request)
+
+            self.assertEqual(projects.fetch(), self.response)
+            self.assertEqual(
+                basecamp.api.Project(self.url, 'another token',
+                    cache=cache).fetch(),
+                self.response)
+
+        self.assertFalse('If-None-Match' in sent_headers[0])
+        self.assertEqual(sent_headers[1]['If-None-Match'], '"abc"')
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_not_found_invalidates(self):
+        """
+        A 404 drops the cached response.
+        """
+        cache = HTTPCache()
+        url = '{0}/projects/1.json'.format(self.url)
+
+        cache.update(url, self.make_response(200, self.response,
+            {'Last-Modified': 'Sat, 15 Sep 2012 00:24:26 GMT'}))
+        self.assertEqual(cache.validators(url),
+            {'If-Modified-Since': 'Sat, 15 Sep 2012 00:24:26 GMT'})
+
+        cache.update(url, self.make_response(404))
+        self.assertEqual(cache.validators(url), {})
+
+    def test_eviction(self):
+        """
+        The least recently used entries are evicted past either bound.
+        """
+        cache = HTTPCache(max_entries=2)
+
+        for x in range(3):
+            cache.update('{0}/projects/{1}.json'.format(self.url, x),
+                self.make_response(200, self.response, {'ETag': str(x)}))
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(
+            cache.validators('{0}/projects/0.json'.format(self.url)), {})
+
+        cache = HTTPCache(max_bytes=30)
+        for x in range(3):
+            cache.update('{0}/projects/{1}.json'.format(self.url, x),
+                self.make_response(200, self.response, {'ETag': str(x)}))
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['evictions'], 2)
+
+    def test_identity_ttl(self):
+        """
+        Records are served until they expire, and replaced when refreshed.
+        """
+        clock = FakeClock()
+        cache = IdentityCache(ttl=10, clock=clock)
+        person = cache.put(1, {'id': 1, 'name': 'Jason'})
+
+        self.assertTrue(cache.get('1') is person)
+        clock.sleep(10)
+        self.assertEqual(cache.get(1), None)
+
+        refreshed = cache.put(1, {'id': 1, 'name': 'Jason Fried'})
+        self.assertTrue(cache.get(1) is refreshed)
+        self.assertEqual(cache.get(1)['name'], 'Jason Fried')
+        # held copies don't change under their holders.
+        self.assertEqual(person['name'], 'Jason')
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    def test_identity_lru(self):
+        """
+        The least recently used records are evicted.
+        """
+        cache = IdentityCache(max_entries=2)
+        for x in range(3):
+            cache.put(x, {'id': x})
+            cache.get(0)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(1), None)
+        self.assertEqual(cache.get(0), {'id': 0})
+        self.assertEqual(cache.stats()['evictions'], 1)
@@ -0,0 +1,68 @@
+"""
+Tests for the client facade.
+"""
+import fudge
+import basecamp.api
+
+from .base import BasecampBaseTest
+from basecamp.aio import AsyncBasecampClient, AsyncTransport, AsyncTodo
+
+
+class Client(BasecampBaseTest):
+    """
+    Client tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def test_shared_components(self):
+        """
+        Every resource shares the client's transport, cache, limiter and
+        retry policy.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token)
+        resources = [client.projects, client.todo_lists, client.todos,
+            client.documents, client.comments, client.people]
+
+        for resource in resources:
+            self.assertTrue(resource.transport is client.transport)
+            self.assertTrue(resource.cache is client.cache)
+            self.assertTrue(resource.rate_limiter is client.rate_limiter)
+            self.assertTrue(resource.retry_policy is client.retry_policy)
+            self.assertEqual(resource.access_token, self.token)
+
+        self.assertTrue(client.cache is not None)
+        self.assertTrue(client.people.identity_cache is client.identity_cache)
+        self.assertTrue(isinstance(client.todos, basecamp.api.Todo))
+        self.assertTrue(client.todos is client.todos)
+
+    def test_disable_cache(self):
+        """
+        Caching can be turned off.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            cache=False)
+
+        self.assertTrue(client.projects.cache is None)
+        self.assertEqual(client.stats()['cache'], None)
+
+    def test_fetch(self):
+        """
+        Calls go through the resource classes.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token)
+
+        with fudge.patch('basecamp.base.Base.get') as fake_get:
+            fake_get.is_callable().returns(self.setup_mock(200, [{'id': 1}]))
+
+            self.assertEqual(client.projects.fetch(), [{'id': 1}])
+
+    def test_async_client(self):
+        """
+        The asyncio client hands out asyncio resources.
+        """
+        client = AsyncBasecampClient(self.url, self.token)
+
+        self.assertTrue(isinstance(client.transport, AsyncTransport))
+        self.assertTrue(isinstance(client.todos, AsyncTodo))
@@ -0,0 +1,144 @@
+"""
+Tests for coalescing identical GET requests.
+"""
+import asyncio
+import threading
+import time
+import unittest
+import basecamp.api
+import basecamp.retry
+
+from .base import RequestMock
+from basecamp.aio import AsyncBasecampClient, AsyncResponse
+from basecamp.coalescing import Coalescer
+from basecamp.transport import Transport
+
+
+class SlowTransport(Transport):
+    """
+    Transport taking a while to answer every request.
+    """
+
+    def __init__(self, status_code=200):
+        super(SlowTransport, self).__init__()
+        self.status_code = status_code
+        self.urls = []
+
+    def request(self, method, url, headers=None, data=None):
+        self.urls.append(url)
+        time.sleep(0.05)
+        mock = RequestMock()
+        mock.status_code = self.status_code
+        mock.headers = {}
+        mock.content = b'[{"id": 1}]'
+        return mock
+
+
+class SlowAsyncTransport(object):
+    """
+    Asynchronous :class:`SlowTransport`.
+    """
+
+    def __init__(self):
+        self.urls = []
+
+    async def request(self, method, url, headers=None, data=None):
+        self.urls.append(url)
+        await asyncio.sleep(0.05)
+        return AsyncResponse(200, b'[{"id": 1}]', {})
+
+    def stats(self):
+        return {}
+
+
+class Coalescing(unittest.TestCase):
+    """
+    Coalescing tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def fetch_concurrently(self, client, count=8):
+        """
+        Fetch the project list from ``count`` threads at once.
+        """
+        results = []
+        errors = []
+
+        def fetch():
+            try:
+                results.append(client.projects.fetch())
+            except Exception as error:  # pylint: disable=W0703
+                errors.append(error)
+
+        threads = [threading.Thread(target=fetch) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results, errors
+
+    def test_threads(self):
+        """
+        Concurrent identical GETs share one request and its decoded body.
+        """
+        transport = SlowTransport()
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            transport=transport)
+
+        results, errors = self.fetch_concurrently(client)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(transport.urls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(client.stats()['coalescer'],
+            {'hits': 7, 'misses': 1, 'in_flight': 0})
+
+    def test_errors_shared(self):
+        """
+        Every waiting caller gets the error of the shared request.
+        """
+        transport = SlowTransport(status_code=500)
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            transport=transport, retry_policy=basecamp.retry.RetryPolicy(
+                max_retries=0))
+
+        results, errors = self.fetch_concurrently(client, count=4)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(len(transport.urls), 1)
+
+    def test_disabled(self):
+        """
+        Coalescing can be turned off.
+        """
+        transport = SlowTransport()
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            transport=transport, coalescer=False)
+
+        self.fetch_concurrently(client, count=3)
+
+        self.assertEqual(len(transport.urls), 3)
+
+    def test_tasks(self):
+        """
+        Concurrent identical GETs from asyncio tasks share one request.
+        """
+        transport = SlowAsyncTransport()
+        coalescer = Coalescer()
+        client = AsyncBasecampClient(self.url, self.token,
+            transport=transport, coalescer=coalescer)
+
+        async def main():
+            return await asyncio.gather(*[
+                client.projects.fetch() for _ in range(5)])
+
+        results = asyncio.run(main())
+
+        self.assertEqual(results, [[{'id': 1}]] * 5)
+        self.assertEqual(len(transport.urls), 1)
+        self.assertEqual(coalescer.stats()['hits'], 4)
@@ -0,0 +1,58 @@
+"""
+Tests for the JSON codecs.
+"""
+import unittest
+
+from .base import RequestMock
+from basecamp import codec
+from basecamp.cache import CacheEntry, CachedResponse
+
+
+class Codec(unittest.TestCase):
+    """
+    Codec tests.
+    """
+
+    def tearDown(self):
+        codec.set_codec()
+
+    def test_select(self):
+        """
+        The fastest installed codec is picked.
+        """
+        try:
+            import orjson  # pylint: disable=W0611
+        except ImportError:
+            self.assertEqual(codec.get_codec().name, 'json')
+        else:
+            self.assertEqual(codec.get_codec().name, 'orjson')
+
+    def test_codecs(self):
+        """
+        Every codec decodes bytes and text and encodes compact text.
+        """
+        for name, codec_class in codec.CODECS.items():
+            try:
+                codec.set_codec(name)
+            except ImportError:
+                continue
+
+            self.assertEqual(codec.loads(b'{"name": "caf\xc3\xa9"}'),
+                {'name': 'caf\xe9'})
+            self.assertEqual(codec.loads('[1, 2]'), [1, 2])
+            self.assertEqual(codec.dumps({'a': [1, None]}),
+                '{"a":[1,null]}')
+            self.assertIsInstance(codec.get_codec(), codec_class)
+
+    def test_decode(self):
+        """
+        Cached responses are decoded once.
+        """
+        entry = CacheEntry('"x"', None, b'{"id": 1}', {})
+        first = codec.decode(CachedResponse(entry))
+
+        self.assertIs(codec.decode(CachedResponse(entry)), first)
+
+        response = RequestMock()
+        response.content = b'{"id": 2}'
+        self.assertEqual(codec.decode(response), {'id': 2})
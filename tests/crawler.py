@@ -0,0 +1,138 @@
+"""
+Tests for the account crawler.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import fudge
+import unittest
+import basecamp.api
+
+from .base import RequestMock
+from basecamp.crawler import Crawler
+
+
+class Crawl(unittest.TestCase):
+    """
+    Crawler tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    responses = {
+        'projects.json': [{'id': 1}, {'id': 2}],
+        'projects/archived.json': [{'id': 3, 'archived': True}],
+        'projects/1/todolists.json': [{'id': 10}],
+        'projects/1/todolists/completed.json': [{'id': 11}],
+        'projects/2/todolists.json': [],
+        'projects/2/todolists/completed.json': [],
+        'projects/3/todolists.json': [],
+        'projects/3/todolists/completed.json': [],
+        'projects/1/todolists/10/todos.json': [
+            {'id': 100, 'comments_count': 1}, {'id': 101}],
+        'projects/1/todolists/11/todos.json': [{'id': 110}],
+        'projects/1/todos/100.json': {'id': 100, 'comments': [{'id': 7}]},
+        'projects/1/documents.json': [{'id': 20}],
+        'projects/2/documents.json': [{'id': 21}],
+        'projects/3/documents.json': [],
+    }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def fake_get(self, url, headers=None):
+        """
+        Respond with the first page of the requested endpoint.
+        """
+        endpoint, query = url[len(self.url) + 1:].split('?')
+        mock = RequestMock()
+        mock.status_code = 200
+        mock.content = json.dumps(self.responses[endpoint]
+            if 'page=1' in query or 'page' not in query else [])
+
+        return mock
+
+    def crawl(self, output, **kwargs):
+        """
+        Run a crawl against the fake responses.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token)
+
+        with fudge.patch('basecamp.base.Base.get') as fake:
+            fake.is_callable().calls(self.fake_get)
+            return Crawler(client, output, workers=4, **kwargs).run()
+
+    def test_crawl(self):
+        """
+        Every record is written once.
+        """
+        output = io.StringIO()
+        stats = self.crawl(output)
+        records = [json.loads(line) for line in
+            output.getvalue().splitlines()]
+
+        self.assertEqual(sorted((x['type'], x['data']['id'])
+            for x in records), [
+                ('comment', 7),
+                ('document', 20),
+                ('document', 21),
+                ('project', 1),
+                ('project', 2),
+                ('project', 3),
+                ('todo', 100),
+                ('todo', 101),
+                ('todo', 110),
+                ('todolist', 10),
+                ('todolist', 11),
+            ])
+        self.assertEqual(stats['projects'], 3)
+        self.assertEqual(stats['records'], 11)
+        self.assertEqual(stats['todo'], 3)
+
+        comment = [x for x in records if x['type'] == 'comment'][0]
+        self.assertEqual(comment['parent_type'], 'todo')
+        self.assertEqual(comment['parent_id'], 100)
+        self.assertEqual(comment['project_id'], 1)
+
+    def test_resume(self):
+        """
+        Completed projects are skipped when resuming.
+        """
+        output = os.path.join(self.directory, 'snapshot.jsonl')
+        state = os.path.join(self.directory, 'snapshot.state')
+
+        with open(state, 'w') as state_file:
+            json.dump({'completed': [1]}, state_file)
+
+        stats = self.crawl(output, state_path=state)
+
+        self.assertEqual(stats['projects'], 2)
+        self.assertEqual(stats['projects_skipped'], 1)
+        self.assertEqual(stats['records'], 3)
+
+        with open(state) as state_file:
+            self.assertEqual(json.load(state_file),
+                {'completed': [1, 2, 3]})
+
+    def test_active_only(self):
+        """
+        Archived projects and completed todo lists can be left out.
+        """
+        stats = self.crawl(io.StringIO(), archived=False, completed=False)
+
+        self.assertEqual(stats['projects'], 2)
+        self.assertEqual(stats['records'], 8)
+
+    def test_no_output(self):
+        """
+        Records need somewhere to go.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token)
+
+        self.assertRaises(ValueError, Crawler, client)
@@ -0,0 +1,61 @@
+"""
+Tests for events.
+"""
+import json
+import fudge
+import unittest
+import basecamp.api
+
+from .base import RequestMock
+
+
+class Events(unittest.TestCase):
+    """
+    Event tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def fetch_eventable(self, url):
+        """
+        Fetch the eventable at ``url``, and get it and the requested url.
+        """
+        events = basecamp.api.Event(self.url, self.token)
+        requested = []
+
+        def fake_get(url, headers=None):
+            requested.append(url)
+            mock = RequestMock()
+            mock.status_code = 200
+            mock.content = json.dumps({'id': 100})
+            return mock
+
+        with fudge.patch('basecamp.base.Base.get') as fake:
+            fake.is_callable().calls(fake_get)
+            record = events.fetch_eventable({'eventable': {'url': url}})
+
+        return record, requested
+
+    def test_fetch_eventable(self):
+        """
+        Eventables are fetched from their url within the account.
+        """
+        expected = self.url + '/projects/1/todos/100.json?access_token=' + \
+            self.token.replace('/', '%2F').replace('=', '%3D')
+
+        for url in (self.url + '/projects/1/todos/100.json',
+                'http://EXAMPLE.com/123/api/v1/projects/1/todos/100.json',
+                self.url + '/projects/1/todos/100.json?x=1'):
+            record, requested = self.fetch_eventable(url)
+            self.assertEqual(record, {'id': 100})
+            self.assertEqual(requested, [expected])
+
+    def test_other_account(self):
+        """
+        Urls outside the account are refused.
+        """
+        for url in ('https://example.org/123/api/v1/projects/1.json',
+                'https://example.com/1234/api/v1/projects/1.json',
+                '/projects/1.json'):
+            self.assertRaises(ValueError, self.fetch_eventable, url)
@@ -0,0 +1,253 @@
+"""
+Tests for the fake Basecamp server.
+"""
+import json
+import unittest
+import urllib.error
+import urllib.request
+import basecamp.api
+import basecamp.retry
+
+from basecamp.cache import IdentityCache
+from basecamp.exceptions import BasecampAPIError
+from basecamp.fakeserver import FakeBasecamp
+from basecamp.ratelimit import RateLimiter
+
+
+class FakeServer(unittest.TestCase):
+    """
+    Fake server tests, through real sockets.
+    """
+
+    def setUp(self):
+        self.server = FakeBasecamp(projects=2, todo_lists=2, todos=60,
+            documents=3).start()
+        self.addCleanup(self.server.stop)
+
+    def client(self, **kwargs):
+        """
+        Get a client of the fake account.
+        """
+        kwargs.setdefault('rate_limiter', RateLimiter())
+        kwargs.setdefault('retry_policy',
+            basecamp.retry.RetryPolicy(backoff_factor=0))
+        return basecamp.api.BasecampClient(self.server.account_url,
+            self.server.access_token, **kwargs)
+
+    def get(self, path, token=None):
+        """
+        GET ``path`` of the account with urllib.
+
+        :rtype: ``(status, headers)``
+        """
+        url = '{0}/{1}?access_token={2}'.format(self.server.account_url,
+            path, token or self.server.access_token)
+        try:
+            response = urllib.request.urlopen(url)
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers
+        response.read()
+        return response.status, response.headers
+
+    def test_pagination(self):
+        """
+        Lists are served a page at a time.
+        """
+        client = self.client()
+        project_id = self.server.project_ids[0]
+
+        self.assertEqual(len(client.todos.fetch(project_id)), 50)
+        self.assertEqual(len(list(client.todos.fetch(project_id,
+            lazy=True))), 120)
+
+    def test_etag(self):
+        """
+        Unchanged lists are answered with a 304.
+        """
+        client = self.client()
+
+        first = client.projects.fetch()
+        self.assertEqual(client.projects.fetch(), first)
+
+        self.assertEqual(self.server.stats()['not_modified'], 1)
+
+    def test_keep_alive(self):
+        """
+        Sequential requests share one connection.
+        """
+        client = self.client()
+
+        for _ in range(5):
+            client.people.fetch()
+
+        self.assertEqual(self.server.stats()['connections'], 1)
+        self.assertEqual(self.server.stats()['requests'], 5)
+
+    def test_writes(self):
+        """
+        Created records are served and reported as events.
+        """
+        client = self.client(identity_cache=IdentityCache())
+        project_id = self.server.project_ids[1]
+        todo_list = client.todo_lists.fetch(project_id)[0]
+
+        todo = client.todos.create(project_id, todo_list['id'], 'Ship it')
+        client.comments.create(project_id, 'todos', todo['id'], 'Done?')
+
+        fetched = client.todos.fetch(project_id, todo_id=todo['id'])
+        self.assertEqual(fetched['content'], 'Ship it')
+        self.assertEqual([comment['content'] for comment
+            in fetched['comments']], ['Done?'])
+        self.assertEqual([event['eventable']['id'] for event
+            in client.events.fetch('2014-01-01T00:00:00Z')],
+            [todo['id'], todo['id']])
+        self.assertEqual(client.people.fetch('me')['name'], 'Person 0')
+
+    def test_complete(self):
+        """
+        Todos are completed and uncompleted within their project.
+        """
+        client = self.client(cache=False)
+        project_id = self.server.project_ids[0]
+        todo_id = client.todos.fetch(project_id)[0]['id']
+
+        self.assertTrue(client.todos.complete(project_id, todo_id)[
+            'completed'])
+        self.assertTrue(client.todos.fetch(project_id,
+            todo_id=todo_id)['completed'])
+        self.assertFalse(client.todos.uncomplete(project_id, todo_id)[
+            'completed'])
+        self.assertRaises(BasecampAPIError, client.todos.complete,
+            self.server.project_ids[1], todo_id)
+
+    def test_complete_deprecated(self):
+        """
+        Completing a todo without its project warns, and the request it
+        sends isn't served.
+        """
+        client = self.client(cache=False)
+        todo_id = client.todos.fetch(self.server.project_ids[0])[0]['id']
+
+        with self.assertWarns(DeprecationWarning) as caught, \
+                self.assertRaises(BasecampAPIError):
+            client.todos.complete(todo_id)
+
+        self.assertEqual(caught.filename, __file__)
+
+    def test_todo_lists(self):
+        """
+        Todo lists are created, updated and removed within their project.
+        """
+        client = self.client(cache=False)
+        project_id, other_id = self.server.project_ids
+
+        todo_list = client.todo_lists.create('Launch', project_id=project_id)
+        client.todos.create(project_id, todo_list['id'], 'Ship it')
+        self.assertEqual([todo['content'] for todo in
+            client.todo_lists.todo_items(todo_list['id'],
+                project_id=project_id)], ['Ship it'])
+        self.assertEqual(client.todo_lists.update(todo_list['id'],
+            'Relaunch', project_id=project_id)['name'], 'Relaunch')
+        self.assertRaises(BasecampAPIError, client.todo_lists.remove,
+            todo_list['id'], project_id=other_id)
+        self.assertTrue(client.todo_lists.remove(todo_list['id'],
+            project_id=project_id))
+        self.assertNotIn(todo_list['id'], [x['id'] for x in
+            client.todo_lists.fetch(project_id)])
+
+    def test_todo_lists_deprecated(self):
+        """
+        Todo list calls without their project warn, and the requests they
+        send aren't served.
+        """
+        client = self.client(cache=False)
+        project_id = self.server.project_ids[0]
+        list_id = client.todo_lists.fetch(project_id)[0]['id']
+
+        calls = [
+            lambda: client.todo_lists.create('Launch'),
+            lambda: client.todo_lists.update(list_id, 'Relaunch'),
+            lambda: client.todo_lists.remove(list_id),
+            lambda: client.todo_lists.todo_items(list_id),
+            lambda: client.projects.reorder_todo_lists(project_id,
+                [list_id]),
+        ]
+        for call in calls:
+            with self.assertWarns(DeprecationWarning) as caught, \
+                    self.assertRaises(BasecampAPIError):
+                call()
+            self.assertEqual(caught.filename, __file__)
+
+    def test_rate_limit(self):
+        """
+        Requests beyond the rate limit are answered with a 429.
+        """
+        self.server.rate_limit = 2
+
+        statuses = [self.get('people.json')[0] for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(self.get('people.json')[1]['Retry-After'], '10')
+
+    def test_failures(self):
+        """
+        Injected failures are retried or replayed by the client.
+        """
+        client = self.client()
+        self.server.fail_next(2, status=503)
+        self.server.fail_next(1, status=429, retry_after=0)
+
+        self.assertEqual(len(client.projects.fetch()), 2)
+        self.assertEqual(self.server.stats()['injected'], 3)
+
+    def test_error_rate(self):
+        """
+        A random fraction of requests fails.
+        """
+        self.server.error_rate = 1.0
+
+        client = self.client(retry_policy=basecamp.retry.RetryPolicy(
+            max_retries=0))
+
+        self.assertRaises(BasecampAPIError, client.projects.fetch)
+
+    def test_unauthorized(self):
+        """
+        Requests need a valid access token.
+        """
+        self.assertEqual(self.get('projects.json', token='nope')[0], 401)
+
+        self.server.expire()
+        self.assertEqual(self.get('projects.json')[0], 401)
+
+    def test_launchpad(self):
+        """
+        Tokens are issued and refreshed by the fake Launchpad.
+        """
+        auth = basecamp.api.Auth(self.server.client_id,
+            self.server.client_secret, 'http://localhost/callback')
+        auth.auth_base_url = self.server.launchpad_url
+
+        token = auth.get_token(self.server.code)
+        accounts = auth.get_accounts(token['access_token'])
+        refreshed = auth.refresh(token['refresh_token'])
+
+        self.assertEqual(accounts[0]['href'], self.server.account_url)
+        self.assertNotEqual(refreshed['access_token'], token['access_token'])
+        self.assertEqual(self.get('projects.json',
+            token=refreshed['access_token'])[0], 200)
+        self.assertRaises(BasecampAPIError, auth.get_token, 'wrong')
+
+    def test_requests(self):
+        """
+        The server can be driven without a socket too.
+        """
+        status, headers, body = self.server.handle('GET',
+            '/{0}/api/v1/projects/{1}.json'.format(self.server.account_id,
+                self.server.project_ids[0]),
+            {'access_token': self.server.access_token}, {}, b'')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body.decode('utf-8'))['name'],
+            'Project 0')
+        self.assertIn('ETag', headers)
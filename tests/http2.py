@@ -0,0 +1,74 @@
+"""
+Tests for the HTTP/2 transports.
+"""
+import asyncio
+import unittest
+import basecamp.api
+
+from basecamp.aio import AsyncBasecampClient
+from basecamp.exceptions import ImproperlyConfigured
+from basecamp.fakeserver import FakeBasecamp
+from basecamp.http2 import AsyncHTTP2Transport, HTTP2Transport
+from basecamp.ratelimit import RateLimiter
+
+try:
+    import httpx  # noqa: F401
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+
+class HTTP2(unittest.TestCase):
+    """
+    HTTP/2 transport tests, against the fake server, which only speaks
+    HTTP/1.1.
+    """
+
+    @unittest.skipIf(httpx is not None, 'httpx is installed')
+    def test_missing(self):
+        """
+        The transports need httpx.
+        """
+        self.assertRaises(ImproperlyConfigured, HTTP2Transport)
+        self.assertRaises(ImproperlyConfigured, AsyncHTTP2Transport)
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_fallback(self):
+        """
+        Servers without HTTP/2 are spoken to in HTTP/1.1.
+        """
+        with FakeBasecamp() as server:
+            client = basecamp.api.BasecampClient(server.account_url,
+                server.access_token, transport=HTTP2Transport(),
+                rate_limiter=RateLimiter(), cache=False)
+            project_id = server.project_ids[0]
+
+            self.assertEqual(len(list(client.todos.fetch(project_id,
+                lazy=True))), 120)
+            self.assertEqual(len(list(client.documents.fetch(
+                project_id=project_id, stream=True))), 5)
+            client.close()
+
+        self.assertEqual(client.transport.stats()['http_versions'],
+            {'HTTP/1.1': 4})
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_async(self):
+        """
+        The asynchronous transport sends concurrent requests.
+        """
+        with FakeBasecamp() as server:
+            client = AsyncBasecampClient(server.account_url,
+                server.access_token, transport=AsyncHTTP2Transport(),
+                rate_limiter=RateLimiter(), cache=False, coalescer=False)
+
+            async def main():
+                results = await asyncio.gather(*[client.projects.fetch()
+                    for _ in range(10)])
+                await client.close()
+                return results
+
+            results = asyncio.run(main())
+
+        self.assertEqual(len(set(str(result) for result in results)), 1)
+        self.assertEqual(client.transport.stats()['requests'], 10)
@@ -0,0 +1,224 @@
+"""
+Tests for the per-request instrumentation hooks.
+"""
+import asyncio
+import unittest
+import basecamp.api
+import basecamp.retry
+
+from .base import RequestMock
+from basecamp import codec
+from basecamp.aio import AsyncBasecampClient, AsyncResponse, _timings
+from basecamp.cache import HTTPCache
+from basecamp.exceptions import BasecampAPIError
+from basecamp.instrumentation import Instrumentation, endpoint_template
+from basecamp.transport import Transport
+
+
+class ScriptedTransport(Transport):
+    """
+    Transport answering requests with the given status codes, in order.
+    """
+
+    def __init__(self, *status_codes):
+        super(ScriptedTransport, self).__init__()
+        self.status_codes = list(status_codes)
+
+    def request(self, method, url, headers=None, data=None):
+        mock = RequestMock()
+        mock.status_code = self.status_codes.pop(0)
+        mock.headers = {'ETag': '"abc"', 'Retry-After': '0'}
+        mock.content = b'' if mock.status_code == 304 else b'[{"id": 1}]'
+        return mock
+
+
+class AsyncScriptedTransport(object):
+    """
+    Asynchronous transport answering every request with a 200.
+    """
+
+    async def request(self, method, url, headers=None, data=None):
+        return AsyncResponse(200, b'{"id": 1}', {},
+            timings={'dns': 0.01, 'connect': 0.02, 'ttfb': 0.1})
+
+    def stats(self):
+        return {}
+
+
+class Instrumentations(unittest.TestCase):
+    """
+    Instrumentation tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def client(self, *status_codes, **kwargs):
+        """
+        Get a client reporting to a fresh instrumentation, and the events
+        it reports.
+        """
+        events = []
+        instrumentation = Instrumentation()
+        instrumentation.add_hook(events.append)
+
+        kwargs.setdefault('cache', False)
+        kwargs.setdefault('retry_policy',
+            basecamp.retry.RetryPolicy(backoff_factor=0))
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            transport=ScriptedTransport(*status_codes),
+            instrumentation=instrumentation, **kwargs)
+
+        return client, events
+
+    def test_endpoint_template(self):
+        """
+        Ids, the account url, the format and the query are left out.
+        """
+        self.assertEqual(endpoint_template(
+            self.url + '/projects/1/todolists/22-groceries/todos.json'
+            '?access_token=x&page=2'), 'projects/{id}/todolists/{id}/todos')
+        self.assertEqual(endpoint_template(self.url + '/people/me.json'),
+            'people/me')
+
+    def test_event(self):
+        """
+        A request is reported with its outcome, size and operation.
+        """
+        client, events = self.client(200)
+
+        client.projects.fetch(1)
+
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual(event.operation, 'Project.fetch')
+        self.assertEqual(event.method, 'GET')
+        self.assertEqual(event.endpoint, 'projects/{id}')
+        self.assertEqual(event.url,
+            self.url + '/projects/1.json?access_token=REDACTED')
+        self.assertEqual(event.status_code, 200)
+        self.assertEqual(event.request_bytes, 0)
+        self.assertEqual(event.response_bytes, 11)
+        self.assertEqual(event.cache, 'bypass')
+        self.assertEqual(event.retries, 0)
+        self.assertIsNone(event.error)
+        self.assertTrue(event.total >= 0)
+        self.assertNotIn('response', event.as_dict())
+
+    def test_lazy(self):
+        """
+        Pages are reported as the operation that asked for them.
+        """
+        client, events = self.client(200, 200)
+
+        list(client.todos.fetch(1, lazy=True))
+        list(client.documents.fetch(lazy=True, prefetch=True))
+
+        self.assertEqual([event.operation for event in events],
+            ['Todo.fetch', 'Document.fetch'])
+
+    def test_retries(self):
+        """
+        A retried request is one event counting its retries and replays.
+        """
+        client, events = self.client(503, 429, 200)
+
+        client.projects.fetch()
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].retries, 1)
+        self.assertEqual(events[0].replays, 1)
+        self.assertEqual(events[0].status_code, 200)
+
+    def test_cache(self):
+        """
+        Revalidated requests say whether the cache answered them.
+        """
+        client, events = self.client(200, 304, cache=HTTPCache())
+
+        client.projects.fetch()
+        client.projects.fetch()
+
+        self.assertEqual([event.cache for event in events], ['miss', 'hit'])
+        self.assertEqual([event.status_code for event in events],
+            [200, 304])
+
+    def test_error(self):
+        """
+        Failed requests are reported with their error.
+        """
+        client, events = self.client(500,
+            retry_policy=basecamp.retry.RetryPolicy(max_retries=0))
+
+        self.assertRaises(BasecampAPIError, client.projects.fetch)
+
+        self.assertEqual(len(events), 1)
+        self.assertIsInstance(events[0].error, BasecampAPIError)
+        self.assertEqual(events[0].status_code, 500)
+
+    def test_payload(self):
+        """
+        The request body size is reported.
+        """
+        client, events = self.client(201)
+
+        client.projects.create('Café', '')
+
+        self.assertEqual(events[0].method, 'POST')
+        self.assertEqual(events[0].endpoint, 'projects')
+        self.assertEqual(events[0].request_bytes,
+            len(codec.dumps({'name': 'Café', 'description': ''}).encode(
+                'utf-8')))
+
+    def test_failing_hook(self):
+        """
+        A hook raising doesn't fail the request or stop other hooks.
+        """
+        client, events = self.client(200)
+
+        def fail(event):
+            raise ValueError(event)
+
+        client.instrumentation.hooks = (fail,) + client.instrumentation.hooks
+
+        with self.assertLogs('basecamp.instrumentation'):
+            self.assertEqual(client.projects.fetch(), [{'id': 1}])
+        self.assertEqual(len(events), 1)
+
+    def test_no_hooks(self):
+        """
+        Nothing is recorded while nobody is listening.
+        """
+        instrumentation = Instrumentation()
+
+        self.assertIsNone(instrumentation.start('GET', self.url))
+
+    def test_async(self):
+        """
+        Asynchronous requests are reported with the transport's timings.
+        """
+        events = []
+        instrumentation = Instrumentation()
+        instrumentation.add_hook(events.append)
+        client = AsyncBasecampClient(self.url, self.token,
+            transport=AsyncScriptedTransport(),
+            instrumentation=instrumentation)
+
+        asyncio.run(client.projects.fetch(1))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].operation, 'Project.fetch')
+        self.assertEqual(events[0].cache, 'miss')
+        self.assertEqual((events[0].dns, events[0].connect, events[0].ttfb),
+            (0.01, 0.02, 0.1))
+
+    def test_timings(self):
+        """
+        Trace marks are turned into durations.
+        """
+        self.assertEqual(_timings({'start': 1.0, 'dns_start': 1.0,
+            'dns_end': 1.5, 'connect_start': 1.0, 'connect_end': 2.0,
+            'headers': 3.0}), {'dns': 0.5, 'connect': 0.5, 'ttfb': 2.0})
+        # a pooled connection was reused.
+        self.assertEqual(_timings({'start': 1.0, 'headers': 1.25}),
+            {'connect': 0.0, 'ttfb': 0.25})
@@ -0,0 +1,116 @@
+"""
+Tests for the request metrics.
+"""
+import unittest
+import urllib.request
+
+from basecamp.instrumentation import Instrumentation, RequestEvent
+from basecamp.metrics import Metrics, serve
+
+
+class Metric(unittest.TestCase):
+    """
+    Metrics tests.
+    """
+
+    url = 'https://example.com/123/api/v1/projects/1/todos.json'
+
+    def event(self, total, status_code=200, method='GET', **attributes):
+        """
+        Get a finished event.
+        """
+        event = RequestEvent(method, self.url)
+        event.operation = 'Todo.fetch'
+        event.status_code = status_code
+        event.total = total
+        event.response_bytes = 100
+        for name, value in attributes.items():
+            setattr(event, name, value)
+        return event
+
+    def test_counters(self):
+        """
+        Requests are counted per operation, method and endpoint.
+        """
+        metrics = Metrics()
+        metrics.observe(self.event(0.1))
+        metrics.observe(self.event(0.2, status_code=304))
+        metrics.observe(self.event(0.3, status_code=500))
+        metrics.observe(self.event(0.4, rate_limited=2))
+        metrics.observe(self.event(0.5, method='POST', request_bytes=10))
+
+        self.assertEqual(metrics.count(), 5)
+        self.assertEqual(metrics.count(method='GET'), 4)
+        self.assertEqual(metrics.count('errors'), 1)
+        self.assertEqual(metrics.count('not_modified'), 1)
+        self.assertEqual(metrics.count('rate_limited'), 2)
+        self.assertEqual(metrics.count('request_bytes'), 10)
+        self.assertEqual(metrics.count('response_bytes',
+            endpoint='projects/{id}/todos'), 500)
+        self.assertEqual(metrics.count(operation='Document.update'), 0)
+
+    def test_quantile(self):
+        """
+        Quantiles are interpolated within their bucket.
+        """
+        metrics = Metrics(buckets=(0.1, 0.2, 0.4))
+        for total in (0.05, 0.05, 0.15, 0.3):
+            metrics.observe(self.event(total))
+
+        self.assertEqual(metrics.quantile(0.5), 0.1)
+        self.assertAlmostEqual(metrics.quantile(0.99), 0.392)
+        self.assertIsNone(metrics.quantile(0.5, method='PUT'))
+
+    def test_render(self):
+        """
+        Metrics are rendered in the Prometheus text format.
+        """
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.observe(self.event(0.05))
+        metrics.observe(self.event(2.5))
+
+        text = metrics.render()
+        labels = 'operation="Todo.fetch",method="GET",' \
+            'endpoint="projects/{id}/todos"'
+
+        self.assertIn('# TYPE basecamp_request_duration_seconds histogram\n',
+            text)
+        self.assertIn('basecamp_requests_total{%s} 2\n' % labels, text)
+        self.assertIn('basecamp_request_duration_seconds_bucket'
+            '{%s,le="0.1"} 1\n' % labels, text)
+        self.assertIn('basecamp_request_duration_seconds_bucket'
+            '{%s,le="1"} 1\n' % labels, text)
+        self.assertIn('basecamp_request_duration_seconds_bucket'
+            '{%s,le="+Inf"} 2\n' % labels, text)
+        self.assertIn('basecamp_request_duration_seconds_sum'
+            '{%s} 2.55\n' % labels, text)
+        self.assertIn('basecamp_request_duration_seconds_count'
+            '{%s} 2\n' % labels, text)
+
+    def test_install(self):
+        """
+        Installed metrics record every reported request.
+        """
+        instrumentation = Instrumentation()
+        metrics = Metrics().install(instrumentation)
+
+        instrumentation.finish(instrumentation.start('GET', self.url))
+
+        self.assertEqual(metrics.count(), 1)
+
+    def test_serve(self):
+        """
+        Metrics are served over HTTP.
+        """
+        metrics = Metrics()
+        metrics.observe(self.event(0.1))
+        server = serve(metrics, port=0, host='127.0.0.1')
+        try:
+            response = urllib.request.urlopen('http://127.0.0.1:{0}/metrics'
+                .format(server.server_address[1]))
+            self.assertIn(b'basecamp_requests_total', response.read())
+            self.assertTrue(response.headers['Content-Type'].startswith(
+                'text/plain; version=0.0.4'))
+        finally:
+            server.shutdown()
+            server.server_close()
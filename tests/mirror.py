@@ -0,0 +1,203 @@
+"""
+Tests for the SQLite mirror.
+"""
+import json
+import fudge
+import unittest
+import basecamp.api
+
+from .base import RequestMock
+from basecamp.fakeserver import FakeBasecamp
+from basecamp.mirror import Mirror
+from basecamp.ratelimit import RateLimiter
+
+
+class MirrorTests(unittest.TestCase):
+    """
+    Mirror tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def setUp(self):
+        self.responses = {
+            'projects.json': [{'id': 1, 'name': 'BCX'}],
+            'projects/archived.json': [],
+            'projects/1/todolists/completed.json': [],
+            'people.json': [{'id': 5, 'name': 'Jason Fried'}],
+            'projects/1/todolists.json': [{'id': 10}],
+            'projects/1/todolists/10/todos.json': [
+                {'id': 100, 'content': 'Design it', 'due_at': '2012-03-27',
+                 'assignee': {'id': 5, 'type': 'Person'}},
+                {'id': 101, 'content': 'Ship it', 'due_at': '2012-04-02',
+                 'assignee': {'id': 6, 'type': 'Person'}}],
+            'projects/1/documents.json': [],
+        }
+        self.requested = []
+
+    def fake_get(self, url, headers=None):
+        """
+        Respond with the first page of the requested endpoint, or a 404.
+        """
+        endpoint, query = url[len(self.url) + 1:].split('?')
+        self.requested.append(endpoint)
+        mock = RequestMock()
+
+        if endpoint not in self.responses:
+            mock.status_code = 404
+            mock.content = '{}'
+            return mock
+
+        mock.status_code = 200
+        mock.content = json.dumps(self.responses[endpoint]
+            if 'page=1' in query or 'page' not in query else [])
+
+        return mock
+
+    def sync(self, mirror):
+        """
+        Sync ``mirror`` against the fake responses.
+        """
+        with fudge.patch('basecamp.base.Base.get') as fake:
+            fake.is_callable().calls(self.fake_get)
+            return mirror.sync()
+
+    def mirror(self):
+        """
+        Get an in-memory mirror of a client without a cache.
+        """
+        client = basecamp.api.BasecampClient(self.url, self.token,
+            cache=False)
+        return Mirror(client, workers=2)
+
+    def test_full_sync(self):
+        """
+        The first sync loads every record and the indexes answer queries.
+        """
+        mirror = self.mirror()
+        stats = self.sync(mirror)
+
+        self.assertEqual(stats['mode'], 'full')
+        self.assertEqual(stats['records'], 5)
+        self.assertTrue(mirror.last_synced)
+        self.assertEqual(mirror.person(5)['name'], 'Jason Fried')
+        self.assertEqual([x['id'] for x in mirror.todos_for_assignee(5)],
+            [100])
+        self.assertEqual([x['id'] for x in mirror.todos_due(
+            before='2012-03-31')], [100])
+        self.assertEqual([x['id'] for x in mirror.todos_for_project(1)],
+            [100, 101])
+
+    def test_incremental_sync(self):
+        """
+        Later syncs only fetch the records named by events.
+        """
+        mirror = self.mirror()
+        self.sync(mirror)
+
+        self.responses['events.json'] = [
+            {'id': 3, 'bucket': {'id': 1}, 'eventable': {
+                'id': 100, 'type': 'Todo',
+                'url': self.url + '/projects/1/todos/100.json'}},
+            {'id': 2, 'bucket': {'id': 1}, 'eventable': {
+                'id': 100, 'type': 'Todo',
+                'url': self.url + '/projects/1/todos/100.json'}},
+            {'id': 1, 'bucket': {'id': 1}, 'eventable': {
+                'id': 101, 'type': 'Todo',
+                'url': self.url + '/projects/1/todos/101.json'}},
+        ]
+        self.responses['projects/1/todos/100.json'] = {
+            'id': 100, 'todolist_id': 10, 'content': 'Design it',
+            'completed': True, 'assignee': {'id': 5, 'type': 'Person'},
+            'comments': [{'id': 7, 'creator': {'id': 5}}]}
+        self.requested = []
+
+        stats = self.sync(mirror)
+
+        self.assertEqual(stats['mode'], 'incremental')
+        self.assertEqual(stats['events'], 3)
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(self.requested.count('projects/1/todos/100.json'),
+            1)
+        self.assertNotIn('projects/1/todolists.json', self.requested)
+        self.assertEqual(mirror.todos_for_assignee(5), [])
+        self.assertEqual([x['id'] for x in mirror.todos_for_assignee(5,
+            completed=True)], [100])
+        self.assertEqual(mirror.todos_for_project(1, completed=None)[0][
+            'todolist_id'], 10)
+        self.assertEqual([x['id'] for x in mirror.query(
+            'SELECT data FROM comments WHERE topic_type = ? AND topic_id = ?',
+            ('todo', 100))], [7])
+        self.assertEqual(len(mirror.todos_for_project(1)), 1)
+
+    def test_comment_event(self):
+        """
+        A comment named by an event stays linked to its topic.
+        """
+        self.responses['projects/1/todolists/10/todos.json'][0][
+            'comments_count'] = 1
+        self.responses['projects/1/todos/100.json'] = {
+            'id': 100, 'todolist_id': 10, 'content': 'Design it',
+            'comments': [{'id': 7, 'content': 'Soon', 'creator': {'id': 5}}]}
+        mirror = self.mirror()
+        self.sync(mirror)
+
+        self.responses['events.json'] = [
+            {'id': 4, 'bucket': {'id': 1}, 'eventable': {
+                'id': 7, 'type': 'Comment',
+                'url': self.url + '/projects/1/comments/7.json'}},
+        ]
+        self.responses['projects/1/comments/7.json'] = {
+            'id': 7, 'content': 'Tomorrow', 'creator': {'id': 5}}
+
+        self.sync(mirror)
+
+        self.assertEqual([x['content'] for x in mirror.query(
+            'SELECT data FROM comments WHERE topic_type = ? AND topic_id = ?',
+            ('todo', 100))], ['Tomorrow'])
+
+    def test_todolist_event(self):
+        """
+        A renamed todolist is synced from its event.
+        """
+        with FakeBasecamp(projects=1, todo_lists=2, todos=2) as server:
+            client = basecamp.api.BasecampClient(server.account_url,
+                server.access_token, cache=False,
+                rate_limiter=RateLimiter())
+            mirror = Mirror(client, workers=2)
+            mirror.sync()
+
+            todo_list = client.todo_lists.fetch(server.project_ids[0])[0]
+            client.todo_lists.update(todo_list['id'], 'Renamed',
+                project_id=server.project_ids[0])
+            stats = mirror.sync()
+
+        self.assertEqual(stats['events'], 1)
+        self.assertEqual(mirror.query(
+            'SELECT data FROM todolists WHERE id = ?',
+            (todo_list['id'], ))[0]['name'], 'Renamed')
+
+    def test_project_archived_and_removed(self):
+        """
+        Projects archived or removed since the last sync are updated or
+        dropped along with their records.
+        """
+        with FakeBasecamp(projects=3, todo_lists=1, todos=2) as server:
+            client = basecamp.api.BasecampClient(server.account_url,
+                server.access_token, cache=False,
+                rate_limiter=RateLimiter())
+            mirror = Mirror(client, workers=2)
+            mirror.sync()
+
+            archived_id, removed_id, kept_id = server.project_ids
+            client.projects.archive(archived_id)
+            client.projects.remove(removed_id)
+            stats = mirror.sync()
+
+        self.assertEqual(stats['deleted'], 1)
+        self.assertTrue(mirror.project(archived_id)['archived'])
+        self.assertIsNone(mirror.project(removed_id))
+        self.assertEqual(mirror.todos_for_project(removed_id), [])
+        self.assertFalse(mirror.project(kept_id)['archived'])
+        self.assertEqual(len(mirror.todos_for_project(kept_id)), 2)
@@ -0,0 +1,108 @@
+"""
+Tests for the compact record models.
+"""
+import json
+import tracemalloc
+import unittest
+
+from basecamp import models
+
+
+def todo(todo_id):
+    """
+    Get a todo as the API returns it.
+    """
+    return {
+        'id': todo_id,
+        'todolist_id': 10,
+        'content': 'Design it {0}'.format(todo_id),
+        'completed': False,
+        'due_at': '2012-03-27',
+        'created_at': '2012-03-24T11:00:40-05:00',
+        'updated_at': '2012-03-24T11:00:40-05:00',
+        'url': 'https://basecamp.com/1/api/v1/projects/1/todos/{0}.json'
+            .format(todo_id),
+        'private': False,
+        'trashed': False,
+        'subscribers': [],
+        'assignee': {'id': todo_id % 3, 'type': 'Person',
+            'name': 'Jason Fried'},
+        'creator': {'id': 149087659, 'name': 'Jason Fried',
+            'avatar_url': 'https://asset0.37img.com/global/avatar.gif'},
+    }
+
+
+class Models(unittest.TestCase):
+    """
+    Model tests.
+    """
+
+    def test_fields(self):
+        """
+        Kept fields are attributes and items, others are dropped.
+        """
+        model = models.Todo(todo(1))
+
+        self.assertEqual(model.content, 'Design it 1')
+        self.assertEqual(model['due_at'], '2012-03-27')
+        self.assertEqual(model.get('private', 'missing'), 'missing')
+        self.assertRaises(KeyError, lambda: model['private'])
+        self.assertFalse(hasattr(model, '__dict__'))
+
+    def test_nested(self):
+        """
+        Nested records become models when first read.
+        """
+        model = models.load({'id': 1, 'comments': [{'id': 7,
+            'creator': {'id': 5}}], 'bucket': {'id': 2, 'type': 'Project'}},
+            models.Document)
+
+        self.assertIsInstance(model.bucket, models.Project)
+        self.assertIs(model.bucket, model.bucket)
+        self.assertEqual(model.comments[0].creator.id, 5)
+        self.assertEqual(model.to_dict()['bucket']['type'], 'Project')
+        self.assertIsNone(model.creator)
+
+    def test_shared(self):
+        """
+        Repeated strings and nested records are stored once.
+        """
+        first, second = models.load(json.loads(json.dumps(
+            [todo(3), todo(6)])), models.Todo)
+
+        self.assertIs(first._assignee, second._assignee)
+        self.assertIs(first.creator.avatar_url, second.creator.avatar_url)
+
+        # nothing is kept once the call returns.
+        third = models.load(json.loads(json.dumps(todo(3))), models.Todo)
+        self.assertIsNot(third._assignee, first._assignee)
+        self.assertEqual(third._assignee, first._assignee)
+
+    def test_load_iterator(self):
+        """
+        Iterators of records are wrapped as they are consumed.
+        """
+        loaded = models.load(iter([todo(1), todo(2)]), models.Todo)
+
+        self.assertEqual([x.id for x in loaded], [1, 2])
+
+    def test_memory(self):
+        """
+        Models take a fraction of the memory of the dictionaries.
+        """
+        content = json.dumps([todo(x) for x in range(5000)])
+
+        tracemalloc.start()
+        try:
+            records = json.loads(content)
+            as_dicts = tracemalloc.get_traced_memory()[0]
+            del records
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            records = models.load(json.loads(content), models.Todo)
+            as_models = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(records), 5000)
+        self.assertLess(as_models * 2, as_dicts)
@@ -0,0 +1,94 @@
+"""
+Tests for lazy pagination.
+"""
+import fudge
+import basecamp.api
+
+from nose.tools import raises
+
+from .base import BasecampBaseTest
+from basecamp.exceptions import BasecampAPIError
+from basecamp.pagination import PageIterator
+
+
+class Pagination(BasecampBaseTest):
+    """
+    Pagination tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    pages = {
+        1: [{'id': x} for x in range(1, 51)],
+        2: [{'id': x} for x in range(51, 101)],
+        3: [{'id': 101}],
+    }
+
+    def fake_page(self, url, headers=None):
+        """
+        Respond with the page asked for in the url.
+        """
+        page = int(url.rsplit('page=', 1)[1])
+        return self.setup_mock(200, self.pages[page])
+
+    def test_walks_every_page(self):
+        """
+        Every record is yielded and a short page ends the walk.
+        """
+        iterator = PageIterator(self.pages.get)
+
+        self.assertEqual([x['id'] for x in iterator], list(range(1, 102)))
+        self.assertEqual(iterator.pages_fetched, 3)
+
+    def test_prefetch(self):
+        """
+        Prefetching yields the same records in the same order.
+        """
+        iterator = PageIterator(self.pages.get, prefetch=True)
+
+        self.assertEqual([x['id'] for x in iterator], list(range(1, 102)))
+
+    def test_stops_early(self):
+        """
+        Pages past the point where the consumer stops are never fetched.
+        """
+        iterator = PageIterator(self.pages.get)
+
+        for record in iterator:
+            if record['id'] == 10:
+                break
+
+        self.assertEqual(iterator.pages_fetched, 1)
+
+    def test_repeated_page(self):
+        """
+        An endpoint that ignores the page argument is only read once.
+        """
+        iterator = PageIterator(lambda page: self.pages[1])
+
+        self.assertEqual(len(list(iterator)), 50)
+
+    def test_lazy_fetch(self):
+        """
+        A lazy fetch walks the pages of a list endpoint.
+        """
+        people = basecamp.api.Person(self.url, self.token)
+
+        with fudge.patch('basecamp.base.Base.get') as fake_get:
+            fake_get.is_callable().calls(self.fake_page)
+
+            self.assertEqual(len(list(people.fetch(lazy=True))), 101)
+
+    @raises(BasecampAPIError)
+    def test_lazy_fetch_error(self):
+        """
+        An error response part way through the walk raises.
+        """
+        people = basecamp.api.Person(self.url, self.token)
+
+        with fudge.patch('basecamp.base.Base.get') as fake_get:
+            fake_get.is_callable().returns(
+                self.setup_mock(403, {'error': 'no permission'}))
+
+            list(people.fetch(lazy=True))
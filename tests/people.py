@@ -9,7 +9,8 @@ import basecamp.api
 
 from nose.tools import raises
 
-from .base import BasecampBaseTest
+from .base import BasecampBaseTest, RequestMock
+from basecamp.cache import IdentityCache
 from basecamp.exceptions import BasecampAPIError
 
 
@@ -77,3 +78,41 @@ class People(BasecampBaseTest):
 
             self.assertEqual(
                 self.people.fetch(person='me'), self.response[0])
+
+    def test_identity_cache(self):
+        """
+        Cached people are returned without a request, as the same object.
+        """
+        people = basecamp.api.Person(self.url, self.token,
+            identity_cache=IdentityCache())
+
+        with fudge.patch('basecamp.base.Base.get') as fake_get:
+            fake_get.is_callable().returns(
+                self.setup_mock(200, self.response[0])).times_called(1)
+
+            person = people.fetch(person='me')
+            self.assertTrue(people.fetch(person='me') is person)
+            self.assertTrue(people.fetch(149087659) is person)
+            self.assertTrue(people.fetch('149087659') is person)
+            self.assertTrue(people.resolve({'id': 149087659}) is person)
+
+    def test_warm(self):
+        """
+        Warming caches every person from the list.
+        """
+        people = basecamp.api.Person(self.url, self.token,
+            identity_cache=IdentityCache())
+        pages = [self.response, []]
+
+        def fake_get(url, headers=None):
+            mock = RequestMock()
+            mock.status_code = 200
+            mock.content = json.dumps(pages.pop(0))
+            return mock
+
+        with fudge.patch('basecamp.base.Base.get') as fake:
+            fake.is_callable().calls(fake_get)
+            self.assertEqual(people.warm(), 2)
+
+        self.assertEqual(people.fetch(1071630348)['name'], 'Jeremy Kemper')
+        self.assertEqual(people.resolve(None), None)
@@ -0,0 +1,134 @@
+"""
+Tests for the rate limiter and 429 replays.
+"""
+import fudge
+import unittest
+import basecamp.api
+
+from nose.tools import raises
+
+from .base import RequestMock
+from basecamp.exceptions import BasecampAPIError
+from basecamp.ratelimit import RateLimiter, get_rate_limiter, retry_after
+
+
+class FakeClock(object):
+    """
+    A clock that only moves when slept on.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """
+        Advance the clock.
+        """
+        self.now += seconds
+
+
+class RateLimit(unittest.TestCase):
+    """
+    Rate limiter tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def make_response(self, status_code, headers=None):
+        """
+        Build a bodiless response.
+        """
+        mock = RequestMock()
+        mock.status_code = status_code
+        mock.headers = headers or {}
+        mock.content = '[]'
+
+        return mock
+
+    def test_window(self):
+        """
+        No more than ``requests`` calls are let into any period.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(requests=5, period=10,
+            clock=clock, sleep=clock.sleep)
+        sent = []
+
+        for _ in range(12):
+            limiter.acquire()
+            sent.append(clock.now)
+
+        self.assertEqual(sent, [0] * 5 + [10] * 5 + [20] * 2)
+        self.assertEqual(limiter.stats()['delayed'], 2)
+
+    def test_pause(self):
+        """
+        A pause holds back the next request.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        limiter.pause(3)
+
+        self.assertEqual(limiter.acquire(), 3)
+        self.assertEqual(limiter.stats()['throttled'], 1)
+
+    def test_retry_after(self):
+        """
+        Retry-After is read as seconds, with a fallback.
+        """
+        self.assertEqual(
+            retry_after(self.make_response(429, {'Retry-After': '7'})), 7)
+        self.assertEqual(retry_after(self.make_response(429), default=2), 2)
+
+    def test_shared_limiter(self):
+        """
+        Resources with the same account share a limiter, whatever their
+        token.
+        """
+        project = basecamp.api.Project(self.url, self.token)
+        todo = basecamp.api.Todo(self.url, self.token)
+
+        self.assertTrue(project.rate_limiter is todo.rate_limiter)
+        self.assertTrue(
+            project.rate_limiter is get_rate_limiter(self.url))
+        self.assertTrue(project.rate_limiter is
+            basecamp.api.Project(self.url, 'another token').rate_limiter)
+        self.assertFalse(project.rate_limiter is basecamp.api.Project(
+            'https://example.com/456/api/v1', self.token).rate_limiter)
+
+    def test_replay(self):
+        """
+        A 429 is waited out and the request replayed.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        projects = basecamp.api.Project(self.url, self.token,
+            rate_limiter=limiter)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            (fake.is_callable()
+                .returns(self.make_response(429, {'Retry-After': '5'}))
+                .next_call().returns(self.make_response(200)))
+
+            self.assertEqual(projects.fetch(), [])
+
+        self.assertEqual(clock.now, 5)
+
+    @raises(BasecampAPIError)
+    def test_replays_exhausted(self):
+        """
+        A request that keeps getting a 429 gives up eventually.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        projects = basecamp.api.Project(self.url, self.token,
+            rate_limiter=limiter)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            fake.is_callable().returns(
+                self.make_response(429, {'Retry-After': '1'}))
+
+            projects.fetch()
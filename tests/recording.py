@@ -0,0 +1,189 @@
+"""
+Tests for recording and replaying traffic.
+"""
+import asyncio
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import basecamp.api
+import basecamp.retry
+import requests
+
+from basecamp.aio import AsyncBasecampClient, AsyncTransport
+from basecamp.exceptions import ReplayMiss
+from basecamp.fakeserver import FakeBasecamp
+from basecamp.ratelimit import RateLimiter
+from basecamp.recording import (AsyncRecordingTransport,
+    AsyncReplayTransport, RecordingTransport, ReplayTransport, load)
+from basecamp.transport import AsyncBaseTransport, BaseTransport, Transport
+
+
+class FailingTransport(Transport):
+    """
+    Transport that can't connect.
+    """
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        raise requests.ConnectionError('refused')
+
+
+class Recording(unittest.TestCase):
+    """
+    Record and replay tests.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'crawl.jsonl.gz')
+
+    def client(self, account_url, access_token, transport, **kwargs):
+        """
+        Get a client sending requests through ``transport``.
+        """
+        return basecamp.api.BasecampClient(account_url, access_token,
+            transport=transport, rate_limiter=RateLimiter(),
+            cache=False, coalescer=False, **kwargs)
+
+    def crawl(self, client, project_id):
+        """
+        Make a few requests.
+        """
+        todo_list = client.todo_lists.fetch(project_id)[0]
+        return [
+            client.projects.fetch(),
+            list(client.todos.fetch(project_id, lazy=True)),
+            client.todos.create(project_id, todo_list['id'], 'Replay me'),
+            list(client.documents.fetch(project_id=project_id,
+                stream=True)),
+        ]
+
+    def record(self):
+        """
+        Record a crawl of a fake server.
+
+        :rtype: the server and the crawl results.
+        """
+        with FakeBasecamp(todos=60) as server:
+            client = self.client(server.account_url, server.access_token,
+                RecordingTransport(Transport(), self.path))
+            results = self.crawl(client, server.project_ids[0])
+            client.close()
+        return server, results
+
+    def test_replay(self):
+        """
+        A replayed crawl gets the recorded responses, without a server.
+        """
+        server, recorded = self.record()
+
+        client = self.client(server.account_url, 'another-token',
+            ReplayTransport(self.path))
+        replayed = self.crawl(client, server.project_ids[0])
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(client.transport.stats(), {'requests': 7,
+            'replayed': 7, 'misses': 0, 'remaining': 0})
+
+    def test_interfaces(self):
+        """
+        The transports implement the interface of what they wrap.
+        """
+        self.record()
+        recording = RecordingTransport(Transport(), self.path + '.1')
+        async_recording = AsyncRecordingTransport(AsyncTransport(),
+            self.path + '.2')
+        self.addCleanup(recording.cassette.close)
+        self.addCleanup(async_recording.cassette.close)
+
+        self.assertIsInstance(recording, BaseTransport)
+        self.assertIsInstance(ReplayTransport(self.path), BaseTransport)
+        self.assertIsInstance(async_recording, AsyncBaseTransport)
+        self.assertIsInstance(AsyncReplayTransport(self.path),
+            AsyncBaseTransport)
+        self.assertNotIsInstance(AsyncReplayTransport(self.path),
+            BaseTransport)
+
+    def test_redacted(self):
+        """
+        Tokens don't end up in cassettes.
+        """
+        with FakeBasecamp() as server:
+            auth = basecamp.api.Auth(server.client_id, server.client_secret,
+                'http://localhost/callback',
+                transport=RecordingTransport(Transport(), self.path))
+            auth.auth_base_url = server.launchpad_url
+            token = auth.get_token(server.code)
+            auth.transport.close()
+
+        with gzip.open(self.path, 'rt') as cassette:
+            text = cassette.read()
+
+        for secret in (server.client_secret, server.code,
+                token['access_token'], token['refresh_token']):
+            self.assertNotIn(secret, text)
+
+        header, exchanges = load(self.path)
+        self.assertEqual(header['format'], 1)
+        self.assertEqual(exchanges[0]['status'], 200)
+        self.assertIn('REDACTED', exchanges[0]['url'])
+
+    def test_miss(self):
+        """
+        Requests that weren't recorded fail.
+        """
+        server, _ = self.record()
+        client = self.client(server.account_url, server.access_token,
+            ReplayTransport(self.path))
+
+        self.assertRaises(ReplayMiss, client.people.fetch)
+        self.assertEqual(client.transport.stats()['misses'], 1)
+
+    def test_speed(self):
+        """
+        Responses come back at the recorded latency, divided by ``speed``.
+        """
+        server, _ = self.record()
+        delays = []
+        transport = ReplayTransport(self.path, speed=4,
+            sleep=delays.append)
+        _, exchanges = load(self.path)
+
+        self.crawl(self.client(server.account_url, server.access_token,
+            transport), server.project_ids[0])
+
+        self.assertEqual(delays, [exchange['elapsed'] / 4
+            for exchange in exchanges if exchange['elapsed']])
+
+    def test_errors(self):
+        """
+        Connection errors are recorded and replayed.
+        """
+        url = 'https://basecamp.com/1/api/v1'
+        policy = basecamp.retry.RetryPolicy(max_retries=0)
+        client = self.client(url, 'token',
+            RecordingTransport(FailingTransport(), self.path),
+            retry_policy=policy)
+
+        self.assertRaises(requests.ConnectionError, client.projects.fetch)
+        client.close()
+
+        client = self.client(url, 'token', ReplayTransport(self.path),
+            retry_policy=policy)
+        self.assertRaises(requests.ConnectionError, client.projects.fetch)
+
+    def test_async(self):
+        """
+        Recorded traffic replays through the asynchronous client.
+        """
+        server, recorded = self.record()
+        client = AsyncBasecampClient(server.account_url, 'token',
+            transport=AsyncReplayTransport(self.path), cache=False,
+            coalescer=False, rate_limiter=RateLimiter())
+
+        async def main():
+            return await client.projects.fetch()
+
+        self.assertEqual(asyncio.run(main()), recorded[0])
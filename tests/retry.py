@@ -0,0 +1,121 @@
+"""
+Tests for retrying failed requests.
+"""
+import fudge
+import requests
+import unittest
+import basecamp.api
+
+from nose.tools import raises
+
+from .base import RequestMock
+from .ratelimit import FakeClock
+from basecamp.exceptions import BasecampAPIError
+from basecamp.retry import RetryPolicy
+
+
+class Retry(unittest.TestCase):
+    """
+    Retry policy tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def make_response(self, status_code):
+        """
+        Build a response.
+        """
+        mock = RequestMock()
+        mock.status_code = status_code
+        mock.headers = {}
+        mock.content = '{"id": 1, "name": "foo", "description": "bar"}'
+
+        return mock
+
+    def make_policy(self, **kwargs):
+        """
+        Build a policy on a fake clock.
+        """
+        self.clock = FakeClock()
+        return RetryPolicy(clock=self.clock, sleep=self.clock.sleep,
+            **kwargs)
+
+    def test_backoff(self):
+        """
+        Waits double with each retry, up to the cap.
+        """
+        policy = self.make_policy(backoff_factor=1, max_backoff=5,
+            jitter=False)
+
+        self.assertEqual([policy.backoff(x) for x in range(1, 5)],
+            [1, 2, 4, 5])
+
+    def test_retry_server_error(self):
+        """
+        A GET answered with a 500 is retried.
+        """
+        policy = self.make_policy(jitter=False)
+        projects = basecamp.api.Project(self.url, self.token,
+            retry_policy=policy)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            (fake.is_callable()
+                .returns(self.make_response(503))
+                .next_call().returns(self.make_response(500))
+                .next_call().returns(self.make_response(200)))
+
+            self.assertEqual(projects.fetch(project=1)['id'], 1)
+
+        self.assertEqual(policy.stats()['retries'], 2)
+        self.assertEqual(policy.stats()['retried_requests'], 1)
+        self.assertEqual(self.clock.now, 1.5)
+
+    def test_retry_connection_error(self):
+        """
+        A connection error is retried.
+        """
+        policy = self.make_policy()
+        projects = basecamp.api.Project(self.url, self.token,
+            retry_policy=policy)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            (fake.is_callable()
+                .raises(requests.ConnectionError('reset'))
+                .next_call().returns(self.make_response(200)))
+
+            self.assertEqual(projects.fetch(project=1)['id'], 1)
+
+    @raises(BasecampAPIError)
+    def test_post_not_retried(self):
+        """
+        A POST is not retried.
+        """
+        policy = self.make_policy()
+        projects = basecamp.api.Project(self.url, self.token,
+            retry_policy=policy)
+
+        with fudge.patch('basecamp.transport.Transport.request') as fake:
+            (fake.expects_call()
+                .returns(self.make_response(500)))
+
+            projects.create('foo', 'bar')
+
+    def test_status_rules_and_budget(self):
+        """
+        Per status limits and the time budget end the retries.
+        """
+        policy = self.make_policy(status_rules={500: 1, 404: 2},
+            jitter=False)
+
+        self.assertTrue(policy.wait('GET', 1, 0, status_code=500))
+        self.assertFalse(policy.wait('GET', 2, 0, status_code=500))
+        self.assertTrue(policy.wait('GET', 2, 0, status_code=404))
+        self.assertFalse(policy.wait('GET', 1, 0, status_code=200))
+
+        policy = self.make_policy(backoff_factor=10, total_timeout=15,
+            jitter=False)
+
+        self.assertTrue(policy.wait('DELETE', 1, 0, status_code=502))
+        self.assertFalse(policy.wait('DELETE', 2, 0, status_code=502))
+        self.assertEqual(policy.stats()['gave_up'], 1)
@@ -0,0 +1,101 @@
+"""
+Tests for the slow request log.
+"""
+import unittest
+
+from basecamp.instrumentation import RequestEvent
+from basecamp.slowlog import SlowLog, fingerprint
+
+
+class SlowLogs(unittest.TestCase):
+    """
+    Slow log tests.
+    """
+
+    url = 'https://example.com/123/api/v1/projects/{0}/todos.json?' \
+        'access_token=secret&page={1}'
+
+    def event(self, total, project=1, page=1):
+        """
+        Get a finished event.
+        """
+        event = RequestEvent('GET', self.url.format(project, page))
+        event.operation = 'Todo.fetch'
+        event.status_code = 200
+        event.response_bytes = 2048
+        event.ttfb = total / 2
+        event.total = total
+        return event
+
+    def test_threshold(self):
+        """
+        Only requests taking the threshold or more are recorded.
+        """
+        slow = SlowLog(threshold=1.0, log=False)
+        slow.observe(self.event(0.5))
+        slow.observe(self.event(1.0))
+        slow.observe(self.event(3.0))
+
+        self.assertEqual([entry['total'] for entry in slow.entries()],
+            [1.0, 3.0])
+
+    def test_entry(self):
+        """
+        Entries describe the request, without its access token.
+        """
+        slow = SlowLog(threshold=1.0)
+
+        with self.assertLogs('basecamp.slowlog', 'WARNING') as logs:
+            slow.observe(self.event(2.0, project=7))
+
+        entry = slow.entries()[0]
+        self.assertEqual(entry['operation'], 'Todo.fetch')
+        self.assertEqual(entry['endpoint'], 'projects/{id}/todos')
+        self.assertEqual(entry['url'], 'https://example.com/123/api/v1/'
+            'projects/7/todos.json?access_token=REDACTED&page=1')
+        self.assertEqual(entry['response_bytes'], 2048)
+        self.assertEqual(entry['ttfb'], 1.0)
+        self.assertNotIn('secret', logs.output[0])
+        self.assertIn('Todo.fetch', logs.output[0])
+
+    def test_fingerprint(self):
+        """
+        Requests differing only in ids and values share a fingerprint.
+        """
+        endpoint = 'projects/{id}/todos'
+
+        self.assertEqual(
+            fingerprint('GET', endpoint, self.url.format(1, 1)),
+            fingerprint('GET', endpoint, self.url.format(2, 5)))
+        self.assertNotEqual(
+            fingerprint('GET', endpoint, self.url.format(1, 1)),
+            fingerprint('PUT', endpoint, self.url.format(1, 1)))
+
+    def test_summary(self):
+        """
+        Slow requests are grouped by pattern, most time consuming first.
+        """
+        slow = SlowLog(threshold=1.0, log=False)
+        slow.observe(self.event(2.0, project=1))
+        slow.observe(self.event(4.0, project=2))
+        other = self.event(5.0)
+        other.method = 'PUT'
+        slow.observe(other)
+
+        summary = slow.summary()
+
+        self.assertEqual([(pattern['method'], pattern['count'],
+            pattern['total'], pattern['max']) for pattern in summary],
+            [('GET', 2, 6.0, 4.0), ('PUT', 1, 5.0, 5.0)])
+        self.assertIn('projects/2/', summary[0]['url'])
+
+    def test_max_entries(self):
+        """
+        Only the latest slow requests are kept.
+        """
+        slow = SlowLog(threshold=0, max_entries=2, log=False)
+        for total in (1.0, 2.0, 3.0):
+            slow.observe(self.event(total))
+
+        self.assertEqual([entry['total'] for entry in slow.entries()],
+            [2.0, 3.0])
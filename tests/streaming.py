@@ -0,0 +1,166 @@
+"""
+Tests for streamed list responses.
+"""
+import gc
+import json
+import unittest
+import basecamp.api
+import basecamp.retry
+
+from basecamp.ratelimit import RateLimiter
+from basecamp.streaming import ArrayParser
+from basecamp.transport import Transport
+
+
+class StreamedResponse(object):
+    """
+    A response whose body is read in small chunks.
+    """
+    status_code = 200
+    raw = True
+
+    def __init__(self, content, chunk=7, status_code=200):
+        self.status_code = status_code
+        self.headers = {'Retry-After': '0'}
+        self.content = content
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), self.chunk):
+            yield self.content[start:start + self.chunk]
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingTransport(Transport):
+    """
+    Transport answering every request with a streamed response.
+    """
+
+    def __init__(self, content, *failures):
+        super(StreamingTransport, self).__init__()
+        self.response = StreamedResponse(content)
+        self.failures = [StreamedResponse(b'', status_code=status_code)
+            for status_code in failures]
+        self.streamed = []
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        self.streamed.append(stream)
+        if len(self.streamed) <= len(self.failures):
+            return self.failures[len(self.streamed) - 1]
+        return self.response
+
+
+class Streaming(unittest.TestCase):
+    """
+    Streaming tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    records = [
+        {'id': 1, 'title': 'a', 'content': 'x "{[,:]}" \\ y' * 20,
+         'creator': {'id': 5, 'name': 'caf\xe9'}},
+        {'id': 2, 'title': 'b', 'content': '', 'tags': [1, [2, {}]]},
+    ]
+
+    def parse(self, content, chunk, fields=None):
+        """
+        Feed ``content`` to a parser ``chunk`` bytes at a time.
+        """
+        parser = ArrayParser(fields=fields)
+        records = []
+        for start in range(0, len(content), chunk):
+            records.extend(parser.feed(content[start:start + chunk]))
+        parser.close()
+        return records
+
+    def test_chunks(self):
+        """
+        Records are the same however the body is split.
+        """
+        content = json.dumps(self.records).encode('utf-8')
+
+        for chunk in (1, 2, 5, 64, len(content)):
+            self.assertEqual(self.parse(content, chunk), self.records)
+
+    def test_fields(self):
+        """
+        Keys outside the projection are dropped.
+        """
+        content = json.dumps(self.records).encode('utf-8')
+
+        for chunk in (1, 3, len(content)):
+            self.assertEqual(self.parse(content, chunk, ('id', 'creator')),
+                [{'id': 1, 'creator': {'id': 5, 'name': 'caf\xe9'}},
+                 {'id': 2}])
+
+    def test_scalars(self):
+        """
+        Elements don't have to be objects.
+        """
+        self.assertEqual(self.parse(b' [1, "a,b", null, [], {}] ', 4,
+            fields=('id',)), [1, 'a,b', None, [], {}])
+        self.assertEqual(self.parse(b'[]', 1), [])
+
+    def test_invalid(self):
+        """
+        Malformed arrays raise ValueError.
+        """
+        for content in (b'{"id": 1}', b'[1,]', b'[,1]', b'[1] 2', b'[1'):
+            self.assertRaises(ValueError, self.parse, content, 2)
+
+    def test_fetch_stream(self):
+        """
+        Streamed fetches yield projected records and release the response.
+        """
+        transport = StreamingTransport(
+            json.dumps(self.records).encode('utf-8'))
+        documents = basecamp.api.Document(self.url, self.token,
+            transport=transport)
+
+        records = documents.fetch(project_id=1, stream=True,
+            fields=('id', 'title'))
+
+        self.assertEqual(list(records),
+            [{'id': 1, 'title': 'a'}, {'id': 2, 'title': 'b'}])
+        self.assertEqual(transport.streamed, [True])
+        self.assertTrue(transport.response.closed)
+
+    def test_retried_stream(self):
+        """
+        Streamed responses that are retried or replayed are closed.
+        """
+        transport = StreamingTransport(
+            json.dumps(self.records).encode('utf-8'), 503, 429)
+        documents = basecamp.api.Document(self.url, self.token,
+            transport=transport,
+            retry_policy=basecamp.retry.RetryPolicy(backoff_factor=0),
+            rate_limiter=RateLimiter())
+
+        records = documents.fetch(project_id=1, stream=True)
+
+        self.assertEqual([x.closed for x in transport.failures],
+            [True, True])
+        self.assertFalse(transport.response.closed)
+        self.assertEqual(len(list(records)), 2)
+
+    def test_discarded_stream(self):
+        """
+        A streamed fetch that is never iterated still releases the
+        response.
+        """
+        transport = StreamingTransport(
+            json.dumps(self.records).encode('utf-8'))
+        documents = basecamp.api.Document(self.url, self.token,
+            transport=transport)
+
+        records = documents.fetch(project_id=1, stream=True)
+        self.assertFalse(transport.response.closed)
+
+        del records
+        gc.collect()
+        self.assertTrue(transport.response.closed)
@@ -0,0 +1,144 @@
+"""
+Tests for access token refreshing.
+"""
+import asyncio
+import threading
+import time
+import unittest
+import basecamp.api
+
+from .base import RequestMock
+from .ratelimit import FakeClock
+from basecamp.tokens import TokenManager, token_in
+from basecamp.transport import Transport
+
+
+class FakeAuth(object):
+    """
+    Hands out numbered access tokens.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def refresh(self, refresh_token):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {'access_token': 'token-{0}'.format(self.calls),
+            'expires_in': 1000}
+
+
+class FakeAsyncAuth(FakeAuth):
+    """
+    Asynchronous :class:`FakeAuth`.
+    """
+
+    async def refresh(self, refresh_token):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {'access_token': 'token-{0}'.format(self.calls),
+            'expires_in': 1000}
+
+
+class ExpiringTransport(Transport):
+    """
+    Transport answering 401 until the token is ``valid``.
+    """
+
+    def __init__(self, valid):
+        super(ExpiringTransport, self).__init__()
+        self.valid = valid
+        self.tokens = []
+
+    def request(self, method, url, headers=None, data=None):
+        self.tokens.append(token_in(url))
+        mock = RequestMock()
+        mock.headers = {}
+        if token_in(url) == self.valid:
+            mock.status_code = 200
+            mock.content = b'[]'
+        else:
+            mock.status_code = 401
+            mock.content = b'{}'
+        return mock
+
+
+class Tokens(unittest.TestCase):
+    """
+    Token manager tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+
+    def test_proactive_refresh(self):
+        """
+        A token about to expire is refreshed before the request is sent.
+        """
+        clock = FakeClock()
+        auth = FakeAuth()
+        tokens = TokenManager(auth, 'old', 'refresh', expires_in=100,
+            margin=10, clock=clock)
+        url = '{0}/projects.json?access_token=old&page=2'.format(self.url)
+
+        self.assertEqual(tokens.prepare(url), url)
+        clock.sleep(95)
+        self.assertEqual(tokens.prepare(url),
+            '{0}/projects.json?access_token=token-1&page=2'.format(self.url))
+        self.assertEqual(auth.calls, 1)
+        self.assertEqual(tokens.stats()['expires_in'], 1000)
+
+    def test_replay_on_401(self):
+        """
+        A 401 refreshes the token and replays the request once.
+        """
+        refreshed = []
+        tokens = TokenManager(FakeAuth(), 'old', 'refresh',
+            on_refresh=refreshed.append)
+        transport = ExpiringTransport('token-1')
+        client = basecamp.api.BasecampClient(self.url, 'old',
+            transport=transport, token_manager=tokens)
+
+        self.assertEqual(client.projects.fetch(), [])
+        self.assertEqual(transport.tokens, ['old', 'token-1'])
+        self.assertEqual(client.projects.access_token, 'token-1')
+        self.assertEqual(refreshed, [tokens])
+
+        # a token that still fails isn't refreshed over and over.
+        transport.valid = None
+        self.assertRaises(Exception, client.people.fetch)
+        self.assertEqual(tokens.refreshes, 2)
+
+    def test_single_flight(self):
+        """
+        Threads finding the same token expired share one refresh.
+        """
+        auth = FakeAuth(delay=0.05)
+        tokens = TokenManager(auth, 'old', 'refresh')
+        results = []
+
+        def refresh():
+            results.append(tokens.refresh(stale='old'))
+
+        threads = [threading.Thread(target=refresh) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(auth.calls, 1)
+        self.assertEqual(set(results), set(['token-1']))
+
+    def test_single_flight_async(self):
+        """
+        Tasks finding the same token expired share one refresh.
+        """
+        auth = FakeAsyncAuth(delay=0.05)
+        tokens = TokenManager(auth, 'old', 'refresh')
+
+        async def main():
+            return await asyncio.gather(*[
+                tokens.refresh_async(stale='old') for _ in range(10)])
+
+        self.assertEqual(set(asyncio.run(main())), set(['token-1']))
+        self.assertEqual(auth.calls, 1)
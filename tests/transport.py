@@ -0,0 +1,95 @@
+"""
+Tests for the pooled transport.
+"""
+import fudge
+import unittest
+import basecamp.api
+
+from basecamp.ratelimit import RateLimiter
+from basecamp.recording import ReplayedResponse
+from basecamp.transport import (BaseTransport, Transport,
+    get_default_transport)
+
+
+class CannedTransport(BaseTransport):
+    """
+    Transport answering every request with the same body.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.sent = []
+
+    def request(self, method, url, headers=None, data=None, stream=False):
+        self.sent.append((method, url, data))
+        return ReplayedResponse({'status': 200, 'url': url,
+            'body': self.body,
+            'headers': {'Content-Type': 'application/json'}})
+
+
+class Transports(unittest.TestCase):
+    """
+    Transport tests.
+    """
+
+    url = 'https://example.com/123/api/v1'
+    token = 'JVGltZQ2WIxzA4/w4kg==--8f2687d'
+
+    def test_default_transport_is_shared(self):
+        """
+        Resources that aren't given a transport share the default one.
+        """
+        project = basecamp.api.Project(self.url, self.token)
+        todo = basecamp.api.Todo(self.url, self.token)
+        auth = basecamp.api.Auth('id', 'secret', 'http://127.0.0.1/')
+
+        self.assertTrue(project.transport is get_default_transport())
+        self.assertTrue(todo.transport is project.transport)
+        self.assertTrue(auth.transport is project.transport)
+
+    def test_explicit_transport(self):
+        """
+        A transport handed to a resource is used instead of the default.
+        """
+        transport = Transport(pool_maxsize=2)
+        project = basecamp.api.Project(self.url, self.token,
+            transport=transport)
+
+        self.assertTrue(project.transport is transport)
+
+    def test_request_uses_session(self):
+        """
+        Requests go through the pooled session and are counted.
+        """
+        transport = Transport()
+
+        with fudge.patch('requests.Session.request') as fake_request:
+            fake_request.is_callable().returns('response')
+
+            self.assertEqual(
+                transport.request('GET', '{0}/projects.json'.format(self.url)),
+                'response')
+
+        stats = transport.stats()
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(stats['connections'], 0)
+
+    def test_custom_transport(self):
+        """
+        Every verb goes through a transport implementing the interface.
+        """
+        transport = CannedTransport('[]')
+        project = basecamp.api.Project(self.url, self.token,
+            transport=transport, rate_limiter=RateLimiter())
+
+        project.get('{0}/projects.json'.format(self.url))
+        project.post('{0}/projects.json'.format(self.url), '{}')
+        project.put('{0}/projects/1.json'.format(self.url), '{}')
+        project.delete('{0}/projects/1.json'.format(self.url))
+
+        self.assertEqual([method for method, _, _ in transport.sent],
+            ['GET', 'POST', 'PUT', 'DELETE'])
+        self.assertEqual(transport.stats(), {})
+        self.assertRaises(NotImplementedError, BaseTransport().request,
+            'GET', self.url)